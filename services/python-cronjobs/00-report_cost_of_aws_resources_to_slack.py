@@ -14,7 +14,6 @@
 #
 # =============================================================================
 
-import boto3
 import os
 # ARCHIVED: Slack functionality temporarily disabled
 # from slackbot import slack
@@ -22,68 +21,58 @@ import pandas as pd
 from tabulate import tabulate
 import pytz
 from datetime import datetime, timedelta
-import time
 import math
-
-# AWS 클라이언트 초기화
-athena_client = boto3.client('athena')
+from concurrent.futures import ThreadPoolExecutor
+from utils.anomaly import AnomalyDetector
+from utils.athena import run_queries, scanned_bytes
+from utils.athena_cache import QueryCache, is_past_partition
+from utils.cost_explorer import CostHistory, summarize_costs
+from utils.flow_rollup import daily_comparison, daily_totals_query, ensure_rollups, pair_bytes_query, rollup_days
+from utils.ip_enrichment import enrich, get_ip_index
+from utils.transfer_cost import INTERNET_EGRESS, PRICING, NetworkTopology, tiered_cost, transfer_costs
 
 # 환경 변수 설정
 # ARCHIVED: Slack channel ID temporarily disabled
 # SLACK_CHANNEL_ID = os.getenv('SLACK_CHANNEL_ID', 'C07A8FBE2Q6')
 DATABASE_NAME = os.getenv('DATABASE_NAME', 'vpc_flow_logs_db')
 ATHENA_OUTPUT_LOCATION = os.getenv('ATHENA_OUTPUT_LOCATION', 's3://example-org-devops/report/')
-
-def execute_athena_query(query, database):
-    try:
-        print("\nExecuting query:")
-        print(query)  # 실제 실행되는 쿼리 출력
-        
-        response = athena_client.start_query_execution(
-            QueryString=query,
-            QueryExecutionContext={'Database': database},
-            ResultConfiguration={'OutputLocation': ATHENA_OUTPUT_LOCATION}
-        )
-        
-        query_execution_id = response['QueryExecutionId']
-        print(f"Query execution ID: {query_execution_id}")
-        
-        # 쿼리 완료 대기 (최대 300초로 증가)
-        for _ in range(300):  # 120초에서 300초로 증가
-            response = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-            state = response['QueryExecution']['Status']['State']
-            
-            if state == 'FAILED':
-                error_details = response['QueryExecution']['Status'].get('StateChangeReason', 'No error details available')
-                print(f"Query failed. Error details: {error_details}")
-                return pd.DataFrame()
-                
-            if state == 'SUCCEEDED':
-                print("Query completed successfully")
-                response = athena_client.get_query_results(QueryExecutionId=query_execution_id)
-                # 결과를 DataFrame으로 변환
-                columns = [col['Label'] for col in response['ResultSet']['ResultSetMetadata']['ColumnInfo']]
-                data = []
-                for row in response['ResultSet']['Rows'][1:]:  # Skip header
-                    data.append([field.get('VarCharValue', '') for field in row['Data']])
-                df = pd.DataFrame(data, columns=columns)
-                print(f"\nQuery results shape: {df.shape}")  # 결과 크기 출력
-                return df
-            
-            if state == 'CANCELLED':
-                print("Query was cancelled")
-                return pd.DataFrame()
-                
-            print(f"Query state: {state}, waiting... (Attempt {_+1}/300)")
-            time.sleep(1)
-        
-        print("Query timed out after 300 seconds")
-        return pd.DataFrame()
-        
-    except Exception as e:
-        print(f"Error executing Athena query: {str(e)}")
-        print(f"Full error details: {e.__dict__}")
-        return pd.DataFrame()
+ATHENA_WORKGROUP = os.getenv('ATHENA_WORKGROUP')
+# 재실행 시 같은 쿼리의 결과를 재사용하기 위한 캐시 인덱스 위치 (ATHENA_CACHE_BYPASS=true이면 항상 새로 실행)
+ATHENA_CACHE_LOCATION = os.getenv('ATHENA_CACHE_LOCATION', f"{ATHENA_OUTPUT_LOCATION.rstrip('/')}/cache/")
+# true이면 IP/인스턴스/IP 쌍 breakdown을 vpc_flow_logs 한 번 스캔(GROUPING SETS)으로 계산
+# false이면 breakdown마다 쿼리를 실행 (스캔 바이트 비교용)
+VPC_FLOW_SINGLE_SCAN = os.getenv('VPC_FLOW_SINGLE_SCAN', 'true').lower() == 'true'
+# true이면 전일/지난주/2주 전 비교를 일별 rollup 테이블(Parquet)에서 계산 (원본은 아직 집계하지 않은 날짜만 스캔)
+# false이면 전일 비교를 원본 vpc_flow_logs에서 계산하고 주간 비교는 표시하지 않음
+VPC_FLOW_ROLLUP = os.getenv('VPC_FLOW_ROLLUP', 'true').lower() == 'true'
+VPC_FLOW_ROLLUP_TABLE = os.getenv('VPC_FLOW_ROLLUP_TABLE', 'vpc_flow_daily_rollup')
+VPC_FLOW_ROLLUP_LOCATION = os.getenv('VPC_FLOW_ROLLUP_LOCATION',
+                                     f"{ATHENA_OUTPUT_LOCATION.rstrip('/')}/rollup/vpc_flow_daily/")
+# true이면 rollup의 (srcaddr, dstaddr)를 subnet/AZ/NAT Gateway로 분류하여 분류별 요금으로 전송 비용을 계산
+# false이면 전체 전송량을 인터넷 송신 요금으로 계산
+VPC_TRANSFER_CLASSIFY = os.getenv('VPC_TRANSFER_CLASSIFY', 'true').lower() == 'true'
+# true이면 top-talker 표의 IP에 ENI/인스턴스 Name 태그/EKS 파드(namespace/service) 이름을 붙임
+IP_ENRICHMENT = os.getenv('IP_ENRICHMENT', 'true').lower() == 'true'
+# true이면 전송량/인스턴스별 bytes/비용을 EWMA·요일별 기준선과 비교하여 이상을 표시 (ANOMALY_SIGMA, 기본 3)
+ANOMALY_DETECTION = os.getenv('ANOMALY_DETECTION', 'true').lower() == 'true'
+ANOMALY_STATE_LOCATION = os.getenv('ANOMALY_STATE_LOCATION', f"{ATHENA_OUTPUT_LOCATION.rstrip('/')}/anomaly-state/")
+# true이면 전체 비용 요약/TOP 10을 Cost Explorer(GetCostAndUsage)로 채움 (확정된 날짜는 캐시하여 다시 조회하지 않음)
+COST_EXPLORER_ENABLED = os.getenv('COST_EXPLORER_ENABLED', 'true').lower() == 'true'
+COST_EXPLORER_CACHE_LOCATION = os.getenv('COST_EXPLORER_CACHE_LOCATION',
+                                         f"{ATHENA_OUTPUT_LOCATION.rstrip('/')}/cost-explorer/")
+
+# breakdown별 {결과 컬럼: flow_breakdowns_query 컬럼} (breakdown별 쿼리 결과와 같은 컬럼 이름/순서)
+BREAKDOWN_COLUMNS = {
+    'top_source_ips': {'ip': 'srcaddr', 'total_bytes_sent': 'total_bytes', 'request_count': 'flow_count'},
+    'top_dest_ips': {'ip': 'dstaddr', 'total_bytes_received': 'total_bytes', 'request_count': 'flow_count'},
+    'instance_traffic': {'instance_id': 'instance_id', 'srcaddr': 'srcaddr', 'total_bytes': 'total_bytes',
+                         'total_packets': 'total_packets'},
+    'instance_direction': {'instance_id': 'instance_id', 'flow_direction': 'flow_direction',
+                           'total_bytes': 'total_bytes', 'connection_count': 'flow_count'},
+    'ip_pairs': {column: column for column in ['action', 'interface_id', 'instance_id', 'flow_direction',
+                                               'log_status', 'srcaddr', 'srcport', 'dstaddr', 'dstport',
+                                               'protocol', 'total_bytes']},
+}
 
 def format_bytes(bytes_value):
     """바이트 값을 적절한 단위(MB, GB, TB)로 변환"""
@@ -100,6 +89,140 @@ def format_bytes(bytes_value):
     except (ValueError, TypeError):
         return "0 B"
 
+def flow_breakdowns_query(query_params):
+    """top_source_ips, top_dest_ips, instance_traffic, instance_direction, ip_pairs를 한 번의 스캔으로 계산하는 쿼리
+
+    grouping(srcaddr, dstaddr, instance_id, flow_direction)은 grouping set에 없는 컬럼의 비트가 1인 값이므로
+    breakdown마다 다름. instance_id <> '-' 조건은 instance_id가 key인 breakdown의 집계 결과에만 적용한다.
+    """
+    return """
+    WITH grouped AS (
+        SELECT
+            CASE grouping(srcaddr, dstaddr, instance_id, flow_direction)
+                WHEN 7 THEN 'top_source_ips'
+                WHEN 11 THEN 'top_dest_ips'
+                WHEN 5 THEN 'instance_traffic'
+                WHEN 12 THEN 'instance_direction'
+                WHEN 0 THEN 'ip_pairs'
+            END AS breakdown,
+            action, interface_id, instance_id, flow_direction, log_status,
+            srcaddr, srcport, dstaddr, dstport, protocol,
+            CAST(SUM(bytes) AS DOUBLE) AS total_bytes,
+            SUM(packets) AS total_packets,
+            COUNT(*) AS flow_count
+        FROM vpc_flow_logs
+        WHERE year = {year} AND month = {month} AND day = {prev_day}
+        GROUP BY GROUPING SETS (
+            (srcaddr),
+            (dstaddr),
+            (instance_id, srcaddr),
+            (instance_id, flow_direction),
+            (action, interface_id, instance_id, flow_direction, log_status,
+             srcaddr, srcport, dstaddr, dstport, protocol)
+        )
+    ),
+    ranked AS (
+        SELECT
+            *,
+            row_number() OVER (PARTITION BY breakdown ORDER BY total_bytes DESC) AS breakdown_rank
+        FROM grouped
+        WHERE breakdown IN ('top_source_ips', 'top_dest_ips') OR instance_id <> '-'
+    )
+    SELECT *
+    FROM ranked
+    WHERE breakdown = 'instance_direction'
+        OR breakdown_rank <= CASE breakdown
+            WHEN 'top_source_ips' THEN 10
+            WHEN 'top_dest_ips' THEN 10
+            WHEN 'instance_traffic' THEN 20
+            ELSE 50
+        END
+    """.format(**query_params)
+
+def split_flow_breakdowns(df):
+    """flow_breakdowns_query 결과를 breakdown별 쿼리 결과와 같은 컬럼/순서의 DataFrame으로 나눔"""
+    results = {}
+    for name, columns in BREAKDOWN_COLUMNS.items():
+        if df.empty:
+            results[name] = pd.DataFrame()
+            continue
+        rows = df[df['breakdown'] == name]
+        if name == 'instance_direction':
+            rows = rows.sort_values(['instance_id', 'flow_direction'], kind='stable')
+        else:
+            rows = rows.sort_values('breakdown_rank', key=lambda values: values.astype(int), kind='stable')
+        rows = rows[list(columns.values())]
+        rows.columns = list(columns)
+        results[name] = rows.reset_index(drop=True)
+    return results
+
+def get_rollup_metrics(day, statistics):
+    """rollup 테이블로 day 기준 전일/지난주/2주 전 트래픽 비교와 day/전일의 분류별 전송 비용
+
+    비교 기간(14일) 중 rollup에 없는 날짜를 먼저 원본에서 집계한다.
+    rollup이 갱신될 수 있으므로 합계 쿼리는 캐시하지 않는다.
+    """
+    days = rollup_days(day)
+    ensure_rollups(days, DATABASE_NAME, ATHENA_OUTPUT_LOCATION, VPC_FLOW_ROLLUP_TABLE, VPC_FLOW_ROLLUP_LOCATION,
+                   workgroup=ATHENA_WORKGROUP, statistics=statistics)
+    queries = {'daily_totals': daily_totals_query(VPC_FLOW_ROLLUP_TABLE, days[0], days[-1])}
+    if VPC_TRANSFER_CLASSIFY:
+        queries['pair_bytes'] = pair_bytes_query(VPC_FLOW_ROLLUP_TABLE, days[-2:])
+    results = run_queries(queries, DATABASE_NAME, ATHENA_OUTPUT_LOCATION, workgroup=ATHENA_WORKGROUP,
+                          statistics=statistics)
+    metrics = {'traffic_comparison': daily_comparison(results['daily_totals'], day),
+               'transfer_costs': pd.DataFrame()}
+    if VPC_TRANSFER_CLASSIFY:
+        try:
+            metrics['transfer_costs'] = transfer_costs(results['pair_bytes'], NetworkTopology.from_ec2())
+        except Exception as e:
+            print(f"Error classifying VPC flow transfer costs: {str(e)}")
+    return metrics
+
+def enrich_top_talkers(results, index):
+    """top-talker 표의 IP 컬럼 뒤에 이름(파드 namespace/service, 인스턴스 Name 태그, ENI 설명) 컬럼을 추가"""
+    return {
+        'top_source_ips': enrich(results['top_source_ips'], 'ip', index),
+        'top_dest_ips': enrich(results['top_dest_ips'], 'ip', index),
+        'instance_traffic': enrich(results['instance_traffic'], 'srcaddr', index),
+        'ip_pairs': enrich(enrich(results['ip_pairs'], 'srcaddr', index, {'name': 'src_name'}),
+                           'dstaddr', index, {'name': 'dst_name'}),
+    }
+
+def anomaly_values(results, day):
+    """이상 감지할 day의 지표 값 (전체 전송량 GB, 인스턴스별 bytes, 전체/서비스별 비용)"""
+    values = {}
+    traffic = results.get('traffic_comparison', pd.DataFrame())
+    if not traffic.empty:
+        values['vpc_flow.total_gb'] = traffic['today_gb'].iloc[0]
+    instances = results.get('instance_direction', pd.DataFrame())
+    if not instances.empty:
+        instance_bytes = instances[instances['instance_id'] != '-'].groupby('instance_id')['total_bytes'].sum()
+        values.update({f'vpc_flow.instance_bytes.{instance_id}': total
+                       for instance_id, total in instance_bytes.items()})
+    costs = results.get('service_costs', pd.DataFrame())
+    if not costs.empty:
+        service_costs = costs[costs['date'] == day.isoformat()].groupby('service')['amount'].sum()
+        if not service_costs.empty:
+            values['cost.total'] = service_costs.sum()
+            values.update({f'cost.service.{service}': amount for service, amount in service_costs.items()})
+    return values
+
+def detect_anomalies(results, day):
+    """지표별 EWMA/요일별 기준선과 비교한 결과 (상태 파일은 한 번 읽고 한 번 저장)"""
+    detector = AnomalyDetector(ANOMALY_STATE_LOCATION, name='cost_report')
+    checks = detector.observe_many(anomaly_values(results, day), day)
+    detector.save()
+    return pd.DataFrame(checks, columns=['metric', 'value', 'expected', 'std', 'score', 'seasonal', 'anomaly'])
+
+def get_service_costs(day):
+    """직전달 1일(또는 30일 전 중 이른 날)부터 day까지 서비스별 일별 비용"""
+    start = min((day.replace(day=1) - timedelta(days=1)).replace(day=1), day - timedelta(days=29))
+    history = CostHistory(COST_EXPLORER_CACHE_LOCATION)
+    costs = history.daily_costs(start, day)
+    print(f"Cost Explorer requests: {history.requests}")
+    return costs
+
 def get_data_transfer_metrics():
     kst = pytz.timezone('Asia/Seoul')
     today = datetime.now(kst)
@@ -143,18 +266,6 @@ def get_data_transfer_metrics():
     FROM today, yesterday
     """.format(**query_params)
     
-    traffic_comparison_df = execute_athena_query(traffic_comparison_query, DATABASE_NAME)
-    print("\nQuery results:")
-    print(traffic_comparison_df)
-    
-    if traffic_comparison_df.empty:
-        print("Warning: No results returned from traffic comparison query")
-    else:
-        print("\nTraffic comparison details:")
-        print(f"Today's GB: {traffic_comparison_df['today_gb'].iloc[0]}")
-        print(f"Yesterday's GB: {traffic_comparison_df['yesterday_gb'].iloc[0]}")
-        print(f"Change percentage: {traffic_comparison_df['change_percentage'].iloc[0]}%")
-
     # 소스 IP별 송신 트래픽
     source_ips_query = """
     SELECT 
@@ -239,14 +350,93 @@ def get_data_transfer_metrics():
     LIMIT 50
     """.format(**query_params)
 
-    results = {
-        'traffic_comparison': traffic_comparison_df,
-        'top_source_ips': execute_athena_query(source_ips_query, DATABASE_NAME),
-        'top_dest_ips': execute_athena_query(dest_ips_query, DATABASE_NAME),
-        'instance_traffic': execute_athena_query(instance_traffic_query, DATABASE_NAME),
-        'instance_direction': execute_athena_query(instance_direction_query, DATABASE_NAME),
-        'ip_pairs': execute_athena_query(ip_pairs_query, DATABASE_NAME)
-    }
+    # 모든 쿼리를 먼저 제출하고 함께 대기 (전체 시간이 가장 느린 쿼리 시간에 가까워짐)
+    if VPC_FLOW_SINGLE_SCAN:
+        queries = {
+            'traffic_comparison': traffic_comparison_query,
+            'flow_breakdowns': flow_breakdowns_query(query_params)
+        }
+    else:
+        queries = {
+            'traffic_comparison': traffic_comparison_query,
+            'top_source_ips': source_ips_query,
+            'top_dest_ips': dest_ips_query,
+            'instance_traffic': instance_traffic_query,
+            'instance_direction': instance_direction_query,
+            'ip_pairs': ip_pairs_query
+        }
+    if VPC_FLOW_ROLLUP:
+        queries.pop('traffic_comparison')
+    for name, query in queries.items():
+        print(f"\nExecuting query ({name}):")
+        print(query)  # 실제 실행되는 쿼리 출력
+    statistics = {}
+    # 전일 파티션만 조회하므로 같은 날 재실행하면 캐시된 결과를 사용 (스캔 0 byte)
+    cache = QueryCache(ATHENA_CACHE_LOCATION) if is_past_partition(
+        yesterday.year, yesterday.month, yesterday.day) else None
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # 전일/주간 비교는 rollup 단계(미집계 날짜 INSERT INTO → 일자별 합계)를 breakdown 쿼리와 동시에 실행
+        rollup_statistics = {}
+        if VPC_FLOW_ROLLUP:
+            rollup_metrics = executor.submit(get_rollup_metrics, yesterday.date(), rollup_statistics)
+        if COST_EXPLORER_ENABLED:
+            service_costs = executor.submit(get_service_costs, yesterday.date())
+        if IP_ENRICHMENT:
+            # IP 인덱스(ENI/인스턴스/파드 목록)도 쿼리를 기다리는 동안 만듦
+            ip_index = executor.submit(get_ip_index)
+        results = run_queries(queries, DATABASE_NAME, ATHENA_OUTPUT_LOCATION, workgroup=ATHENA_WORKGROUP,
+                              statistics=statistics, cache=cache)
+        results['transfer_costs'] = pd.DataFrame()
+        if VPC_FLOW_ROLLUP:
+            try:
+                results.update(rollup_metrics.result())
+            except Exception as e:
+                print(f"Error computing traffic comparison from rollups: {str(e)}")
+                results['traffic_comparison'] = pd.DataFrame()
+            statistics.update(rollup_statistics)
+        results['service_costs'] = pd.DataFrame()
+        if COST_EXPLORER_ENABLED:
+            try:
+                results['service_costs'] = service_costs.result()
+            except Exception as e:
+                print(f"Error getting service costs from Cost Explorer: {str(e)}")
+        if IP_ENRICHMENT:
+            try:
+                ip_index = ip_index.result()
+            except Exception as e:
+                print(f"Error building IP enrichment index: {str(e)}")
+                ip_index = None
+    for name, df in results.items():
+        print(f"\nQuery results shape ({name}): {df.shape}")
+    # VPC_FLOW_SINGLE_SCAN=true/false 실행 결과를 비교하여 스캔 바이트 절감을 확인
+    for name, stats in statistics.items():
+        print(f"Data scanned ({name}): {format_bytes(stats.get('DataScannedInBytes', 0))}")
+    print(f"Total data scanned ({'single scan' if VPC_FLOW_SINGLE_SCAN else 'per breakdown'}): "
+          f"{format_bytes(scanned_bytes(statistics))}")
+    if VPC_FLOW_SINGLE_SCAN:
+        results.update(split_flow_breakdowns(results.pop('flow_breakdowns')))
+    if IP_ENRICHMENT and ip_index is not None:
+        results.update(enrich_top_talkers(results, ip_index))
+
+    traffic_comparison_df = results['traffic_comparison']
+    print("\nQuery results:")
+    print(traffic_comparison_df)
+    
+    if traffic_comparison_df.empty:
+        print("Warning: No results returned from traffic comparison query")
+    else:
+        print("\nTraffic comparison details:")
+        print(f"Today's GB: {traffic_comparison_df['today_gb'].iloc[0]}")
+        print(f"Yesterday's GB: {traffic_comparison_df['yesterday_gb'].iloc[0]}")
+        print(f"Change percentage: {traffic_comparison_df['change_percentage'].iloc[0]}%")
+
+    results['anomaly_checks'] = pd.DataFrame()
+    if ANOMALY_DETECTION:
+        # 바이트 형식 변환 전의 숫자 값으로 판단
+        try:
+            results['anomaly_checks'] = detect_anomalies(results, yesterday.date())
+        except Exception as e:
+            print(f"Error detecting anomalies: {str(e)}")
 
     # 바이트 형식 변환 적용
     for df_name in ['top_source_ips', 'top_dest_ips', 'instance_traffic', 
@@ -266,15 +456,97 @@ def calculate_data_transfer_cost(gb_amount):
     - 다음 100TB(=102400GB): $0.117/GB
     - 150TB 초과: $0.108/GB
     (100GB 무료 구간은 무시)
+    트래픽 분류 없이 전체를 인터넷 송신으로 볼 때 사용 (분류별 요금은 utils.transfer_cost.PRICING)
     """
-    if gb_amount <= 10240:  # 10TB 이하
-        return gb_amount * 0.126
-    elif gb_amount <= 51200:  # 10TB-50TB
-        return (10240 * 0.126) + ((gb_amount - 10240) * 0.122)
-    elif gb_amount <= 153600:  # 50TB-150TB
-        return (10240 * 0.126) + (40960 * 0.122) + ((gb_amount - 51200) * 0.117)
-    else:  # 150TB 초과
-        return (10240 * 0.126) + (40960 * 0.122) + (102400 * 0.117) + ((gb_amount - 153600) * 0.108)
+    return tiered_cost(gb_amount, PRICING[INTERNET_EGRESS])
+
+# 전송 비용 분류별 Slack 표시 이름
+TRAFFIC_CLASS_NAMES = {
+    'intra_az': '같은 AZ',
+    'cross_az': '다른 AZ',
+    'nat_gateway': 'NAT Gateway',
+    'internet_egress': '인터넷 송신',
+    'internet_ingress': '인터넷 수신',
+    'private_other': '기타 사설망',
+    'unknown': '미분류',
+}
+
+def classified_transfer_cost(metrics, day):
+    """day의 분류별 전송 비용 합 (분류 결과가 없으면 None)"""
+    costs = metrics.get('transfer_costs', pd.DataFrame())
+    if costs.empty:
+        return None
+    return float(costs.loc[costs['dt'] == day.isoformat(), 'cost'].sum())
+
+def format_transfer_breakdown(metrics, day):
+    """day의 분류별 전송량과 비용 (분류 결과가 없으면 수집 예정으로 표시)"""
+    costs = metrics.get('transfer_costs', pd.DataFrame())
+    if costs.empty:
+        return "*트래픽 분류별 비용*\n_데이터 수집 예정_"
+    rows = costs[costs['dt'] == day.isoformat()].sort_values('cost', ascending=False)
+    lines = []
+    for row in rows.itertuples():
+        size = f"{row.gb/1024:.2f} TB" if row.gb > 1024 else f"{row.gb:.2f} GB"
+        lines.append(f"{TRAFFIC_CLASS_NAMES.get(row.traffic_class, row.traffic_class)}: {size} (${row.cost:,.2f})")
+    return "*트래픽 분류별 비용*\n" + "\n".join(lines)
+
+def format_weekly_average(title, gb):
+    """주간 일평균 VPC Flow Logs 전송량과 예상 비용 (rollup 데이터가 없으면 수집 예정으로 표시)"""
+    if gb is None or pd.isna(gb):
+        return f"*{title}*\n_데이터 수집 예정_"
+    gb = float(gb)
+    size = f"{gb/1024:.2f} TB" if gb > 1024 else f"{gb:.2f} GB"
+    return f"*{title}*\n일평균 {size}\n예상 비용: ${calculate_data_transfer_cost(gb):.2f}/일"
+
+def format_cost_summary(metrics, day):
+    """직전달/직전일 총비용 필드와 TOP 10 텍스트 (Cost Explorer 데이터가 없으면 수집 예정으로 표시)"""
+    costs = metrics.get('service_costs', pd.DataFrame())
+    if costs.empty:
+        return ("*직전달 총비용*\n_데이터 수집 예정_", "*직전일 총비용*\n_데이터 수집 예정_",
+                "*🏆 상위 지출 카테고리 TOP 10*\n_데이터 수집 예정_")
+    summary = summarize_costs(costs, day)
+    change = summary['day_change_percentage']
+    top_services = "\n".join(f"{rank}. {service}: ${amount:,.2f}"
+                              for rank, (service, amount) in enumerate(summary['top_services'], 1))
+    return (f"*직전달 총비용*\n{summary['previous_month']}: ${summary['previous_month_total']:,.2f}",
+            f"*직전일 총비용*\n${summary['day_total']:,.2f} ({'+' if change >= 0 else ''}{change:.1f}%)",
+            f"*🏆 상위 지출 카테고리 TOP 10* (최근 30일)\n{top_services}")
+
+# 이상 감지 지표 prefix별 표시 이름과 값 형식
+ANOMALY_METRICS = {
+    'vpc_flow.total_gb': ('VPC Flow Logs 전송량', lambda value: f"{value:,.2f} GB"),
+    'vpc_flow.instance_bytes.': ('인스턴스 전송량', format_bytes),
+    'cost.total': ('전체 비용', lambda value: f"${value:,.2f}"),
+    'cost.service.': ('서비스 비용', lambda value: f"${value:,.2f}"),
+}
+
+def anomaly_check(metrics, metric):
+    """metric의 이상 감지 결과 (기준선이 없으면 None)"""
+    checks = metrics.get('anomaly_checks', pd.DataFrame())
+    if checks.empty or metric not in set(checks['metric']):
+        return None
+    return checks[checks['metric'] == metric].iloc[0]
+
+def format_anomalies(metrics, limit=10):
+    """기준선에서 ANOMALY_SIGMA 이상 벗어난 지표 목록 (벗어난 정도가 큰 순)"""
+    checks = metrics.get('anomaly_checks', pd.DataFrame())
+    if checks.empty:
+        return "_데이터 수집 예정_"
+    anomalies = checks[checks['anomaly']]
+    if anomalies.empty:
+        return f"✅ 이상 없음 ({len(checks)}개 지표 확인)"
+    lines = []
+    for check in anomalies.reindex(anomalies['score'].abs().sort_values(ascending=False).index).head(limit).itertuples():
+        prefix = next(prefix for prefix in ANOMALY_METRICS if check.metric.startswith(prefix))
+        title, format_value = ANOMALY_METRICS[prefix]
+        target = check.metric[len(prefix):]
+        icon = '📈' if check.score > 0 else '📉'
+        lines.append(f"{icon} {title}{f' ({target})' if target else ''}: {format_value(check.value)} "
+                     f"(평소 {format_value(check.expected)}, {check.score:+.1f}σ"
+                     f"{', 같은 요일 기준' if check.seasonal else ''})")
+    if len(anomalies) > limit:
+        lines.append(f"외 {len(anomalies) - limit}개")
+    return "\n".join(lines)
 
 def format_slack_message(metrics):
     try:
@@ -300,6 +572,10 @@ def format_slack_message(metrics):
             ]
             return message
 
+        traffic_comp = metrics['traffic_comparison'].iloc[0]
+        month_total, day_total, top_services = format_cost_summary(
+            metrics, (datetime.now(kst) - timedelta(days=1)).date())
+
         message = [
             {
                 "type": "header",
@@ -324,11 +600,11 @@ def format_slack_message(metrics):
                 "fields": [
                     {
                         "type": "mrkdwn",
-                        "text": "*직전달 총비용*\n_데이터 수집 예정_"
+                        "text": month_total
                     },
                     {
                         "type": "mrkdwn",
-                        "text": "*직전일 총비용*\n_데이터 수집 예정_"
+                        "text": day_total
                     }
                 ]
             },
@@ -348,11 +624,11 @@ def format_slack_message(metrics):
                 "fields": [
                     {
                         "type": "mrkdwn",
-                        "text": "*2주 전 평균*\n_데이터 수집 예정_"
+                        "text": format_weekly_average('2주 전 평균', traffic_comp.get('two_weeks_ago_avg_gb'))
                     },
                     {
                         "type": "mrkdwn",
-                        "text": "*지난주 평균*\n_데이터 수집 예정_"
+                        "text": format_weekly_average('지난주 평균', traffic_comp.get('last_week_avg_gb'))
                     }
                 ]
             },
@@ -364,10 +640,7 @@ def format_slack_message(metrics):
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": "*🏆 상위 지출 카테고리 TOP 10*\n" +
-                           "1️⃣ EC2: _데이터 수집 예정_\n" +
-                           "2️⃣ CloudFront: _데이터 수집 예정_\n" +
-                           "3️⃣ DataTransfer: _데이터 수집 예정_"
+                    "text": top_services
                 }
             },
             {
@@ -385,7 +658,7 @@ def format_slack_message(metrics):
                 "type": "section",
                 "text": {
                     "type": "mrkdwn",
-                    "text": "_데이터 수집 예정_"
+                    "text": format_anomalies(metrics)
                 }
             },
             {
@@ -402,11 +675,14 @@ def format_slack_message(metrics):
         ]
 
         # 현재 보유한 VPC Flow Logs 데이터 추가
-        traffic_comp = metrics['traffic_comparison'].iloc[0]
         today_gb = float(traffic_comp['today_gb'])
         today_size = f"{today_gb/1024:.2f} TB" if today_gb > 1024 else f"{today_gb:.2f} GB"
         change_pct = float(traffic_comp['change_percentage'])
-        estimated_cost = calculate_data_transfer_cost(today_gb)
+        report_day = (datetime.now(kst) - timedelta(days=1)).date()
+        # 분류 결과가 있으면 같은 AZ/다른 AZ/NAT/인터넷별 요금, 없으면 전체를 인터넷 송신 요금으로 계산
+        estimated_cost = classified_transfer_cost(metrics, report_day)
+        if estimated_cost is None:
+            estimated_cost = calculate_data_transfer_cost(today_gb)
         unique_sources = int(traffic_comp['today_unique_sources'])
         unique_destinations = int(traffic_comp['today_unique_destinations'])
         unique_sources_str = f"{unique_sources:,}개"
@@ -414,7 +690,9 @@ def format_slack_message(metrics):
 
         # 비용 증감률 계산
         yesterday_gb = float(traffic_comp['yesterday_gb'])
-        estimated_cost_yesterday = calculate_data_transfer_cost(yesterday_gb)
+        estimated_cost_yesterday = classified_transfer_cost(metrics, report_day - timedelta(days=1))
+        if estimated_cost_yesterday is None:
+            estimated_cost_yesterday = calculate_data_transfer_cost(yesterday_gb)
         if estimated_cost_yesterday == 0:
             cost_change_pct = 0.0
         else:
@@ -454,20 +732,27 @@ def format_slack_message(metrics):
                     },
                     {
                         "type": "mrkdwn",
-                        "text": "*기타 전송량*\n_데이터 수집 예정_"
+                        "text": format_transfer_breakdown(metrics, report_day)
                     }
                 ]
             }
         ])
 
-        # 경고 메시지 (필요한 경우)
-        if change_pct > 30:
+        # 경고 메시지 (필요한 경우). 이상 감지 기준선이 쌓이기 전에는 전일 대비 30% 증가로 판단
+        warning = None
+        total_check = anomaly_check(metrics, 'vpc_flow.total_gb')
+        if total_check is not None:
+            if total_check['anomaly'] and total_check['score'] > 0:
+                warning = f"⚠️ *VPC Flow Logs 트래픽이 평소보다 {total_check['score']:.1f}σ 증가했습니다!*"
+        elif change_pct > 30:
+            warning = "⚠️ *VPC Flow Logs 트래픽이 전일 대비 30% 이상 증가했습니다!*"
+        if warning:
             message.append({
                 "type": "context",
                 "elements": [
                     {
                         "type": "mrkdwn",
-                        "text": "⚠️ *VPC Flow Logs 트래픽이 전일 대비 30% 이상 증가했습니다!*"
+                        "text": warning
                     }
                 ]
             })
@@ -493,6 +778,24 @@ def format_slack_message(metrics):
             }
         ]
 
+# 상세 표의 컬럼별 헤더 (enrich로 추가된 이름 컬럼 포함)
+DETAIL_HEADERS = {
+    'top_source_ips': {'ip': 'IP', 'name': '이름', 'total_bytes_sent': '전송량', 'request_count': '요청 수'},
+    'top_dest_ips': {'ip': 'IP', 'name': '이름', 'total_bytes_received': '수신량', 'request_count': '요청 수'},
+    'instance_traffic': {'instance_id': 'Instance ID', 'srcaddr': 'Source IP', 'name': '이름',
+                         'total_bytes': '총 전송량', 'total_packets': '패킷 수'},
+    'instance_direction': {'instance_id': 'Instance ID', 'flow_direction': '방향', 'total_bytes': '전송량',
+                           'connection_count': '연결 수'},
+    'ip_pairs': {'action': 'Action', 'interface_id': 'Interface ID', 'instance_id': 'Instance ID',
+                 'flow_direction': '방향', 'log_status': 'Status', 'srcaddr': 'Source IP', 'src_name': 'Source 이름',
+                 'srcport': 'Source Port', 'dstaddr': 'Dest IP', 'dst_name': 'Dest 이름', 'dstport': 'Dest Port',
+                 'protocol': 'Protocol', 'total_bytes': '전송량'},
+}
+
+def format_detail_table(metrics, name):
+    df = metrics[name]
+    return tabulate(df, headers=[DETAIL_HEADERS[name].get(column, column) for column in df.columns], tablefmt='grid')
+
 def format_detail_message(metrics):
     detail_message = []
     
@@ -500,49 +803,27 @@ def format_detail_message(metrics):
     detail_message.append("📊 *데이터 전송 상세 분석*\n")
     detail_message.append("🔹 *송신 트래픽 TOP 10 (Source IP)*")
     if not metrics['top_source_ips'].empty:
-        detail_message.append(tabulate(
-            metrics['top_source_ips'],
-            headers=['IP', '전송량', '요청 수'],
-            tablefmt='grid'
-        ))
+        detail_message.append(format_detail_table(metrics, 'top_source_ips'))
     
     # 수신 트래픽 TOP 10
     detail_message.append("\n🔹 *수신 트래픽 TOP 10 (Destination IP)*")
     if not metrics['top_dest_ips'].empty:
-        detail_message.append(tabulate(
-            metrics['top_dest_ips'],
-            headers=['IP', '수신량', '요청 수'],
-            tablefmt='grid'
-        ))
+        detail_message.append(format_detail_table(metrics, 'top_dest_ips'))
     
     # 인스턴스별 트래픽
     detail_message.append("\n🔹 *인스턴스별 트래픽*")
     if not metrics['instance_traffic'].empty:
-        detail_message.append(tabulate(
-            metrics['instance_traffic'],
-            headers=['Instance ID', 'Source IP', '총 전송량', '패킷 수'],
-            tablefmt='grid'
-        ))
+        detail_message.append(format_detail_table(metrics, 'instance_traffic'))
     
     # 인스턴스별 인바운드/아웃바운드 트래픽
     detail_message.append("\n🔹 *인스턴스별 인바운드/아웃바운드 트래픽*")
     if not metrics['instance_direction'].empty:
-        detail_message.append(tabulate(
-            metrics['instance_direction'],
-            headers=['Instance ID', '방향', '전송량', '연결 수'],
-            tablefmt='grid'
-        ))
+        detail_message.append(format_detail_table(metrics, 'instance_direction'))
     
     # IP 쌍별 트래픽 TOP 50
     detail_message.append("\n🔹 *IP 쌍별 트래픽 TOP 50*")
     if not metrics['ip_pairs'].empty:
-        detail_message.append(tabulate(
-            metrics['ip_pairs'],
-            headers=['Action', 'Interface ID', 'Instance ID', '방향', 'Status', 
-                    'Source IP', 'Source Port', 'Dest IP', 'Dest Port', 
-                    'Protocol', '전송량'],
-            tablefmt='grid'
-        ))
+        detail_message.append(format_detail_table(metrics, 'ip_pairs'))
     
     return "\n".join(detail_message)
 
@@ -1,20 +1,23 @@
 import os
-import boto3
-import time
-import pandas as pd
 import pytz
-from datetime import datetime
+from datetime import datetime, timedelta
 from slackbot import slack
 from tabulate import tabulate
+from utils.anomaly import AnomalyDetector
+from utils.athena import read_results, wait_for_query
+from utils.athena_cache import QueryCache, is_past_partition
+from utils.aws_clients import get_client
 
 
 # AWS 및 Slack 클라이언트 설정
-athena_client = boto3.client('athena')
-s3_client = boto3.client('s3')
+athena_client = get_client('athena')
+s3_client = get_client('s3')
 s3_bucket = 'demo-services-alb-access-log'
 database = 'demo_services_alb_access_log'  # 사용할 Athena 데이터베이스
 SLACK_CHANNEL_ID = os.getenv('SLACK_CHANNEL_ID', 'C07A8FBE2Q6') # Slack 채널 ID
 ATHENA_TABLE = os.getenv('ALB_ACCESS_LOG_TABLE', 'alb_access_logs_all')  # 사용할 Athena 테이블
+# ALB별 송신 bytes 이상 감지 상태 파일 위치 (ANOMALY_SIGMA, 기본 3)
+ANOMALY_STATE_LOCATION = os.getenv('ANOMALY_STATE_LOCATION', f's3://{s3_bucket}/anomaly-state/')
 
 # 현재 시간
 kst = pytz.timezone('Asia/Seoul')
@@ -32,67 +35,82 @@ WITH api_usage AS (
            SPLIT_PART(request_url, '?', 1) AS request_path, 
            request_verb AS method,
            COUNT(*) AS request_count, 
-           SUM(sent_bytes) AS total_sent_bytes
+           SUM(sent_bytes) AS total_sent_bytes,
+           -- 상위 50개에 들지 않은 경로까지 포함한 ALB별 전체 송신 bytes
+           SUM(SUM(sent_bytes)) OVER (PARTITION BY alb_name) AS alb_total_sent_bytes,
+           ROW_NUMBER() OVER (ORDER BY SUM(sent_bytes) DESC) AS path_rank,
+           ROW_NUMBER() OVER (PARTITION BY alb_name ORDER BY SUM(sent_bytes) DESC) AS alb_rank
       FROM {ATHENA_TABLE} 
       WHERE year = {year}
         AND month = {month}
         AND day = {day}
       GROUP BY request_verb, alb_name, SPLIT_PART(request_url, '?', 1)
-      ORDER BY total_sent_bytes DESC
-      LIMIT 50
 )
+-- 상위 50개 경로와, 상위 50개에 경로가 없는 ALB도 전체 송신 bytes를 알 수 있도록 ALB별 첫 행
 SELECT alb_name,
        request_path,
        method,
        request_count,
        total_sent_bytes,
-       total_sent_bytes / request_count AS avg_sent_bytes_per_request
+       total_sent_bytes / request_count AS avg_sent_bytes_per_request,
+       alb_total_sent_bytes,
+       path_rank
   FROM api_usage
+ WHERE path_rank <= 50
+    OR alb_rank = 1
+ ORDER BY path_rank
 """
 
 # 쿼리 실행 시간 기록
 start_time = datetime.now()
 
 # Athena 쿼리 실행
-response = athena_client.start_query_execution(
-    QueryString=query,
-    QueryExecutionContext={'Database': database},
-    ResultConfiguration={'OutputLocation': f's3://{s3_bucket}/athena-results/'}
-)
-
-query_execution_id = response['QueryExecutionId']
+# 지난 날짜 파티션은 바뀌지 않으므로 재실행 시 캐시된 결과를 사용 (ATHENA_CACHE_BYPASS=true이면 항상 새로 실행)
+cache = QueryCache(os.getenv('ATHENA_CACHE_LOCATION', f's3://{s3_bucket}/athena-cache/'))
+query_params = {
+    'QueryString': query,
+    'QueryExecutionContext': {'Database': database},
+    'ResultConfiguration': {'OutputLocation': f's3://{s3_bucket}/athena-results/'}
+}
+if is_past_partition(year, month, day):
+    query_execution_id, _ = cache.start_query(athena_client, query_params)
+else:
+    query_execution_id = athena_client.start_query_execution(**query_params)['QueryExecutionId']
 
-# 쿼리 결과가 완료될 때까지 대기
-while True:
-    query_status = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-    status = query_status['QueryExecution']['Status']['State']
-    
-    if status in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-        break
-    time.sleep(5)
+# 쿼리 완료 대기 (backoff 간격으로 확인하고 ATHENA_QUERY_TIMEOUT이 지나면 취소)
+query_execution = wait_for_query(query_execution_id, client=athena_client, name='alb_access_log_report')
+status = query_execution['Status']['State']
 
 end_time = datetime.now()
 
 if status == 'SUCCEEDED':
-    # 쿼리 결과 가져오기
-    result = athena_client.get_query_results(QueryExecutionId=query_execution_id)
-    
-    # 결과를 데이터프레임으로 변환
-    rows = result['ResultSet']['Rows']
-    header = [col['VarCharValue'] for col in rows[0]['Data']]
-    data = [[col.get('VarCharValue', None) for col in row['Data']] for row in rows[1:]]
-    df = pd.DataFrame(data, columns=header)
+    # 쿼리 결과 가져오기 (모든 페이지, 컬럼 타입 적용)
+    df = read_results(query_execution_id, client=athena_client)
+
+    # ALB별 전체 송신 bytes를 EWMA/요일별 기준선과 비교
+    detector = AnomalyDetector(ANOMALY_STATE_LOCATION, name='alb_access_log_report')
+    alb_sent_bytes = df.groupby('alb_name')['alb_total_sent_bytes'].first()
+    checks = detector.observe_many({f'alb.sent_bytes.{alb_name}': sent_bytes
+                                    for alb_name, sent_bytes in alb_sent_bytes.items()},
+                                   (now - timedelta(days=1)).date())
+    detector.save()
+    anomalies = [
+        f"{'📈' if check['score'] > 0 else '📉'} {check['metric'][len('alb.sent_bytes.'):]}: "
+        f"{check['value'] / 1024 ** 3:,.2f} GB (평소 {check['expected'] / 1024 ** 3:,.2f} GB, {check['score']:+.1f}σ)"
+        for check in checks if check['anomaly']
+    ]
 
     # 데이터프레임을 테이블 형식의 문자열로 변환
-    report = tabulate(df, headers='keys', tablefmt='grid')
+    report = tabulate(df[df['path_rank'] <= 50].drop(columns=['alb_total_sent_bytes', 'path_rank']),
+                      headers='keys', tablefmt='grid')
     
     # Slack에 스니펫으로 업로드
     slack.files_upload_v2(SLACK_CHANNEL_ID, report, f"{year}-{month}-{day}-alb_access_log_report.txt", "*ALB Access Log Report*", (
         f"*Query Start Time:* {start_time}\n"
         f"*Query End Time:* {end_time}"
+        + ("\n*⚠️ 송신량 이상 ALB:*\n" + "\n".join(anomalies) if anomalies else "")
     ))
 else:
     # Athena 쿼리 실패 시 상태와 이유를 출력
-    query_status = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-    reason = query_status['QueryExecution']['Status'].get('StateChangeReason', 'No reason provided')
+    reason = query_execution['Status'].get('StateChangeReason', 'No reason provided')
     print(f"Athena query failed or was cancelled. Reason: {reason}")
\ No newline at end of file
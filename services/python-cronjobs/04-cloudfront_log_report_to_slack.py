@@ -1,14 +1,14 @@
 import os
-import boto3
-import time
-import pandas as pd
 import pytz
 from datetime import datetime
 from slackbot import slack
 from tabulate import tabulate
+from utils.athena import read_results, wait_for_query
+from utils.athena_cache import QueryCache, is_past_partition
+from utils.aws_clients import get_client
 
 # AWS 및 Slack 설정
-athena_client = boto3.client('athena')
+athena_client = get_client('athena')
 s3_bucket = 'demo-cloudfront-logs'
 database = 'demo_cloudfront_logs'
 table_name = 'cloudfront_logs'  # Partition Projection을 사용하는 테이블 이름
@@ -47,31 +47,27 @@ LIMIT 50
 # Athena 쿼리 실행
 start_time = datetime.now()
 
-response = athena_client.start_query_execution(
-    QueryString=query,
-    QueryExecutionContext={'Database': database},
-    ResultConfiguration={'OutputLocation': f's3://{s3_bucket}/athena-results/'}
-)
-
-query_execution_id = response['QueryExecutionId']
+# 지난 날짜 파티션은 바뀌지 않으므로 재실행 시 캐시된 결과를 사용 (ATHENA_CACHE_BYPASS=true이면 항상 새로 실행)
+cache = QueryCache(os.getenv('ATHENA_CACHE_LOCATION', f's3://{s3_bucket}/athena-cache/'))
+query_params = {
+    'QueryString': query,
+    'QueryExecutionContext': {'Database': database},
+    'ResultConfiguration': {'OutputLocation': f's3://{s3_bucket}/athena-results/'}
+}
+if is_past_partition(year, month, day):
+    query_execution_id, _ = cache.start_query(athena_client, query_params)
+else:
+    query_execution_id = athena_client.start_query_execution(**query_params)['QueryExecutionId']
 
-# 쿼리 완료 대기
-while True:
-    query_status = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-    status = query_status['QueryExecution']['Status']['State']
-    if status in ['SUCCEEDED', 'FAILED', 'CANCELLED']:
-        break
-    time.sleep(5)
+# 쿼리 완료 대기 (backoff 간격으로 확인하고 ATHENA_QUERY_TIMEOUT이 지나면 취소)
+query_execution = wait_for_query(query_execution_id, client=athena_client, name='cloudfront_report')
+status = query_execution['Status']['State']
 
 end_time = datetime.now()
 
 if status == 'SUCCEEDED':
-    # 결과 받아오기
-    result = athena_client.get_query_results(QueryExecutionId=query_execution_id)
-    rows = result['ResultSet']['Rows']
-    header = [col['VarCharValue'] for col in rows[0]['Data']]
-    data = [[col.get('VarCharValue', None) for col in row['Data']] for row in rows[1:]]
-    df = pd.DataFrame(data, columns=header)
+    # 결과 받아오기 (모든 페이지, 컬럼 타입 적용)
+    df = read_results(query_execution_id, client=athena_client)
 
     # 표로 변환
     report = tabulate(df, headers='keys', tablefmt='grid')
@@ -88,5 +84,5 @@ if status == 'SUCCEEDED':
         )
     )
 else:
-    reason = query_status['QueryExecution']['Status'].get('StateChangeReason', 'No reason provided')
+    reason = query_execution['Status'].get('StateChangeReason', 'No reason provided')
     print(f"Athena query failed or was cancelled. Reason: {reason}")
@@ -1,10 +1,10 @@
-import boto3
 import os
 import re
 import logging
-import time
 from datetime import datetime
 from slackbot import slack
+from utils.athena import iter_rows, wait_for_query
+from utils.aws_clients import get_client
 
 # 로깅 설정
 logging.basicConfig(
@@ -17,8 +17,8 @@ logging.basicConfig(
 logger = logging.getLogger("ALB_Table_Updater")
 
 # AWS 클라이언트 초기화
-s3_client = boto3.client('s3')
-athena_client = boto3.client('athena')
+s3_client = get_client('s3')
+athena_client = get_client('athena')
 
 # 설정
 ACCESS_LOG_BUCKET = "demo-services-alb-access-log"
@@ -35,25 +35,15 @@ SLACK_CHANNEL_ID = os.getenv('SLACK_CHANNEL_ID', 'C093LS4945B')
 ACCESS_LOG_OUTPUT = f"s3://{ACCESS_LOG_BUCKET}/athena-results/"
 CONNECTION_LOG_OUTPUT = f"s3://{CONNECTION_LOG_BUCKET}/athena-results/"
 
-def wait_for_query_completion(query_execution_id, max_attempts=60):
-    """쿼리 실행이 완료될 때까지 대기합니다."""
-    attempts = 0
-    while attempts < max_attempts:
-        response = athena_client.get_query_execution(QueryExecutionId=query_execution_id)
-        state = response['QueryExecution']['Status']['State']
-
-        if state == 'SUCCEEDED':
-            return True
-        elif state in ['FAILED', 'CANCELLED']:
-            reason = response['QueryExecution']['Status'].get('StateChangeReason', 'Unknown error')
-            logger.error(f"Query failed: {reason}")
-            return False
-
-        attempts += 1
-        time.sleep(1)
-
-    logger.error(f"Query timed out after {max_attempts} attempts")
-    return False
+def wait_for_query_completion(query_execution_id, timeout=60):
+    """쿼리 실행이 완료될 때까지 대기합니다. (timeout 초가 지나면 쿼리를 취소)"""
+    execution = wait_for_query(query_execution_id, client=athena_client, timeout=timeout)
+    state = execution['Status']['State']
+    if state != 'SUCCEEDED':
+        reason = execution['Status'].get('StateChangeReason', 'Unknown error')
+        logger.error(f"Query failed: {reason}")
+        return False
+    return True
 
 def get_current_albs_from_table(table_name):
     """Athena 테이블에서 현재 설정된 ALB 목록을 가져옵니다."""
@@ -78,52 +68,40 @@ def get_current_albs_from_table(table_name):
             logger.error(f"Query failed for {table_name}")
             return []
 
-        # 결과 가져오기
-        result = athena_client.get_query_results(
-            QueryExecutionId=query_execution_id
-        )
-
-        # 결과 구조 로깅
-        # logger.info(f"Query result structure: {result.keys()}")
-        # logger.info(f"ResultSet structure: {result['ResultSet'].keys()}")
-        # logger.info(f"Number of rows: {len(result['ResultSet']['Rows'])}")
-
-        # 첫 번째 행은 헤더이므로 건너뜀
-        for i, row in enumerate(result['ResultSet']['Rows'][1:], 1):
-            if len(row['Data']) >= 1 and 'VarCharValue' in row['Data'][0]:
-                # 각 행의 첫 번째 열 값 확인
-                cell_value = row['Data'][0]['VarCharValue']
-                logger.debug(f"Row {i} value: {cell_value}")
-
-                # 문자열에서 키와 값 분리
-                if 'projection.alb_name.values' in cell_value:
-                    # 탭이나 여러 공백으로 분리되어 있을 수 있음
-                    parts = re.split(r'\s{2,}|\t', cell_value)
-                    if len(parts) >= 2:
-                        key = parts[0].strip()
-                        value = parts[1].strip()
-                        if key == 'projection.alb_name.values':
-                            logger.info(f"Found ALB values for {table_name}")
-                            return value.split(',')
+        # 모든 페이지의 결과에서 각 행의 첫 번째 열 값만 가져옴 (첫 번째 행은 헤더이므로 건너뜀)
+        cell_values = [row[0] for row in iter_rows(query_execution_id, athena_client)
+                       if row and row[0] is not None]
+        # logger.info(f"Number of rows: {len(cell_values)}")
+
+        for i, cell_value in enumerate(cell_values, 1):
+            logger.debug(f"Row {i} value: {cell_value}")
+
+            # 문자열에서 키와 값 분리
+            if 'projection.alb_name.values' in cell_value:
+                # 탭이나 여러 공백으로 분리되어 있을 수 있음
+                parts = re.split(r'\s{2,}|\t', cell_value)
+                if len(parts) >= 2:
+                    key = parts[0].strip()
+                    value = parts[1].strip()
+                    if key == 'projection.alb_name.values':
+                        logger.info(f"Found ALB values for {table_name}")
+                        return value.split(',')
 
         # 속성을 찾지 못한 경우, 모든 행의 값을 로깅
         logger.error(f"projection.alb_name.values property not found for {table_name}")
         logger.error("Available keys:")
-        for i, row in enumerate(result['ResultSet']['Rows'][1:], 1):
-            if len(row['Data']) >= 1 and 'VarCharValue' in row['Data'][0]:
-                logger.error(f"  - {row['Data'][0]['VarCharValue']}")
+        for cell_value in cell_values:
+            logger.error(f"  - {cell_value}")
 
         # 로그에서 값을 직접 추출 시도
-        for i, row in enumerate(result['ResultSet']['Rows'][1:], 1):
-            if len(row['Data']) >= 1 and 'VarCharValue' in row['Data'][0]:
-                cell_value = row['Data'][0]['VarCharValue']
-                if 'projection.alb_name.values' in cell_value:
-                    # 정규식을 사용하여 값 부분만 추출
-                    match = re.search(r'projection\.alb_name\.values\s+(.*)', cell_value)
-                    if match:
-                        value = match.group(1).strip()
-                        logger.info(f"Extracted ALB values from log for {table_name}")
-                        return value.split(',')
+        for cell_value in cell_values:
+            if 'projection.alb_name.values' in cell_value:
+                # 정규식을 사용하여 값 부분만 추출
+                match = re.search(r'projection\.alb_name\.values\s+(.*)', cell_value)
+                if match:
+                    value = match.group(1).strip()
+                    logger.info(f"Extracted ALB values from log for {table_name}")
+                    return value.split(',')
 
         # 하드코딩된 기본값 반환 (최후의 수단)
         logger.error(f"Failed to get ALB values for {table_name}, using default values")
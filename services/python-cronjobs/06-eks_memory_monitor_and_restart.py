@@ -11,9 +11,9 @@ import time
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 import json
+from utils.aws_clients import get_client
 
 # Kubernetes 클라이언트
 try:
@@ -129,8 +129,8 @@ class EKSMemoryMonitor:
         
         # AWS 클라이언트 초기화 (EKS 클러스터 정보 조회용)
         try:
-            self.ec2_client = boto3.client('ec2', region_name=self.region)
-            self.eks_client = boto3.client('eks', region_name=self.region)
+            self.ec2_client = get_client('ec2', region_name=self.region)
+            self.eks_client = get_client('eks', region_name=self.region)
             print(f"AWS 클라이언트 초기화 완료 (리전: {self.region})")
         except Exception as e:
             print(f"AWS 클라이언트 초기화 실패: {e}")
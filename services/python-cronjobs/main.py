@@ -1,22 +1,41 @@
+import os
 import sys
+import time
 import logging
+import resource
 import colorlog
 import argparse
 import traceback
-import requests
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
 from utils.config import configs
+from utils.slack_handler import SlackHandler
 
 ENABLE_SLACK = configs['enableSlack']
+ENABLE_METRICS = os.getenv('ENABLE_METRICS', 'true').lower() != 'false'
 
 # 인자 파서 설정
 parser = argparse.ArgumentParser()
 parser.add_argument('--level', help='Set log level', default='INFO')
-parser.add_argument('--name', help='Set job name', required=True)
-parser.add_argument('--files', nargs='+', help='Python files to execute', required=True)
+parser.add_argument('--name', help='Set job name')
+parser.add_argument('--files', nargs='+', help='Python files to execute')
+parser.add_argument('--serve', action='store_true', help='Run cronJobs from helm values in one warm scheduler process')
+parser.add_argument('--values', help='Helm values file to read cronJobs from (--serve)',
+                    default=os.getenv('CRONJOBS_VALUES', '.helm/demo-cronjobs-prod-values.yaml'))
+parser.add_argument('--jobs', nargs='+', help='cronJobs names to schedule (--serve, default: all)')
+parser.add_argument('--parallel', type=int, default=0, help='Run --files in N isolated worker processes')
+parser.add_argument('--timeout', type=float, help='Wall-clock timeout in seconds per file (--parallel)')
+parser.add_argument('--max-rss-mb', type=float, help='RSS limit in MB per file worker (--parallel)')
+parser.add_argument('--profile-startup', action='store_true', help='Print per-module import time tree for each --files entry and exit')
 args = parser.parse_args()
 
+if not args.serve and not (args.name and args.files):
+  parser.error('--name and --files are required unless --serve is set')
+
+if args.profile_startup:
+  from utils.startup_profiler import find_top_level_imports, profile_files
+
+  print(profile_files(args.files, find_top_level_imports(__file__)))
+  sys.exit(0)
+
 # class SlackHandler(logging.Handler):
 #     def __init__(self, channel, token):
 #         logging.Handler.__init__(self)
@@ -34,67 +53,169 @@ args = parser.parse_args()
 #         except SlackApiError as e:
 #             print(f"Error sending message to Slack: {e.response['error']}")
 
-class SlackHandler(logging.Handler):
-    def __init__(self, webhook_url):
-        logging.Handler.__init__(self)
-        self.webhook_url = webhook_url
-
-    def emit(self, record):
-        log_entry = self.format(record)
-        headers = {'Content-type': 'application/json'}
-        data = {"text": log_entry}
-        try:
-            response = requests.post(self.webhook_url, headers=headers, json=data)
-            response.raise_for_status()
-        except requests.exceptions.HTTPError as err:
-            print(f"Error sending message to Slack: {err}")
-
 # 로그 설정
 log_level = getattr(logging, args.level.upper(), None)
 if not isinstance(log_level, int):
   raise ValueError(f'Invalid log level: {args.level}')
 
-job_name = args.name
+job_name = args.name or 'serve'
 
 
 logger = logging.getLogger(__name__)
 logger.setLevel(log_level)
-stream_handler = logging.StreamHandler(stream=sys.stdout)
-
-stream_fmt = colorlog.ColoredFormatter(
-    f"[%(asctime)s] | [%(levelname)s] | [⏰] Python기반 CronJob 실행({job_name})\n%(message)s",
-    datefmt="%m/%d/%Y, %I:%M:%S %p"
-)
-
-slack_fmt = logging.Formatter(
-    f"*[%(asctime)s]* | *[%(levelname)s]* | *[⏰] Python기반 CronJob 실행({job_name})*\n[❌] %(message)s",
-    datefmt="%m/%d/%Y, %I:%M:%S %p"
-)
-
-stream_handler.setFormatter(stream_fmt)
-logger.addHandler(stream_handler)
 
-# Slack 핸들러 추가
-# slack_handler = SlackHandler(channel='C07A8FBE2Q6', token=configs['slackToken'])
-if ENABLE_SLACK:
-  slack_handler = SlackHandler(webhook_url=configs['slackWebhookUrl'])
-  slack_handler.setFormatter(slack_fmt)
-  slack_handler.setLevel(logging.ERROR)
-  logger.addHandler(slack_handler)
+# utils 모듈(athena, mongodb_manager 등)의 logging.getLogger(__name__) 로그도 Job 출력에 포함
+utils_logger = logging.getLogger('utils')
+utils_logger.setLevel(log_level)
+
+def setup_logger(job_name):
+  """job 이름이 포함된 stream/Slack 핸들러를 logger에, stream 핸들러를 utils logger에 (재)설정"""
+  for target in (logger, utils_logger):
+    for handler in list(target.handlers):
+      target.removeHandler(handler)
+      handler.close()
+
+  stream_handler = logging.StreamHandler(stream=sys.stdout)
+
+  stream_fmt = colorlog.ColoredFormatter(
+      f"[%(asctime)s] | [%(levelname)s] | [⏰] Python기반 CronJob 실행({job_name})\n%(message)s",
+      datefmt="%m/%d/%Y, %I:%M:%S %p"
+  )
+
+  slack_fmt = logging.Formatter(
+      f"*[%(asctime)s]* | *[%(levelname)s]* | *[⏰] Python기반 CronJob 실행({job_name})*\n[❌] %(message)s",
+      datefmt="%m/%d/%Y, %I:%M:%S %p"
+  )
+
+  stream_handler.setFormatter(stream_fmt)
+  logger.addHandler(stream_handler)
+  utils_logger.addHandler(stream_handler)
+
+  # Slack 핸들러 추가
+  # slack_handler = SlackHandler(channel='C07A8FBE2Q6', token=configs['slackToken'])
+  if ENABLE_SLACK:
+    slack_handler = SlackHandler(webhook_url=configs['slackWebhookUrl'])
+    slack_handler.setFormatter(slack_fmt)
+    slack_handler.setLevel(logging.ERROR)
+    logger.addHandler(slack_handler)
+
+setup_logger(job_name)
+
+class LazySlackClient:
+  """첫 사용 시점에 slack_sdk WebClient를 생성 (slack_sdk import 비용을 사용하는 Job만 지불)"""
+  def __init__(self, token):
+    self._token = token
+    self._client = None
+
+  def __getattr__(self, name):
+    if self._client is None:
+      from slack_sdk import WebClient
+      self._client = WebClient(token=self._token)
+    return getattr(self._client, name)
 
 # Slack 클라이언트 설정
 slack_token = configs['slackToken']
-client = WebClient(token=slack_token)
-
-# 실행할 파이썬 파일들
-python_files = args.files
-
-for file in python_files:
-  try:
-    # 파이썬 파일 실행
-    exec(open(file).read())
-    logger.info(f'{file} executed successfully')
-  except Exception as e:
-    # 스택 추적 캡처
-    stack_trace = traceback.format_exc()
-    logger.error(f'Error executing {file}: {e}\n{stack_trace}')
\ No newline at end of file
+client = LazySlackClient(token=slack_token)
+
+metrics = None
+
+def setup_metrics(job_name):
+  """파일별 실행 시간, 종료 상태, 메모리, CPU, API 호출 메트릭을 DogStatsD로 전송하도록 설정"""
+  global metrics
+  if not ENABLE_METRICS:
+    return
+  from utils.metrics import JobMetrics
+
+  metrics = JobMetrics(job_name)
+  metrics.tracker.install()
+
+def run_files(python_files, isolated=False):
+  """파이썬 파일들을 순서대로 실행하고 실패한 파일 수를 반환
+
+  isolated=True 이면 각 파일을 runner 전역 변수의 복사본에서 실행하여
+  한 파일이 남긴 전역 변수가 다음 파일에 영향을 주지 않도록 한다.
+  """
+  from utils.parallel_runner import max_rss_mb
+
+  failures = 0
+  for file in python_files:
+    started = time.monotonic()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    if metrics:
+      metrics.start_file()
+    status = 'success'
+    try:
+      # 파이썬 파일 실행
+      with open(file) as f:
+        code = compile(f.read(), file, 'exec')
+      exec(code, dict(globals()) if isolated else globals())
+      logger.info(f'{file} executed successfully')
+    except Exception as e:
+      # 스택 추적 캡처
+      stack_trace = traceback.format_exc()
+      logger.error(f'Error executing {file}: {e}\n{stack_trace}')
+      failures += 1
+      status = 'failed'
+    if metrics:
+      finished = resource.getrusage(resource.RUSAGE_SELF)
+      cpu_seconds = (finished.ru_utime + finished.ru_stime) - (usage.ru_utime + usage.ru_stime)
+      metrics.finish_file(file, status, time.monotonic() - started, max_rss_mb(finished), cpu_seconds)
+  return failures
+
+def run_files_parallel(python_files, parallel, timeout=None, max_rss_mb=None):
+  """파이썬 파일들을 파일별 워커 프로세스에서 병렬로 실행하고 실패한 파일 수를 반환"""
+  from utils.parallel_runner import (
+      STATUS_CRASHED, STATUS_MEMORY_LIMIT, STATUS_SUCCESS, STATUS_TIMEOUT, format_summary, run_parallel,
+  )
+
+  started = time.monotonic()
+  results = run_parallel(
+      python_files,
+      lambda file: run_files([file], isolated=True) == 0,
+      max_workers=parallel,
+      timeout=timeout,
+      max_rss_mb=max_rss_mb,
+  )
+  failures = sum(1 for result in results if result['status'] != STATUS_SUCCESS)
+  if metrics:
+    # 정상 종료한 워커는 직접 메트릭을 전송하므로, 강제 종료/비정상 종료된 파일만 여기서 전송
+    for result in results:
+      if result['status'] in (STATUS_TIMEOUT, STATUS_MEMORY_LIMIT, STATUS_CRASHED):
+        metrics.start_file()
+        metrics.finish_file(result['file'], result['status'], result['duration'], result['peak_rss_mb'])
+  summary = format_summary(results, time.monotonic() - started)
+  if failures:
+    logger.error(f'Parallel execution summary\n{summary}')
+  else:
+    logger.info(f'Parallel execution summary\n{summary}')
+  return failures
+
+def execute(python_files, parallel=0, timeout=None, max_rss_mb=None):
+  if parallel > 0:
+    return run_files_parallel(python_files, parallel, timeout, max_rss_mb)
+  return run_files(python_files)
+
+def run_scheduled_job(job):
+  """--serve 모드에서 fork된 자식 프로세스가 cronJob 하나를 실행"""
+  os.environ.update(job['env'])
+  logger.setLevel(getattr(logging, job['level'].upper(), log_level))
+  utils_logger.setLevel(logger.level)
+  setup_logger(job['job_name'])
+  setup_metrics(job['job_name'])
+  sys.argv = [sys.argv[0], '--name', job['job_name'], '--files', *job['files']]
+  if job['parallel'] > 0:
+    failures = run_files_parallel(job['files'], job['parallel'], job['timeout'], job['max_rss_mb'])
+  else:
+    failures = run_files(job['files'], isolated=True)
+  sys.exit(1 if failures else 0)
+
+if args.serve:
+  from utils.scheduler import CronJobScheduler, load_cron_jobs, preload
+
+  jobs = load_cron_jobs(args.values, args.jobs)
+  preload([file for job in jobs for file in job['files']], logger)
+  CronJobScheduler(jobs, run_scheduled_job, logger).start()
+else:
+  setup_metrics(job_name)
+  # 실행할 파이썬 파일들
+  execute(args.files, args.parallel, args.timeout, args.max_rss_mb)
@@ -0,0 +1,9 @@
+"""
+CronJob 오프라인 벤치마크
+
+AWS(botocore before-call), Kubernetes API, Slack Web API, PagerDuty를 로컬 가짜 응답으로 대체하여
+네트워크 없이 각 Job을 실행하고 wall time, API 호출 수, polling sleep 시간, 최대 메모리를 측정한다.
+
+    python -m tests.benchmarks.run_jobs --output before.json
+    python -m tests.benchmarks.run_jobs --compare before.json
+"""
@@ -0,0 +1,99 @@
+"""
+차트 렌더링 벤치마크: 기존 pyplot 방식(figure를 닫지 않음)과 utils.charts 비교
+
+각 방식을 별도 자식 프로세스에서 실행하여 charts/s와 렌더링 전후 RSS를 출력한다.
+
+    python -m tests.benchmarks.charts --renders 100 --processes 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils import charts  # noqa: E402
+from utils.parallel_runner import read_rss_mb  # noqa: E402
+
+
+def engagement_frame(days: int = 30, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({column: rng.random(days) * 10 for column, *_ in charts.ENGAGEMENT_PANELS},
+                        index=pd.date_range('2024-01-01', periods=days, freq='D'))
+
+
+def render_pyplot(dataframe: pd.DataFrame, file: str) -> str:
+    """변경 전 plot_graphs와 같은 방식 (전역 pyplot figure, close 없음)"""
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(14, 8))
+    for number, (column, title, ylabel, color, label) in enumerate(charts.ENGAGEMENT_PANELS, start=1):
+        plt.subplot(3, 1, number)
+        plt.plot(dataframe.index, dataframe[column], marker='o', color=color, label=label)
+        plt.title(title)
+        plt.xlabel('Date')
+        plt.ylabel(ylabel)
+        plt.grid(True)
+        plt.ylim(0, dataframe[column].max() * 1.1)
+        plt.legend()
+    plt.tight_layout()
+    plt.tight_layout()
+    plt.savefig(file)
+    return file
+
+
+def run(mode: str, renders: int, processes: int, directory: str, conn) -> None:
+    charts.CHART_DIR = directory
+    frames = [engagement_frame(seed=seed) for seed in range(renders)]
+    # 첫 렌더링의 import/폰트 캐시 비용은 제외
+    charts.render_engagement(frames[0], os.path.join(directory, 'warmup.png'))
+    rss_before = read_rss_mb(os.getpid())['rss_mb']
+
+    started = time.perf_counter()
+    if mode == 'pyplot':
+        for number, frame in enumerate(frames):
+            render_pyplot(frame, os.path.join(directory, f'pyplot{number}.png'))
+    elif mode == 'figure':
+        for frame in frames:
+            charts.render_engagement(frame)
+    else:
+        charts.render_many([(charts.render_engagement, (frame,), {}) for frame in frames], processes)
+    elapsed = time.perf_counter() - started
+
+    conn.send({'elapsed': elapsed, 'rss_before': rss_before, 'rss_after': read_rss_mb(os.getpid())['rss_mb']})
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='차트 렌더링 벤치마크')
+    parser.add_argument('--renders', type=int, default=100)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    options = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix='chart_benchmark_')
+    context = multiprocessing.get_context('fork')
+    print(f"{'mode':<8} {'charts/s':>9} {'RSS before(MB)':>15} {'RSS after(MB)':>14} {'growth(MB)':>11}")
+    try:
+        for mode in ('pyplot', 'figure', 'pool'):
+            parent, child = context.Pipe(duplex=False)
+            process = context.Process(target=run, args=(mode, options.renders, options.processes, directory, child))
+            process.start()
+            result = parent.recv()
+            process.join()
+            print(f"{mode:<8} {options.renders / result['elapsed']:>9.1f} {result['rss_before']:>15.1f} "
+                  f"{result['rss_after']:>14.1f} {result['rss_after'] - result['rss_before']:>11.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
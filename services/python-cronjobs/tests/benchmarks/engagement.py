@@ -0,0 +1,77 @@
+"""
+getEngagement(사용자별 Python 루프)과 utils.engagement.summarize_engagement(벡터화) 비교
+
+    python -m tests.benchmarks.engagement --events 2000000 --users 50000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.common import getEngagement  # noqa: E402
+from utils.engagement import summarize_engagement  # noqa: E402
+
+
+def generate_logs(events: int, users: int, seed: int = 0) -> pd.DataFrame:
+    """사용자별로 짧은 간격(같은 세션)과 긴 간격(새 세션)이 섞인 로그"""
+    rng = np.random.default_rng(seed)
+    user_ids = rng.integers(0, users, events)
+    gaps = np.where(rng.random(events) < 0.05, rng.integers(301, 7200, events), rng.integers(0, 300, events))
+    frame = pd.DataFrame({'userId': user_ids, 'gap': gaps}).sort_values('userId', kind='stable')
+    offsets = frame.groupby('userId')['gap'].cumsum().to_numpy()
+    frame['createdAt'] = pd.Timestamp('2024-01-01') + pd.to_timedelta(offsets, unit='s')
+    frame['userId'] = frame['userId'].map(lambda value: f'user-{value}').astype('category')
+    return frame[['userId', 'createdAt']].sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def run_baseline(logs: pd.DataFrame):
+    """기존 방식: 사용자별 로그 list를 만든 뒤 getEngagement 호출"""
+    started = time.perf_counter()
+    grouped = {user: group.sort_values('createdAt').to_dict('records')
+               for user, group in logs.groupby('userId', observed=True)}
+    prepared = time.perf_counter()
+    results = {user: getEngagement(items) for user, items in grouped.items()}
+    finished = time.perf_counter()
+    return results, prepared - started, finished - prepared
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='세션 엔진 벤치마크')
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip-baseline', action='store_true', help='getEngagement 실행 생략 (큰 입력용)')
+    options = parser.parse_args(argv)
+
+    logs = generate_logs(options.events, options.users, options.seed)
+    print(f'events: {len(logs):,}, users: {logs["userId"].nunique():,}')
+
+    started = time.perf_counter()
+    summary = summarize_engagement(logs)
+    vectorized = time.perf_counter() - started
+    print(f'summarize_engagement: {vectorized:.2f}s')
+
+    if options.skip_baseline:
+        return 0
+
+    results, prepare_time, loop_time = run_baseline(logs)
+    print(f'getEngagement: {prepare_time + loop_time:.2f}s (list 준비 {prepare_time:.2f}s + 루프 {loop_time:.2f}s)')
+    print(f'speedup: {(prepare_time + loop_time) / vectorized:.1f}x')
+
+    mismatches = [user for user, expected in results.items()
+                  if summary.loc[user, 'sessionCount'] != expected['sessionCount']
+                  or abs(summary.loc[user, 'totalDuration'] - expected['totalDuration']) > 0.01]
+    print(f'mismatched users: {len(mismatches)}')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,564 @@
+"""
+벤치마크용 가짜 AWS/Kubernetes/Slack/PagerDuty 백엔드
+
+- VirtualClock: time.sleep을 대체하여 실제로 기다리지 않고 스레드별 대기 시간만 누적
+- FakeAws: botocore before-call 이벤트에서 응답을 반환 (Athena는 가상 시간 기준으로 RUNNING → SUCCEEDED,
+  Cost Explorer는 최근 며칠이 Estimated인 서비스별 일별 비용)
+- FakeApiServer: Kubernetes API, Slack Web API, PagerDuty를 흉내 내는 로컬 HTTP 서버
+"""
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+import types
+import uuid
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# GetQueryResults 한 페이지의 최대 행 수 (Athena 기본값)
+ATHENA_PAGE_SIZE = 1000
+
+
+class VirtualClock:
+    """time.sleep 대체. 대기 시간은 스레드별로 누적되며 now()에 반영됨"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._slept: Dict[int, float] = {}
+        self.sleep_calls = 0
+
+    def now(self) -> float:
+        return time.monotonic() + self._slept.get(threading.get_ident(), 0.0)
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            ident = threading.get_ident()
+            self._slept[ident] = self._slept.get(ident, 0.0) + max(float(seconds), 0.0)
+            self.sleep_calls += 1
+
+    @property
+    def total_slept(self) -> float:
+        """모든 스레드의 sleep 시간 합"""
+        return sum(self._slept.values())
+
+    @property
+    def max_thread_slept(self) -> float:
+        """가장 오래 sleep한 스레드의 대기 시간 (동시 polling 시 실제 wall time에 더해지는 값)"""
+        return max(self._slept.values(), default=0.0)
+
+    def install(self) -> None:
+        time.sleep = self.sleep
+
+
+# --- AWS ---
+
+class AthenaTable:
+    """가짜 Athena 쿼리 결과. match 문자열이 쿼리에 포함되면 이 결과를 반환"""
+
+    def __init__(self, match: str, columns: Sequence[Tuple[str, str]], rows: int = 10,
+                 values: Optional[List[List[str]]] = None, duration: float = 3.0, scanned_bytes: int = 0):
+        self.match = match
+        self.columns = list(columns)
+        self.rows = rows
+        self.values = values
+        self.duration = duration
+        self.scanned_bytes = scanned_bytes
+
+    def generate(self, seed: int) -> List[List[str]]:
+        if self.values is not None:
+            return self.values
+        rng = random.Random(seed)
+        return [[fake_value(name, type_, index, rng) for name, type_ in self.columns] for index in range(self.rows)]
+
+
+def fake_value(name: str, type_: str, index: int, rng: random.Random) -> str:
+    """컬럼 이름과 타입으로 그럴듯한 값을 생성"""
+    name = name.lower()
+    if type_ in ('bigint', 'integer'):
+        return str(rng.randint(1, 10 ** 9))
+    if type_ == 'double':
+        return f'{rng.uniform(0, 10 ** 9):.2f}'
+    if name.endswith('port'):
+        return str(rng.choice([443, 80, 8080, 27017, 6379, rng.randint(1024, 65535)]))
+    if 'addr' in name or name == 'ip':
+        return f'10.{rng.randint(0, 3)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}'
+    if name == 'instance_id':
+        return f'i-{rng.randint(0, 16 ** 8):08x}'
+    if name == 'interface_id':
+        return f'eni-{rng.randint(0, 16 ** 8):08x}'
+    if name == 'flow_direction':
+        return rng.choice(['ingress', 'egress'])
+    if name == 'action':
+        return 'ACCEPT'
+    if name == 'log_status':
+        return 'OK'
+    if name == 'protocol':
+        return rng.choice(['6', '17'])
+    if name in ('method', 'request_verb'):
+        return rng.choice(['GET', 'POST', 'PUT'])
+    return f'{name}-{index}'
+
+
+class FakeAthena:
+    """StartQueryExecution / GetQueryExecution / GetQueryResults 상태 머신"""
+
+    def __init__(self, clock: VirtualClock, tables: Sequence[AthenaTable], seed: int = 0):
+        self.clock = clock
+        self.tables = list(tables)
+        self.seed = seed
+        self.queries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _find_table(self, query: str) -> Optional[AthenaTable]:
+        for table in self.tables:
+            if table.match in query:
+                return table
+        return None
+
+    @property
+    def scanned_bytes(self) -> int:
+        """실행한 모든 쿼리의 스캔 바이트 합 (Athena 과금 기준)"""
+        return sum(query['table'].scanned_bytes for query in self.queries.values() if query['table'])
+
+    def start_query_execution(self, params: Dict) -> Dict:
+        query_id = str(uuid.uuid4())
+        table = self._find_table(params['QueryString'])
+        with self._lock:
+            self.queries[query_id] = {
+                'query': params['QueryString'],
+                'table': table,
+                'started': self.clock.now(),
+                'rows': None,
+            }
+        return {'QueryExecutionId': query_id}
+
+    def get_query_execution(self, params: Dict) -> Dict:
+        execution = self.queries[params['QueryExecutionId']]
+        table = execution['table']
+        duration = table.duration if table else 1.0
+        elapsed = self.clock.now() - execution['started']
+        state = 'SUCCEEDED' if elapsed >= duration else 'RUNNING'
+        if execution.get('cancelled'):
+            state = 'CANCELLED'
+        return {
+            'QueryExecution': {
+                'QueryExecutionId': params['QueryExecutionId'],
+                'Query': execution['query'],
+                'Status': {'State': state},
+                'Statistics': {
+                    'EngineExecutionTimeInMillis': int(min(elapsed, duration) * 1000),
+                    'DataScannedInBytes': table.scanned_bytes if table else 0,
+                },
+            }
+        }
+
+    def batch_get_query_execution(self, params: Dict) -> Dict:
+        return {
+            'QueryExecutions': [self.get_query_execution({'QueryExecutionId': query_id})['QueryExecution']
+                                for query_id in params['QueryExecutionIds']],
+            'UnprocessedQueryExecutionIds': [],
+        }
+
+    def stop_query_execution(self, params: Dict) -> Dict:
+        self.queries[params['QueryExecutionId']]['cancelled'] = True
+        return {}
+
+    def get_table_metadata(self, params: Dict) -> Dict:
+        # rollup 테이블 등 Job이 확인하는 테이블은 모두 있는 것으로 응답
+        return {'TableMetadata': {'Name': params['TableName'], 'TableType': 'EXTERNAL_TABLE'}}
+
+    def get_query_results(self, params: Dict) -> Dict:
+        execution = self.queries[params['QueryExecutionId']]
+        table = execution['table'] or AthenaTable('', [('result', 'varchar')], rows=0)
+        if execution['rows'] is None:
+            execution['rows'] = table.generate(self.seed + len(self.queries))
+
+        start = int(params.get('NextToken') or 0)
+        page_size = min(params.get('MaxResults', ATHENA_PAGE_SIZE), ATHENA_PAGE_SIZE)
+        rows = []
+        if start == 0:
+            # 첫 페이지의 첫 행은 컬럼 이름 (실제 Athena와 동일)
+            rows.append({'Data': [{'VarCharValue': name} for name, _ in table.columns]})
+            page_size -= 1
+        page = execution['rows'][start:start + page_size]
+        rows.extend({'Data': [{'VarCharValue': value} for value in row]} for row in page)
+
+        response = {
+            'ResultSet': {
+                'Rows': rows,
+                'ResultSetMetadata': {
+                    'ColumnInfo': [{'Name': name, 'Label': name, 'Type': type_} for name, type_ in table.columns],
+                },
+            },
+        }
+        if start + len(page) < len(execution['rows']):
+            response['NextToken'] = str(start + len(page))
+        return response
+
+
+class FakeCostExplorer:
+    """GetCostAndUsage(DAILY, SERVICE별) 응답 (최근 estimated_days일은 Estimated)"""
+
+    SERVICES = ['Amazon Elastic Compute Cloud - Compute', 'Amazon CloudFront', 'EC2 - Other',
+                'Amazon Relational Database Service', 'Amazon Simple Storage Service', 'AWS Data Transfer',
+                'Amazon Elastic Container Service for Kubernetes', 'Amazon ElastiCache', 'AmazonCloudWatch',
+                'Amazon Athena', 'AWS Lambda', 'Amazon Route 53']
+
+    def __init__(self, seed: int = 0, estimated_days: int = 2, page_days: int = 60):
+        self.seed = seed
+        self.estimated_days = estimated_days
+        self.page_days = page_days
+
+    def get_cost_and_usage(self, params: Dict) -> Dict:
+        start = date.fromisoformat(params['TimePeriod']['Start'])
+        end = date.fromisoformat(params['TimePeriod']['End'])
+        offset = int(params.get('NextPageToken') or 0)
+        first = start + timedelta(days=offset)
+        last = min(end, first + timedelta(days=self.page_days))
+        metric = params['Metrics'][0]
+        results = []
+        day = first
+        while day < last:
+            rng = random.Random(f'{self.seed}-{day.isoformat()}')
+            results.append({
+                'TimePeriod': {'Start': day.isoformat(), 'End': (day + timedelta(days=1)).isoformat()},
+                'Total': {},
+                'Groups': [{'Keys': [service],
+                            'Metrics': {metric: {'Amount': f'{rng.uniform(1, 1000 / rank):.4f}', 'Unit': 'USD'}}}
+                           for rank, service in enumerate(self.SERVICES, 1)],
+                'Estimated': (date.today() - day).days <= self.estimated_days,
+            })
+            day += timedelta(days=1)
+        response = {'ResultsByTime': results, 'GroupDefinitions': [{'Type': 'DIMENSION', 'Key': 'SERVICE'}]}
+        if last < end:
+            response['NextPageToken'] = str((last - start).days)
+        return response
+
+
+class FakeAws:
+    """boto3 세션의 모든 client 호출을 가로채 등록된 handler의 응답을 반환"""
+
+    def __init__(self):
+        self.handlers: Dict[str, Callable[[Dict], Dict]] = {}
+
+    def add(self, operation: str, handler) -> None:
+        """operation은 'athena.StartQueryExecution' 형식. handler는 dict 또는 params를 받는 함수"""
+        self.handlers[operation] = handler if callable(handler) else (lambda params, value=handler: value)
+
+    def add_athena(self, athena: FakeAthena) -> None:
+        self.add('athena.StartQueryExecution', athena.start_query_execution)
+        self.add('athena.GetQueryExecution', athena.get_query_execution)
+        self.add('athena.GetQueryResults', athena.get_query_results)
+        self.add('athena.BatchGetQueryExecution', athena.batch_get_query_execution)
+        self.add('athena.StopQueryExecution', athena.stop_query_execution)
+        self.add('athena.GetTableMetadata', athena.get_table_metadata)
+
+    def _before_parameter_build(self, params=None, context=None, **kwargs):
+        if context is not None:
+            context['benchmark_params'] = dict(params or {})
+
+    def _before_call(self, model=None, context=None, **kwargs):
+        from botocore.awsrequest import AWSResponse
+
+        operation = f'{model.service_model.service_name}.{model.name}'
+        handler = self.handlers.get(operation)
+        if handler is None:
+            error = {'Error': {'Code': 'NotStubbed', 'Message': f'{operation} has no fake response'},
+                     'ResponseMetadata': {'HTTPStatusCode': 400}}
+            return AWSResponse(None, 400, {}, None), error
+        response = handler((context or {}).get('benchmark_params', {}))
+        response.setdefault('ResponseMetadata', {'HTTPStatusCode': 200})
+        return AWSResponse(None, 200, {}, None), response
+
+    def install(self, session) -> None:
+        """세션에 등록하므로 이후 이 세션에서 만든 client에 모두 적용됨"""
+        session.events.register('before-parameter-build', self._before_parameter_build,
+                                unique_id='benchmark-fake-aws-params')
+        session.events.register('before-call', self._before_call, unique_id='benchmark-fake-aws')
+
+
+# --- HTTP (Kubernetes / Slack / PagerDuty) ---
+
+class FakeApiServer:
+    """(method, 경로 정규식) → handler(match, query, body) 라우팅을 하는 로컬 HTTP 서버"""
+
+    def __init__(self):
+        self.routes: List[Tuple[str, re.Pattern, Callable]] = []
+        self.requests: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _handle(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, payload = server.dispatch(self.command, self.path, body)
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def route(self, method: str, pattern: str, handler: Callable) -> None:
+        self.routes.append((method, re.compile(f'^{pattern}$'), handler))
+
+    def dispatch(self, method: str, path: str, body: bytes):
+        parsed = urlparse(path)
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(parsed.path)
+            if route_method == method and match:
+                with self._lock:
+                    key = f'{method} {pattern.pattern}'
+                    self.requests[key] = self.requests.get(key, 0) + 1
+                return handler(match, query, body)
+        return 404, {'kind': 'Status', 'status': 'Failure', 'reason': 'NotFound', 'code': 404,
+                     'message': f'{method} {parsed.path} not found'}
+
+    def start(self) -> 'FakeApiServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-api-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FakeKubernetes:
+    """deployment별 파드 수와 메모리 사용률을 설정할 수 있는 Kubernetes API"""
+
+    def __init__(self, server: FakeApiServer, deployments: Sequence[Tuple[str, str]], pods_per_deployment: int = 3,
+                 hot_deployments: Sequence[str] = (), hot_usage: float = 0.9, normal_usage: float = 0.3,
+                 memory_limit_mi: int = 1024, nodes: int = 10):
+        self.deployments = list(deployments)
+        self.pods_per_deployment = pods_per_deployment
+        self.hot_deployments = set(hot_deployments)
+        self.hot_usage = hot_usage
+        self.normal_usage = normal_usage
+        self.memory_limit_mi = memory_limit_mi
+        self.nodes = nodes
+        self.restarts: List[str] = []
+
+        server.route('GET', r'/api/v1/', self._api_resources)
+        server.route('GET', r'/api/v1/namespaces', self._namespaces)
+        server.route('GET', r'/api/v1/nodes', self._nodes)
+        server.route('GET', r'/api/v1/pods', self._all_pods)
+        server.route('GET', r'/api/v1/namespaces/(?P<ns>[^/]+)/pods', self._namespace_pods)
+        server.route('GET', r'/api/v1/namespaces/(?P<ns>[^/]+)/pods/(?P<name>[^/]+)', self._pod)
+        server.route('GET', r'/apis/apps/v1/namespaces/(?P<ns>[^/]+)/deployments/(?P<name>[^/]+)', self._deployment)
+        server.route('PATCH', r'/apis/apps/v1/namespaces/(?P<ns>[^/]+)/deployments/(?P<name>[^/]+)', self._patch)
+        server.route('GET', r'/apis/metrics.k8s.io/v1beta1/namespaces/(?P<ns>[^/]+)/pods/(?P<name>[^/]+)',
+                     self._pod_metrics)
+
+    def _container(self, name: str) -> Dict:
+        return {
+            'name': name,
+            'resources': {
+                'limits': {'memory': f'{self.memory_limit_mi}Mi', 'cpu': '1'},
+                'requests': {'memory': f'{self.memory_limit_mi // 2}Mi', 'cpu': '500m'},
+            },
+        }
+
+    def _pods(self, namespace: Optional[str] = None, app: Optional[str] = None) -> List[Dict]:
+        pods = []
+        for ns, deployment in self.deployments:
+            if (namespace and ns != namespace) or (app and deployment != app):
+                continue
+            for index in range(self.pods_per_deployment):
+                pods.append({
+                    'metadata': {'name': f'{deployment}-{index}', 'namespace': ns, 'labels': {'app': deployment}},
+                    'spec': {'containers': [self._container(deployment)]},
+                    'status': {'phase': 'Running'},
+                })
+        return pods
+
+    def _find_pod(self, namespace: str, name: str) -> Optional[Dict]:
+        for pod in self._pods(namespace):
+            if pod['metadata']['name'] == name:
+                return pod
+        return None
+
+    def _api_resources(self, match, query, body):
+        return 200, {'kind': 'APIResourceList', 'groupVersion': 'v1', 'resources': [
+            {'name': 'pods', 'singularName': 'pod', 'namespaced': True, 'kind': 'Pod', 'verbs': ['get', 'list']},
+            {'name': 'nodes', 'singularName': 'node', 'namespaced': False, 'kind': 'Node', 'verbs': ['get', 'list']},
+        ]}
+
+    def _namespaces(self, match, query, body):
+        names = sorted({ns for ns, _ in self.deployments})
+        return 200, {'kind': 'NamespaceList', 'metadata': {}, 'items': [{'metadata': {'name': ns}} for ns in names]}
+
+    def _nodes(self, match, query, body):
+        return 200, {'kind': 'NodeList', 'metadata': {}, 'items': [
+            {'metadata': {'name': f'node-{index}'}, 'status': {'conditions': [{'type': 'Ready', 'status': 'True'}]}}
+            for index in range(self.nodes)
+        ]}
+
+    def _all_pods(self, match, query, body):
+        return 200, {'kind': 'PodList', 'metadata': {}, 'items': self._pods()}
+
+    def _namespace_pods(self, match, query, body):
+        app = None
+        selector = query.get('labelSelector', '')
+        if selector.startswith('app='):
+            app = selector[len('app='):]
+        return 200, {'kind': 'PodList', 'metadata': {}, 'items': self._pods(match['ns'], app)}
+
+    def _pod(self, match, query, body):
+        pod = self._find_pod(match['ns'], match['name'])
+        if pod is None:
+            return 404, {'kind': 'Status', 'status': 'Failure', 'reason': 'NotFound', 'code': 404}
+        return 200, pod
+
+    def _deployment_body(self, namespace: str, name: str) -> Dict:
+        replicas = self.pods_per_deployment
+        return {
+            'apiVersion': 'apps/v1',
+            'kind': 'Deployment',
+            'metadata': {'name': name, 'namespace': namespace, 'labels': {'app': name},
+                         'creationTimestamp': '2024-01-01T00:00:00Z'},
+            'spec': {
+                'replicas': replicas,
+                'selector': {'matchLabels': {'app': name}},
+                'template': {'metadata': {'labels': {'app': name}}, 'spec': {'containers': [self._container(name)]}},
+            },
+            'status': {'replicas': replicas, 'updatedReplicas': replicas, 'availableReplicas': replicas,
+                       'readyReplicas': replicas},
+        }
+
+    def _deployment(self, match, query, body):
+        if (match['ns'], match['name']) not in self.deployments:
+            return 404, {'kind': 'Status', 'status': 'Failure', 'reason': 'NotFound', 'code': 404}
+        return 200, self._deployment_body(match['ns'], match['name'])
+
+    def _patch(self, match, query, body):
+        self.restarts.append(f"{match['ns']}:{match['name']}")
+        return self._deployment(match, query, body)
+
+    def _pod_metrics(self, match, query, body):
+        pod = self._find_pod(match['ns'], match['name'])
+        if pod is None:
+            return 404, {'kind': 'Status', 'status': 'Failure', 'reason': 'NotFound', 'code': 404}
+        deployment = pod['metadata']['labels']['app']
+        usage = self.hot_usage if deployment in self.hot_deployments else self.normal_usage
+        return 200, {
+            'metadata': {'name': match['name'], 'namespace': match['ns']},
+            'containers': [{'name': deployment, 'usage': {'memory': f'{int(self.memory_limit_mi * usage)}Mi'}}],
+        }
+
+
+class FakeSlack:
+    """Slack Web API (chat.postMessage, files.getUploadURLExternal, files.completeUploadExternal 등)"""
+
+    def __init__(self, server: FakeApiServer):
+        self.server = server
+        self.calls: List[str] = []
+        server.route('POST', r'/api/(?P<method>[\w.]+)', self._api)
+        server.route('POST', r'/upload/(?P<file_id>\w+)', lambda match, query, body: (200, b'OK'))
+
+    def _api(self, match, query, body):
+        method = match['method']
+        self.calls.append(method)
+        if method == 'files.getUploadURLExternal':
+            file_id = f'F{len(self.calls):08d}'
+            return 200, {'ok': True, 'file_id': file_id, 'upload_url': f'{self.server.url}/upload/{file_id}'}
+        if method == 'files.completeUploadExternal':
+            return 200, {'ok': True, 'files': [{'id': f'F{len(self.calls):08d}'}]}
+        return 200, {'ok': True, 'channel': 'C00000000', 'ts': f'{time.time():.6f}'}
+
+
+class FakePagerDuty:
+    def __init__(self, server: FakeApiServer, oncalls: int = 3):
+        self.oncalls = oncalls
+        server.route('GET', r'/oncalls', self._oncalls)
+
+    def _oncalls(self, match, query, body):
+        return 200, {'oncalls': [{
+            'user': {'summary': f'user-{index}'},
+            'schedule': {'summary': 'Primary'},
+            'escalation_policy': {'summary': 'Default'},
+            'start': '2024-01-01T00:00:00Z',
+            'end': '2024-01-08T00:00:00Z',
+        } for index in range(self.oncalls)]}
+
+
+class FakeSlackBot:
+    """slackbot.slack 대체. slack_sdk WebClient로 FakeSlack 서버에 전송"""
+
+    def __init__(self, base_url: str):
+        from slack_sdk import WebClient
+
+        self.client = WebClient(token='xoxb-benchmark', base_url=f'{base_url}/api/')
+
+    def post_message(self, channel_id, text=None, blocks=None):
+        return self.client.chat_postMessage(channel=channel_id, text=text, blocks=blocks)
+
+    def post_thread_message(self, channel_id, message_ts, text=None, blocks=None):
+        return self.client.chat_postMessage(channel=channel_id, thread_ts=message_ts, text=text, blocks=blocks)
+
+    def files_upload_v2(self, channel_id, content, filename, title=None, initial_comment=None):
+        return self.client.files_upload_v2(channel=channel_id, content=content, filename=filename, title=title,
+                                           initial_comment=initial_comment)
+
+
+def install_fake_modules(base_url: str, configs: Optional[Dict] = None) -> None:
+    """저장소에 없는 slackbot, utils.config 모듈을 가짜 모듈로 등록"""
+    slackbot = types.ModuleType('slackbot')
+    slackbot.slack = FakeSlackBot(base_url)
+    sys.modules['slackbot'] = slackbot
+
+    config = types.ModuleType('utils.config')
+    config.configs = dict({'enableSlack': False, 'slackToken': 'xoxb-benchmark', 'pagerdutyApiKey': 'benchmark'},
+                          **(configs or {}))
+    sys.modules['utils.config'] = config
+
+
+def redirect_requests(hosts: Dict[str, str]) -> None:
+    """requests로 호출하는 외부 URL(PagerDuty 등)을 가짜 서버로 변경"""
+    import requests
+
+    original = requests.Session.request
+
+    def request(session, method, url, *args, **kwargs):
+        for prefix, target in hosts.items():
+            if str(url).startswith(prefix):
+                url = target + str(url)[len(prefix):]
+                break
+        return original(session, method, url, *args, **kwargs)
+
+    requests.Session.request = request
+
+
+def use_fake_kubernetes(base_url: str) -> None:
+    """load_incluster_config 대신 가짜 Kubernetes API 서버를 사용하도록 설정"""
+    from kubernetes import client, config
+
+    def load_incluster_config(*args, **kwargs):
+        configuration = client.Configuration()
+        configuration.host = base_url
+        client.Configuration.set_default(configuration)
+
+    config.load_incluster_config = load_incluster_config
@@ -0,0 +1,75 @@
+"""
+merge_list(한 번에 concat)와 기존 방식(frame마다 pd.merge를 reduce) 비교
+
+    python -m tests.benchmarks.merge_list --frames 10 30 50 --rows 20000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from utils.common import merge_list  # noqa: E402
+
+
+def generate_frames(count: int, rows: int, seed: int = 0):
+    """리소스 이름을 key로 하는 리포트 frame. frame마다 key의 일부만 겹침"""
+    rng = np.random.default_rng(seed)
+    return [pd.DataFrame({
+        'name': [f'resource-{value}' for value in rng.choice(rows * 2, rows, replace=False)],
+        f'count{number}': rng.integers(0, 1000, rows),
+        f'cost{number}': np.round(rng.random(rows) * 100, 2),
+    }) for number in range(count)]
+
+
+def reduce_merge(index, df_list):
+    return reduce(lambda left, right: pd.merge(left, right, on=[index], how='outer'), df_list)
+
+
+def measure(function, *args, **kwargs):
+    """(결과, 실행 시간, tracemalloc 최대 메모리(MB)). 시간은 tracemalloc 없이 따로 측정"""
+    started = time.perf_counter()
+    result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    function(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='merge_list 벤치마크')
+    parser.add_argument('--frames', type=int, nargs='+', default=[10, 30, 50])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args(argv)
+
+    print(f"{'frames':>6} {'reduce(s)':>10} {'reduce(MB)':>11} {'merge_list(s)':>14} {'merge_list(MB)':>15} "
+          f"{'downcast(MB)':>13} {'speedup':>8}")
+    mismatches = 0
+    for count in options.frames:
+        frames = generate_frames(count, options.rows, options.seed)
+        expected, reduce_time, reduce_peak = measure(reduce_merge, 'name', frames)
+        result, merge_time, merge_peak = measure(merge_list, 'name', frames)
+        downcast, _, _ = measure(merge_list, 'name', frames, downcast=True)
+        if not result.equals(expected):
+            mismatches += 1
+        print(f"{count:>6} {reduce_time:>10.2f} {reduce_peak:>11.1f} {merge_time:>14.2f} {merge_peak:>15.1f} "
+              f"{downcast.memory_usage(deep=True).sum() / 1024 / 1024:>13.1f} {reduce_time / merge_time:>7.1f}x")
+    print(f'mismatched results: {mismatches}')
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
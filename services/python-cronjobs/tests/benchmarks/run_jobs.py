@@ -0,0 +1,501 @@
+"""
+CronJob 스크립트를 가짜 AWS/Kubernetes/Slack 백엔드로 실행하여 Job별 성능을 측정
+
+각 Job은 fork된 자식 프로세스에서 main.py와 같은 방식(exec)으로 실행되며 다음을 기록한다.
+- wall_time: 실제 실행 시간 (time.sleep은 가상 시계로 대체되어 기다리지 않음)
+- sleep_seconds / sleep_calls: polling 등으로 요청한 sleep 시간 합과 횟수
+- est_wall_time: wall_time + 가장 오래 sleep한 스레드의 sleep 시간 (실제 환경에서의 예상 시간)
+- api_calls: utils.metrics.ApiCallTracker로 집계한 AWS/Kubernetes/Slack API 호출 수
+- athena_scanned_gb: 가짜 Athena 쿼리 결과에 지정한 스캔 바이트 합
+- peak_rss_mb: 자식 프로세스의 최대 RSS (VmHWM 또는 ru_maxrss)
+
+    # 전체 Job 실행 후 결과 저장
+    python -m tests.benchmarks.run_jobs --output before.json
+
+    # 변경 후 실행하여 이전 결과와 비교
+    python -m tests.benchmarks.run_jobs --compare before.json
+
+    # 일부 Job만, 파드 수를 늘려서 실행
+    python -m tests.benchmarks.run_jobs --jobs eksMemoryMonitor --pods 50
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from tests.benchmarks.fakes import (AthenaTable, FakeApiServer, FakeAthena, FakeAws, FakeCostExplorer,  # noqa: E402
+                                    FakeKubernetes, FakePagerDuty, FakeSlack, VirtualClock, fake_value,
+                                    install_fake_modules, redirect_requests, use_fake_kubernetes)
+
+BASE_ENV = {
+    'ENV': 'local',
+    'AWS_ACCESS_KEY_ID': 'benchmark',
+    'AWS_SECRET_ACCESS_KEY': 'benchmark',
+    'AWS_REGION': 'ap-northeast-2',
+    'AWS_DEFAULT_REGION': 'ap-northeast-2',
+    'AWS_EC2_METADATA_DISABLED': 'true',
+    'ENABLE_METRICS': 'false',
+}
+
+# 비교 결과에서 변화로 표시할 최소 비율
+COMPARE_THRESHOLD = 0.05
+
+
+class Scenario:
+    """벤치마크할 Job 하나의 실행 방법과 가짜 응답 정의"""
+
+    def __init__(self, name: str, file: str, env: Optional[Dict[str, str]] = None,
+                 athena: Callable[['argparse.Namespace'], List[AthenaTable]] = None,
+                 aws: Optional[Dict[str, object]] = None, kubernetes: bool = False,
+                 run_as_main: bool = True, entrypoint: Optional[Callable[[Dict], None]] = None):
+        self.name = name
+        self.file = file
+        self.env = env or {}
+        self.athena = athena
+        self.aws = aws or {}
+        self.kubernetes = kubernetes
+        self.run_as_main = run_as_main
+        self.entrypoint = entrypoint
+
+
+def _report_cost(job_globals: Dict) -> None:
+    # 00은 main()이 비활성화(ARCHIVED)되어 있으므로 데이터 수집과 메시지 생성 함수를 직접 호출
+    metrics = job_globals['get_data_transfer_metrics']()
+    job_globals['format_slack_message'](metrics)
+    job_globals['format_detail_message'](metrics)
+
+
+FLOW_BREAKDOWN_COLUMNS = [
+    ('breakdown', 'varchar'), ('action', 'varchar'), ('interface_id', 'varchar'), ('instance_id', 'varchar'),
+    ('flow_direction', 'varchar'), ('log_status', 'varchar'), ('srcaddr', 'varchar'), ('srcport', 'varchar'),
+    ('dstaddr', 'varchar'), ('dstport', 'varchar'), ('protocol', 'varchar'), ('total_bytes', 'double'),
+    ('total_packets', 'bigint'), ('flow_count', 'bigint'), ('breakdown_rank', 'bigint'),
+]
+
+# breakdown별 (grouping key, 행 수)
+FLOW_BREAKDOWNS = {
+    'top_source_ips': (['srcaddr'], 10),
+    'top_dest_ips': (['dstaddr'], 10),
+    'instance_traffic': (['instance_id', 'srcaddr'], 20),
+    'instance_direction': (['instance_id', 'flow_direction'], None),
+    'ip_pairs': (['action', 'interface_id', 'instance_id', 'flow_direction', 'log_status', 'srcaddr', 'srcport',
+                  'dstaddr', 'dstport', 'protocol'], 50),
+}
+
+
+def _flow_breakdown_rows(options) -> List[List[str]]:
+    """GROUPING SETS 단일 스캔 쿼리 결과. grouping key가 아닌 컬럼은 NULL(빈 값)"""
+    rng = random.Random(options.seed)
+    rows = []
+    for name, (keys, count) in FLOW_BREAKDOWNS.items():
+        for rank in range(1, (count or options.athena_rows) + 1):
+            values = {column: fake_value(column, type_, rank, rng) for column, type_ in FLOW_BREAKDOWN_COLUMNS
+                      if column in keys or type_ in ('double', 'bigint')}
+            values.update(breakdown=name, breakdown_rank=str(rank))
+            rows.append([values.get(column, '') for column, _ in FLOW_BREAKDOWN_COLUMNS])
+    return rows
+
+
+def _flow_rollup_tables(options, scanned: int) -> List[AthenaTable]:
+    """rollup 테이블에 전일을 제외한 13일이 이미 집계되어 있는 상태 (전일 하루만 원본에서 INSERT INTO)"""
+    rng = random.Random(options.seed)
+    # 00 Job과 같이 KST 기준 전일까지 14일
+    yesterday = (datetime.now(timezone.utc) + timedelta(hours=9)).date() - timedelta(days=1)
+    days = [(yesterday - timedelta(days=offset)).isoformat() for offset in range(13, -1, -1)]
+    totals = [[day, f'{rng.uniform(800, 1200):.2f}', str(rng.randint(500, 900)), str(rng.randint(500, 900))]
+              for day in days]
+    pair_columns = [('srcaddr', 'varchar'), ('dstaddr', 'varchar'), ('interface_id', 'varchar'),
+                    ('flow_direction', 'varchar'), ('bytes', 'bigint')]
+    pairs = [[fake_value(name, type_, index, rng) for name, type_ in pair_columns] + [day]
+             for day in days[-2:] for index in range(options.athena_rows)]
+    return [
+        AthenaTable('SELECT DISTINCT dt', [('dt', 'varchar')], values=[[day] for day in days[:-1]], duration=1.0,
+                    scanned_bytes=0),
+        AthenaTable('INSERT INTO', [('rows', 'bigint')], values=[], duration=options.query_seconds,
+                    scanned_bytes=scanned),
+        # rollup은 원본의 약 1/100 크기
+        AthenaTable('GROUP BY dt', [('dt', 'varchar'), ('total_gb', 'double'), ('unique_sources', 'bigint'),
+                                    ('unique_destinations', 'bigint')],
+                    values=totals, duration=1.0, scanned_bytes=scanned * len(days) // 100),
+        AthenaTable('GROUP BY srcaddr, dstaddr, interface_id, flow_direction, dt', pair_columns + [('dt', 'varchar')], values=pairs, duration=1.0,
+                    scanned_bytes=scanned * 2 // 100),
+    ]
+
+
+# fake_value의 10.0~10.2 대역은 VPC subnet(AZ별), 10.3 대역은 인덱스에 없는 사설망
+NAT_INTERFACE = {'NetworkInterfaceId': 'eni-nat', 'InterfaceType': 'nat_gateway', 'Description': 'NAT Gateway',
+                 'PrivateIpAddress': '10.0.0.10', 'PrivateIpAddresses': [{'PrivateIpAddress': '10.0.0.10'}]}
+# 10.0~10.2 대역의 ENI 768개 (인스턴스당 ENI 하나, 보조 IP 16개)
+INSTANCE_INTERFACES = [
+    {'NetworkInterfaceId': f'eni-{index:08x}', 'InterfaceType': 'interface', 'Description': '',
+     'Attachment': {'InstanceId': f'i-{index:08x}'},
+     'PrivateIpAddresses': [{'PrivateIpAddress': f'10.{index % 3}.{index // 3}.{address}'}
+                            for address in range(1, 17)]}
+    for index in range(768)
+]
+
+
+def _describe_network_interfaces(params: Dict) -> Dict:
+    if params.get('Filters'):
+        return {'NetworkInterfaces': [NAT_INTERFACE]}
+    return {'NetworkInterfaces': [NAT_INTERFACE] + INSTANCE_INTERFACES}
+
+
+EC2_TOPOLOGY = {
+    'ec2.DescribeSubnets': {'Subnets': [{'SubnetId': f'subnet-{index}', 'CidrBlock': f'10.{index}.0.0/16',
+                                         'AvailabilityZone': f'ap-northeast-2{zone}'}
+                                        for index, zone in enumerate('abc')]},
+    'ec2.DescribeNetworkInterfaces': _describe_network_interfaces,
+    'ec2.DescribeInstances': {'Reservations': [{'Instances': [
+        {'InstanceId': interface['Attachment']['InstanceId'],
+         'Tags': [{'Key': 'Name', 'Value': f'demo-node-{index}'}]}
+        for index, interface in enumerate(INSTANCE_INTERFACES)]}]},
+}
+
+
+def _vpc_flow_tables(options) -> List[AthenaTable]:
+    scanned = 50 * 1024 ** 3
+    duration = options.query_seconds
+    return _flow_rollup_tables(options, scanned) + [
+        AthenaTable('GROUPING SETS', FLOW_BREAKDOWN_COLUMNS, values=_flow_breakdown_rows(options), duration=duration,
+                    scanned_bytes=scanned),
+        AthenaTable('today_gb', [('today_gb', 'double'), ('yesterday_gb', 'double'), ('change_percentage', 'double'),
+                                 ('today_unique_sources', 'bigint'), ('today_unique_destinations', 'bigint')],
+                    rows=1, duration=duration, scanned_bytes=scanned * 2),
+        AthenaTable('total_bytes_sent', [('ip', 'varchar'), ('total_bytes_sent', 'double'),
+                                         ('request_count', 'bigint')],
+                    rows=10, duration=duration, scanned_bytes=scanned),
+        AthenaTable('total_bytes_received', [('ip', 'varchar'), ('total_bytes_received', 'double'),
+                                             ('request_count', 'bigint')],
+                    rows=10, duration=duration, scanned_bytes=scanned),
+        AthenaTable('total_packets', [('instance_id', 'varchar'), ('srcaddr', 'varchar'), ('total_bytes', 'double'),
+                                      ('total_packets', 'bigint')],
+                    rows=20, duration=duration, scanned_bytes=scanned),
+        AthenaTable('connection_count', [('instance_id', 'varchar'), ('flow_direction', 'varchar'),
+                                         ('total_bytes', 'double'), ('connection_count', 'bigint')],
+                    rows=options.athena_rows, duration=duration, scanned_bytes=scanned),
+        AthenaTable('srcport', [('action', 'varchar'), ('interface_id', 'varchar'), ('instance_id', 'varchar'),
+                                ('flow_direction', 'varchar'), ('log_status', 'varchar'), ('srcaddr', 'varchar'),
+                                ('srcport', 'varchar'), ('dstaddr', 'varchar'), ('dstport', 'varchar'),
+                                ('protocol', 'varchar'), ('total_bytes', 'double')],
+                    rows=50, duration=duration, scanned_bytes=scanned),
+    ]
+
+
+def _alb_log_tables(options) -> List[AthenaTable]:
+    """상위 50개 경로와 상위 50개에 경로가 없는 ALB 2개의 첫 행"""
+    rng = random.Random(options.seed)
+    columns = [('alb_name', 'varchar'), ('request_path', 'varchar'), ('method', 'varchar'),
+               ('request_count', 'bigint'), ('total_sent_bytes', 'bigint'), ('avg_sent_bytes_per_request', 'bigint'),
+               ('alb_total_sent_bytes', 'bigint')]
+    values = [[fake_value(name, type_, rank, rng) for name, type_ in columns] + [str(rank)] for rank in range(1, 53)]
+    return [AthenaTable('api_usage', columns + [('path_rank', 'bigint')], values=values,
+                        duration=options.query_seconds, scanned_bytes=20 * 1024 ** 3)]
+
+
+def _cloudfront_tables(options) -> List[AthenaTable]:
+    return [AthenaTable('cs_uri_stem', [('service', 'varchar'), ('cs_uri_stem', 'varchar'), ('cs_referer', 'varchar'),
+                                        ('cs_host', 'varchar'), ('full_url', 'varchar'), ('request_count', 'bigint'),
+                                        ('avg_bytes_per_request', 'double'), ('total_bytes', 'bigint')],
+                        rows=50, duration=options.query_seconds, scanned_bytes=10 * 1024 ** 3)]
+
+
+ALB_NAMES = ['airport-private-prod', 'airport-prod', 'demo-admin-back-private-prod', 'demo-admin-back-prod']
+
+
+def _alb_table_tables(options) -> List[AthenaTable]:
+    properties = [['EXTERNAL\tTRUE'], ['projection.enabled\ttrue'],
+                  [f"projection.alb_name.values\t{','.join(ALB_NAMES)}"]]
+    return [
+        AthenaTable('SHOW TBLPROPERTIES', [('prpt_name', 'varchar')], values=properties, duration=1.5),
+        AthenaTable('ALTER TABLE', [], rows=0, duration=2.0),
+    ]
+
+
+SCENARIOS = [
+    Scenario('reportCostOfAWSResourcesToSlack', '00-report_cost_of_aws_resources_to_slack.py',
+             env={'SLACK_CHANNEL_ID': 'C00000000'}, athena=_vpc_flow_tables, run_as_main=False,
+             aws={'ce.GetCostAndUsage': FakeCostExplorer().get_cost_and_usage, **EC2_TOPOLOGY,
+                  # 다시 집계하는 rollup 파티션 파일
+                  's3.ListObjectsV2': {'Contents': [{'Key': 'report/rollup/vpc_flow_daily/dt=0000-00-00/part-0'}]},
+                  's3.DeleteObjects': {'Deleted': [{'Key': 'report/rollup/vpc_flow_daily/dt=0000-00-00/part-0'}]},
+                  'athena.GetTableMetadata': {'TableMetadata': {'Name': 'vpc_flow_daily_rollup', 'Columns': [
+                      {'Name': name} for name in ['srcaddr', 'dstaddr', 'instance_id', 'flow_direction', 'bytes',
+                                                  'packets', 'flow_count', 'interface_id']],
+                      'PartitionKeys': [{'Name': 'dt'}]}}},
+             entrypoint=_report_cost),
+    Scenario('albLogReportToSlack', '02-alb_log_report_to_slack.py',
+             env={'SLACK_CHANNEL_ID': 'C00000000', 'ALB_ACCESS_LOG_TABLE': 'alb_access_logs_all'},
+             athena=_alb_log_tables),
+    Scenario('oncallTargetToSlack', '03-oncall_to_slack.py', env={'SLACK_CHANNEL_ID': 'C00000000'}),
+    Scenario('cloudfrontLogReportToSlack', '04-cloudfront_log_report_to_slack.py',
+             env={'SLACK_CHANNEL_ID': 'C00000000'}, athena=_cloudfront_tables),
+    Scenario('addAlbToAthenaTables', '05-add_alb_to_athena_tables.py', env={'SLACK_CHANNEL_ID': 'C00000000'},
+             athena=_alb_table_tables,
+             aws={'s3.ListObjectsV2': {'CommonPrefixes': [{'Prefix': f'{name}/'}
+                                                          for name in ALB_NAMES + ['demo-new-alb-prod']]}}),
+    Scenario('eksMemoryMonitor', '06-eks_memory_monitor_and_restart.py',
+             env={'SLACK_CHANNEL_ID': 'C00000000', 'EKS_CLUSTER_NAME': 'demo-prod-eks',
+                  'EKS_DEPLOYMENTS': 'demo-services:demo-alwalk-back,demo-services:demo-almart-back,'
+                                     'demo-services:demo-bff',
+                  'MEMORY_THRESHOLD': '75', 'DRY_RUN': 'false'},
+             aws={'eks.DescribeCluster': {'cluster': {'name': 'demo-prod-eks', 'status': 'ACTIVE',
+                                                      'endpoint': 'https://example.invalid',
+                                                      'certificateAuthority': {'data': ''}}}},
+             kubernetes=True),
+]
+
+
+def current_rss_mb() -> Dict[str, float]:
+    from utils.parallel_runner import max_rss_mb, read_rss_mb
+
+    usage = read_rss_mb(os.getpid())
+    if not usage['hwm_mb']:
+        usage['hwm_mb'] = max_rss_mb(resource.getrusage(resource.RUSAGE_SELF))
+    return usage
+
+
+def _child_main(scenario: Scenario, options, server_url: str, conn) -> None:
+    """자식 프로세스에서 가짜 백엔드를 설치하고 Job을 실행"""
+    os.chdir(ROOT)
+    os.environ.update(BASE_ENV)
+    os.environ.update(scenario.env)
+    path = os.path.join(ROOT, scenario.file)
+    sys.argv = ['main.py', '--name', scenario.name, '--files', scenario.file]
+
+    clock = VirtualClock()
+    clock.install()
+    install_fake_modules(server_url)
+    redirect_requests({'https://api.pagerduty.com': server_url})
+
+    from utils import aws_clients
+    from utils.metrics import api_call_tracker
+
+    api_call_tracker.install()
+    fake_aws = FakeAws()
+    athena = None
+    if scenario.athena is not None:
+        athena = FakeAthena(clock, scenario.athena(options), seed=options.seed)
+        fake_aws.add_athena(athena)
+    for operation, response in scenario.aws.items():
+        fake_aws.add(operation, response)
+    fake_aws.install(aws_clients.get_session())
+    if scenario.kubernetes:
+        os.environ['EKS_DEPLOYMENTS'] = options.deployments
+        use_fake_kubernetes(server_url)
+
+    if options.tracemalloc:
+        import tracemalloc
+        tracemalloc.start()
+
+    rss_start = current_rss_mb()['rss_mb']
+    output = io.StringIO()
+    status, error = 'success', None
+    usage_start = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            with open(path, 'rb') as f:
+                code = compile(f.read(), path, 'exec')
+            job_globals = {'__name__': '__main__' if scenario.run_as_main else 'benchmark', '__file__': path,
+                           '__builtins__': __builtins__}
+            exec(code, job_globals)
+            if scenario.entrypoint is not None:
+                scenario.entrypoint(job_globals)
+    except BaseException:
+        status, error = 'failed', traceback.format_exc(limit=5)
+    wall_time = time.perf_counter() - started
+    usage_end = resource.getrusage(resource.RUSAGE_SELF)
+
+    api_calls = {}
+    for (api, operation), stats in api_call_tracker.snapshot().items():
+        api_calls[f'{api}:{operation}'] = stats['count']
+
+    result = {
+        'status': status,
+        'error': error,
+        'wall_time': wall_time,
+        'cpu_seconds': (usage_end.ru_utime - usage_start.ru_utime) + (usage_end.ru_stime - usage_start.ru_stime),
+        'sleep_seconds': clock.total_slept,
+        'sleep_calls': clock.sleep_calls,
+        'est_wall_time': wall_time + clock.max_thread_slept,
+        'api_calls': dict(sorted(api_calls.items())),
+        'api_calls_total': sum(api_calls.values()),
+        'athena_scanned_gb': athena.scanned_bytes / 1024 ** 3 if athena else 0.0,
+        'rss_start_mb': rss_start,
+        'peak_rss_mb': current_rss_mb()['hwm_mb'],
+        'output_tail': output.getvalue()[-2000:] if options.verbose or status != 'success' else '',
+    }
+    if options.tracemalloc:
+        import tracemalloc
+        result['python_peak_mb'] = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+
+    conn.send(result)
+    conn.close()
+    os._exit(0)
+
+
+def run_scenario(scenario: Scenario, options, server: FakeApiServer) -> Dict:
+    context = multiprocessing.get_context('fork')
+    parent_conn, child_conn = context.Pipe(duplex=False)
+    process = context.Process(target=_child_main, args=(scenario, options, server.url, child_conn),
+                              name=scenario.name)
+    process.start()
+    child_conn.close()
+    result = None
+    if parent_conn.poll(options.timeout):
+        try:
+            result = parent_conn.recv()
+        except EOFError:
+            pass
+    if process.is_alive():
+        process.kill()
+    process.join()
+    if result is None:
+        result = {'status': 'crashed', 'error': f'exitcode={process.exitcode}', 'wall_time': 0.0}
+    return result
+
+
+def run_benchmarks(scenarios: Sequence[Scenario], options) -> Dict:
+    server = FakeApiServer()
+    slack = FakeSlack(server)
+    FakePagerDuty(server)
+    deployments = [tuple(item.split(':', 1)) for item in options.deployments.split(',')]
+    kubernetes = FakeKubernetes(server, deployments, pods_per_deployment=options.pods,
+                                hot_deployments=[deployments[-1][1]])
+    server.start()
+
+    results = {}
+    try:
+        for scenario in scenarios:
+            runs = []
+            for _ in range(options.repeat):
+                slack.calls.clear()
+                kubernetes.restarts.clear()
+                result = run_scenario(scenario, options, server)
+                result['slack_messages'] = len(slack.calls)
+                result['kubernetes_restarts'] = len(kubernetes.restarts)
+                runs.append(result)
+            result = runs[-1]
+            if len(runs) > 1:
+                # 반복 실행 시 시간 지표는 중앙값 사용
+                for key in ('wall_time', 'cpu_seconds', 'est_wall_time', 'peak_rss_mb'):
+                    values = [run[key] for run in runs if key in run]
+                    if values:
+                        result[key] = statistics.median(values)
+            results[scenario.name] = result
+    finally:
+        server.stop()
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'options': {key: value for key, value in vars(options).items() if key not in ('output', 'compare')},
+        'scenarios': results,
+    }
+
+
+def _change(current: float, baseline: float) -> str:
+    if not baseline:
+        return ''
+    ratio = (current - baseline) / baseline
+    if abs(ratio) < COMPARE_THRESHOLD:
+        return ' (=)'
+    return f' ({ratio:+.0%})'
+
+
+def format_report(report: Dict, baseline: Optional[Dict] = None) -> str:
+    """Job별 결과 표. baseline이 있으면 각 지표 옆에 변화율을 표시"""
+    headers = ['job', 'status', 'wall(s)', 'est wall(s)', 'sleep(s)/calls', 'api calls', 'scanned(GB)', 'cpu(s)',
+               'peak rss(MB)']
+    rows = []
+    base_scenarios = (baseline or {}).get('scenarios', {})
+    for name, result in report['scenarios'].items():
+        base = base_scenarios.get(name, {})
+
+        def cell(key, fmt='{:.2f}'):
+            if key not in result:
+                return '-'
+            text = fmt.format(result[key])
+            return text + _change(result[key], base.get(key)) if base else text
+
+        rows.append([
+            name,
+            result['status'],
+            cell('wall_time'),
+            cell('est_wall_time'),
+            f"{cell('sleep_seconds', '{:.1f}')}/{result.get('sleep_calls', '-')}",
+            cell('api_calls_total', '{:d}'),
+            cell('athena_scanned_gb', '{:.0f}'),
+            cell('cpu_seconds'),
+            cell('peak_rss_mb', '{:.1f}'),
+        ])
+
+    widths = [max(len(str(row[i])) for row in [headers] + rows) for i in range(len(headers))]
+    lines = [' | '.join(str(value).ljust(width) for value, width in zip(row, widths)) for row in [headers] + rows]
+    lines.insert(1, '-+-'.join('-' * width for width in widths))
+
+    for name, result in report['scenarios'].items():
+        if result.get('error'):
+            lines.append(f"\n[{name}] {result['status']}\n{result['error']}\n{result.get('output_tail', '')}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='CronJob 오프라인 벤치마크')
+    parser.add_argument('--jobs', nargs='*', help='실행할 Job 이름 (기본값: 전체)')
+    parser.add_argument('--repeat', type=int, default=1, help='Job별 반복 실행 횟수 (시간 지표는 중앙값)')
+    parser.add_argument('--output', help='결과를 저장할 JSON 파일')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+    parser.add_argument('--query-seconds', type=float, default=3.0, help='가짜 Athena 쿼리 실행 시간(가상 시간, 초)')
+    parser.add_argument('--athena-rows', type=int, default=200, help='크기 제한이 없는 Athena 결과의 행 수')
+    parser.add_argument('--pods', type=int, default=3, help='가짜 Kubernetes deployment별 파드 수')
+    parser.add_argument('--deployments', default=SCENARIOS[-1].env['EKS_DEPLOYMENTS'],
+                        help='가짜 Kubernetes deployment 목록 (namespace:name,...). 마지막 항목이 메모리 임계치를 초과')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=300, help='Job별 최대 실행 시간(초)')
+    parser.add_argument('--tracemalloc', action='store_true', help='Python 메모리 할당 최대치도 측정 (실행이 느려짐)')
+    parser.add_argument('--verbose', action='store_true', help='Job 출력 마지막 부분을 결과에 포함')
+    options = parser.parse_args(argv)
+
+    scenarios = SCENARIOS
+    if options.jobs:
+        unknown = set(options.jobs) - {scenario.name for scenario in SCENARIOS}
+        if unknown:
+            parser.error(f"unknown jobs: {', '.join(sorted(unknown))}")
+        scenarios = [scenario for scenario in SCENARIOS if scenario.name in options.jobs]
+
+    report = run_benchmarks(scenarios, options)
+
+    baseline = None
+    if options.compare:
+        with open(options.compare) as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f'\nresults saved to {options.output}')
+
+    return 0 if all(result['status'] == 'success' for result in report['scenarios'].values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
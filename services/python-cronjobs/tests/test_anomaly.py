@@ -0,0 +1,69 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from utils import anomaly
+from utils.anomaly import AnomalyDetector
+
+
+def test_ewma_update():
+    stats = anomaly.ewma_update(anomaly._new_stats(), 10.0, 0.5)
+    assert stats == {'mean': 10.0, 'var': 0.0, 'count': 1}
+    stats = anomaly.ewma_update(stats, 20.0, 0.5)
+    assert stats['mean'] == 15.0 and stats['var'] == pytest.approx(25.0) and stats['count'] == 2
+
+
+def test_flags_deviation_after_warmup(tmp_path):
+    start = date(2024, 1, 1)
+    detector = AnomalyDetector(str(tmp_path), name='test', sigma=3)
+    for offset in range(7):
+        assert detector.observe('total_gb', start + timedelta(days=offset), 100.0 + offset % 2) is None
+    detector.save()
+
+    # 실행마다 상태 파일을 다시 읽어 이어서 갱신
+    detector = AnomalyDetector(str(tmp_path), name='test', sigma=3)
+    normal = detector.observe('total_gb', start + timedelta(days=7), 101.0)
+    assert normal is not None and not normal['anomaly'] and not normal['seasonal']
+    detector.save()
+
+    detector = AnomalyDetector(str(tmp_path), name='test', sigma=3)
+    spike = detector.observe('total_gb', start + timedelta(days=8), 300.0)
+    assert spike['anomaly'] and spike['score'] > 3
+    assert spike['expected'] == pytest.approx(100.5, abs=0.5)
+
+    # 같은 날짜로 다시 실행하면 그 날짜 반영 전 상태 기준으로 다시 계산
+    assert detector.observe('total_gb', start + timedelta(days=8), 300.0)['score'] == pytest.approx(spike['score'])
+    assert detector.metrics['total_gb']['overall']['count'] == 9
+    # 이미 반영한 날짜보다 이전 날짜는 무시
+    assert detector.observe('total_gb', start + timedelta(days=3), 100.0) is None
+
+
+def test_weekday_baseline(tmp_path):
+    # 주말(토/일)만 트래픽이 적은 지표
+    detector = AnomalyDetector(str(tmp_path), name='test', sigma=3)
+    start = date(2024, 1, 1)  # 월요일
+    checks = []
+    for offset in range(35):
+        day = start + timedelta(days=offset)
+        checks.append(detector.observe('total_gb', day, 20.0 if day.weekday() >= 5 else 100.0))
+    saturday = checks[-2]
+    assert saturday['seasonal'] and not saturday['anomaly'] and saturday['expected'] == pytest.approx(20.0)
+
+    # 같은 요일 기준으로는 평일 수준의 토요일 값이 이상
+    check = detector.observe('total_gb', date(2024, 2, 10), 100.0)
+    assert check['seasonal'] and check['anomaly']
+
+
+def test_state_file_is_small_and_pruned(tmp_path):
+    detector = AnomalyDetector(str(tmp_path), name='test')
+    checks = detector.observe_many({'a': 1.0, 'b': float('nan')}, date(2024, 1, 1))
+    assert checks == [] and 'b' not in detector.metrics
+    detector.observe('c', date(2024, 3, 1), 1.0)
+    detector.save(retention_days=30)
+    state = json.loads((tmp_path / 'test.json').read_text())
+    assert list(state['metrics']) == ['c']
+
+    # 상태 파일이 깨져 있어도 빈 상태로 시작
+    (tmp_path / 'test.json').write_text('not json')
+    assert AnomalyDetector(str(tmp_path), name='test').metrics == {}
@@ -0,0 +1,296 @@
+import io
+import itertools
+
+import pandas as pd
+import pytest
+
+from utils import athena, athena_cache
+
+
+class FakeAthenaClient:
+    """쿼리마다 정해진 상태 확인 횟수 뒤에 끝나는 Athena client"""
+
+    def __init__(self, polls, states=None):
+        self.polls = polls
+        self.states = states or {}
+        self.ids = itertools.count()
+        self.executions = {}
+        self.max_running = 0
+        self.batch_calls = 0
+        self.checked = []
+        self.stopped = []
+
+    def start_query_execution(self, QueryString, **kwargs):
+        self.start_kwargs = kwargs
+        query_execution_id = f'q{next(self.ids)}'
+        self.executions[query_execution_id] = {'query': QueryString, 'checks': 0}
+        running = sum(1 for execution in self.executions.values() if not execution.get('done'))
+        self.max_running = max(self.max_running, running)
+        return {'QueryExecutionId': query_execution_id}
+
+    def _check(self, query_execution_id):
+        execution = self.executions[query_execution_id]
+        execution['checks'] += 1
+        state = 'RUNNING'
+        if execution['checks'] >= self.polls[execution['query']]:
+            state = self.states.get(execution['query'], 'SUCCEEDED')
+            execution['done'] = True
+        return {'QueryExecutionId': query_execution_id, 'Status': {'State': state}}
+
+    def batch_get_query_execution(self, QueryExecutionIds):
+        self.batch_calls += 1
+        self.checked.append([self.executions[i]['query'] for i in QueryExecutionIds])
+        return {'QueryExecutions': [self._check(query_execution_id) for query_execution_id in QueryExecutionIds]}
+
+    def get_query_results(self, QueryExecutionId, **kwargs):
+        query = self.executions[QueryExecutionId]['query']
+        return {'ResultSet': {
+            'ResultSetMetadata': {'ColumnInfo': [{'Label': 'query'}]},
+            'Rows': [{'Data': [{'VarCharValue': 'query'}]}, {'Data': [{'VarCharValue': query}]}],
+        }}
+
+    def get_query_execution(self, QueryExecutionId):
+        return {'QueryExecution': self._check(QueryExecutionId)}
+
+    def stop_query_execution(self, QueryExecutionId):
+        self.stopped.append(self.executions[QueryExecutionId]['query'])
+        self.executions[QueryExecutionId]['done'] = True
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(athena.time, 'sleep', lambda seconds: None)
+    # jitter 없이 같은 간격으로 확인
+    monkeypatch.setattr(athena.random, 'uniform', lambda low, high: 1.0)
+
+
+def test_queries_run_concurrently_and_return_in_order():
+    client = FakeAthenaClient({'a': 5, 'b': 1, 'c': 3, 'd': 2})
+    order = [name for name, _ in athena.iter_query_results({name: name for name in 'abcd'}, 'db', 's3://out/',
+                                                           client=client)]
+    assert order == ['b', 'd', 'c', 'a']
+    # 한 번의 batch 조회로 실행 중인 쿼리를 모두 확인하므로 가장 느린 쿼리만큼만 polling
+    assert client.batch_calls == 5
+
+    results = athena.run_queries({name: name for name in 'abcd'}, 'db', 's3://out/',
+                                 client=FakeAthenaClient({'a': 5, 'b': 1, 'c': 3, 'd': 2}))
+    assert list(results) == ['a', 'b', 'c', 'd']
+    assert results['c']['query'].tolist() == ['c']
+
+
+def test_concurrency_cap_and_failures():
+    client = FakeAthenaClient({name: 2 for name in 'abcdef'}, states={'c': 'FAILED'})
+    results = athena.run_queries({name: name for name in 'abcdef'}, 'db', 's3://out/', max_concurrency=2,
+                                 client=client)
+    assert client.max_running == 2
+    assert results['c'].empty
+    assert all(not results[name].empty for name in 'abdef')
+
+
+def test_poll_delays_back_off_from_expected_runtime(monkeypatch):
+    delays = list(itertools.islice(athena.poll_delays(initial_delay=1, max_delay=4, factor=2), 5))
+    assert delays == [1, 2, 4, 4, 4]
+    assert next(athena.poll_delays(expected_runtime=10)) == 8
+
+    monkeypatch.setattr(athena.random, 'uniform', lambda low, high: high)
+    assert next(athena.poll_delays(initial_delay=1, jitter=0.2)) == 1.2
+
+
+def test_queries_are_checked_when_due():
+    client = FakeAthenaClient({'short': 3, 'long': 2})
+    results = athena.run_queries({'short': 'short', 'long': 'long'}, 'db', 's3://out/', client=client,
+                                 expected_runtimes={'long': 5}, initial_delay=1, factor=2)
+    assert not results['short'].empty and not results['long'].empty
+    # short는 1, 3, 7초에, 예상 실행 시간이 5초인 long은 4, 5초에 확인
+    assert client.checked == [['short'], ['short'], ['long'], ['long'], ['short']]
+
+
+def test_wait_for_query(monkeypatch):
+    client = FakeAthenaClient({'a': 3, 'slow': 1000})
+    execution = athena.wait_for_query(client.start_query_execution('a')['QueryExecutionId'], client=client)
+    assert execution['Status']['State'] == 'SUCCEEDED'
+    assert client.executions[execution['QueryExecutionId']]['checks'] == 3
+
+    clock = itertools.count(step=10)
+    monkeypatch.setattr(athena.time, 'monotonic', lambda: next(clock))
+    query_execution_id = client.start_query_execution('slow')['QueryExecutionId']
+    execution = athena.wait_for_query(query_execution_id, client=client, timeout=60)
+    assert execution['Status']['State'] == 'CANCELLED'
+    assert 'Timed out' in execution['Status']['StateChangeReason']
+    assert client.stopped == ['slow']
+
+
+def test_timed_out_query_is_stopped(monkeypatch):
+    clock = itertools.count(step=10)
+    monkeypatch.setattr(athena.time, 'monotonic', lambda: next(clock))
+    client = FakeAthenaClient({'slow': 1000, 'fast': 1})
+    results = athena.run_queries({'slow': 'slow', 'fast': 'fast'}, 'db', 's3://out/', timeout=60, client=client)
+    assert results['slow'].empty and not results['fast'].empty
+    assert client.stopped == ['slow']
+
+
+
+class FlakyAthenaClient(FakeAthenaClient):
+    """처음 몇 번은 조회 오류, 그다음 몇 번은 UnprocessedQueryExecutionIds로 응답하는 client"""
+
+    def __init__(self, polls, errors=0, unprocessed=0):
+        super().__init__(polls)
+        self.errors = errors
+        self.unprocessed = unprocessed
+
+    def batch_get_query_execution(self, QueryExecutionIds):
+        if self.errors:
+            self.errors -= 1
+            raise RuntimeError('ThrottlingException')
+        if self.unprocessed:
+            self.unprocessed -= 1
+            self.batch_calls += 1
+            return {'QueryExecutions': [], 'UnprocessedQueryExecutionIds': [
+                {'QueryExecutionId': query_execution_id, 'ErrorCode': 'INTERNAL_ERROR'}
+                for query_execution_id in QueryExecutionIds]}
+        return super().batch_get_query_execution(QueryExecutionIds)
+
+
+def test_unchecked_queries_are_retried_with_backoff(monkeypatch):
+    clock = itertools.count(step=1)
+    monkeypatch.setattr(athena.time, 'monotonic', lambda: next(clock))
+    client = FlakyAthenaClient({'a': 1}, errors=2, unprocessed=2)
+    results = athena.run_queries({'a': 'a'}, 'db', 's3://out/', client=client)
+    assert results['a']['query'].tolist() == ['a']
+    # 조회 오류/미처리 응답마다 바로 다시 조회하지 않고 다음 확인 시각까지 대기
+    assert client.batch_calls == 3
+
+    # 계속 확인하지 못하면 최대 대기 시간에 중지
+    clock = itertools.count(step=10)
+    client = FlakyAthenaClient({'a': 1}, unprocessed=1000)
+    results = athena.run_queries({'a': 'a'}, 'db', 's3://out/', timeout=60, client=client)
+    assert results['a'].empty and client.stopped == ['a']
+    client = FlakyAthenaClient({'a': 1}, errors=1000)
+    results = athena.run_queries({'a': 'a'}, 'db', 's3://out/', timeout=60, client=client)
+    assert results['a'].empty and client.stopped == ['a']
+
+class PagedResultsClient:
+    """rows를 page_size행씩 나누어 반환하는 get_query_results (첫 페이지 첫 행은 컬럼 이름)"""
+
+    COLUMNS = [{'Label': 'path', 'Type': 'varchar'}, {'Label': 'requests', 'Type': 'bigint'},
+               {'Label': 'ratio', 'Type': 'double'}, {'Label': 'cached', 'Type': 'boolean'},
+               {'Label': 'day', 'Type': 'date'}]
+
+    def __init__(self, rows, page_size=3, output_location='s3://bucket/results/q.csv'):
+        self.rows = [[column['Label'] for column in self.COLUMNS]] + rows
+        self.page_size = page_size
+        self.output_location = output_location
+        self.calls = 0
+
+    def get_query_results(self, QueryExecutionId, MaxResults=1000, NextToken=None):
+        self.calls += 1
+        start = int(NextToken or 0)
+        page = self.rows[start:start + self.page_size]
+        response = {'ResultSet': {
+            'ResultSetMetadata': {'ColumnInfo': self.COLUMNS},
+            'Rows': [{'Data': [{} if value is None else {'VarCharValue': value} for value in row]} for row in page],
+        }}
+        if start + self.page_size < len(self.rows):
+            response['NextToken'] = str(start + self.page_size)
+        return response
+
+    def get_query_execution(self, QueryExecutionId):
+        return {'QueryExecution': {'ResultConfiguration': {'OutputLocation': self.output_location}}}
+
+
+def result_rows(count):
+    return [[f'/p{i}', str(i), '0.5', 'true' if i % 2 else 'false', '2024-01-02'] for i in range(count)]
+
+
+def test_results_are_paged_and_typed():
+    rows = result_rows(7) + [['/null', None, None, None, None]]
+    client = PagedResultsClient(rows)
+    frame = athena.read_results('q', client=client, source='api')
+    assert client.calls == 3
+    assert frame['path'].tolist() == [row[0] for row in rows]
+    assert str(frame['requests'].dtype) == 'Int64' and frame['requests'].iloc[6] == 6
+    assert frame['requests'].isna().iloc[-1] and frame['ratio'].isna().iloc[-1]
+    assert frame['ratio'].dtype == 'float64'
+    assert frame['cached'].tolist()[:2] == [False, True]
+    assert frame['day'].iloc[0] == pd.Timestamp('2024-01-02')
+
+    chunks = list(athena.iter_result_frames('q', client=PagedResultsClient(rows), source='api', chunk_rows=4))
+    assert [len(chunk) for chunk in chunks] == [5, 3]
+
+    assert [row[0] for row in athena.iter_rows('q', PagedResultsClient(rows))] == [row[0] for row in rows]
+
+
+class FakeS3Client:
+    def __init__(self, objects):
+        self.objects = objects
+        self.keys = []
+
+    def get_object(self, Bucket, Key):
+        self.keys.append((Bucket, Key))
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)])}
+
+
+def test_large_results_are_streamed_from_s3_csv():
+    rows = result_rows(10)
+    csv = '"path","requests","ratio","cached","day"\n' + ''.join(
+        ','.join(f'"{value}"' for value in row) + '\n' for row in rows) + '"/null",,,,\n'
+    s3 = FakeS3Client({('bucket', 'results/q.csv'): csv.encode()})
+    client = PagedResultsClient(rows)
+    chunks = list(athena.iter_result_frames('q', client=client, s3_client=s3, chunk_rows=4))
+    # 첫 페이지에서 결과가 더 있는 것을 확인하면 나머지는 API가 아닌 S3 CSV에서 읽음
+    assert client.calls == 1 and s3.keys == [('bucket', 'results/q.csv')]
+    assert [len(chunk) for chunk in chunks] == [4, 4, 3]
+    frame = pd.concat(chunks, ignore_index=True)
+    assert frame['requests'].iloc[:10].tolist() == list(range(10))
+    assert frame['requests'].isna().iloc[-1] and frame['path'].iloc[-1] == '/null'
+
+    # S3를 읽을 수 없으면 API로 계속 읽음
+    frame = athena.read_results('q', client=PagedResultsClient(rows), s3_client=FakeS3Client({}))
+    assert frame['path'].tolist() == [row[0] for row in rows]
+
+
+def test_cached_queries_are_not_run_again(tmp_path):
+    cache = athena_cache.QueryCache(str(tmp_path), ttl=3600)
+    client = FakeAthenaClient({'SELECT a': 3, 'SELECT b': 3, 'SELECT c': 3}, states={'SELECT c': 'FAILED'})
+    queries = {'a': 'SELECT a', 'b': 'SELECT b', 'c': 'SELECT c'}
+    statistics = {}
+    athena.run_queries(queries, 'db', 's3://out/', client=client, cache=cache, statistics=statistics)
+    assert len(client.executions) == 3
+    assert client.start_kwargs['ResultReuseConfiguration']['ResultReuseByAgeConfiguration']['MaxAgeInMinutes'] == 60
+
+    # 들여쓰기/주석만 다른 같은 쿼리는 새로 실행하지 않고, 실패한 쿼리는 다시 실행
+    statistics = {}
+    results = athena.run_queries({'a': 'SELECT a;', 'b': 'SELECT  b -- retry', 'c': 'SELECT c'}, 'db', 's3://out/',
+                                 client=client, cache=cache, statistics=statistics)
+    assert len(client.executions) == 4
+    assert results['a']['query'].tolist() == ['SELECT a']
+    assert statistics['a']['DataScannedInBytes'] == 0
+    assert statistics['a']['ResultReuseInformation']['ReusedPreviousResult']
+
+    # 다른 database, TTL 만료, bypass는 새로 실행
+    athena.run_queries({'a': 'SELECT a'}, 'other', 's3://out/', client=client, cache=cache)
+    athena.run_queries({'a': 'SELECT a'}, 'db', 's3://out/', client=client,
+                       cache=athena_cache.QueryCache(str(tmp_path), ttl=0))
+    bypass = athena_cache.QueryCache(str(tmp_path), bypass=True)
+    athena.run_queries({'b': 'SELECT b'}, 'db', 's3://out/', client=client, cache=bypass)
+    assert len(client.executions) == 7
+    assert 'ResultReuseConfiguration' not in client.start_kwargs
+
+
+def test_is_past_partition():
+    assert athena_cache.is_past_partition(2024, 1, 2)
+    assert not athena_cache.is_past_partition(2999, 1, 1)
+    assert not athena_cache.is_past_partition(2024, '01', '00')
+
+
+def test_normalize_query_keeps_string_literals():
+    query = """
+    SELECT a  -- 주석
+      FROM t
+     WHERE b = 'x  -- y' AND c = 'it''s'   ;
+    """
+    assert athena_cache.normalize_query(query) == "SELECT a FROM t WHERE b = 'x  -- y' AND c = 'it''s'"
+    # 문자열 안의 공백/주석 표시만 다른 쿼리는 다른 키
+    assert athena_cache.cache_key("SELECT 'a  b'", 'db') != athena_cache.cache_key("SELECT 'a b'", 'db')
+    assert athena_cache.cache_key("SELECT 'a--b'", 'db') != athena_cache.cache_key("SELECT 'a'", 'db')
+    assert athena_cache.cache_key('SELECT 1 -- x\n', 'db') == athena_cache.cache_key('  SELECT   1;', 'db')
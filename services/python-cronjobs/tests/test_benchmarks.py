@@ -0,0 +1,38 @@
+import json
+
+from tests.benchmarks import run_jobs
+from tests.benchmarks.fakes import AthenaTable, FakeAthena, VirtualClock
+
+
+def test_fake_athena_finishes_after_virtual_query_time():
+    clock = VirtualClock()
+    athena = FakeAthena(clock, [AthenaTable('FROM logs', [('ip', 'varchar'), ('bytes', 'bigint')], rows=1500,
+                                            duration=3.0)])
+    query_id = athena.start_query_execution({'QueryString': 'SELECT ip, bytes FROM logs'})['QueryExecutionId']
+
+    assert athena.get_query_execution({'QueryExecutionId': query_id})['QueryExecution']['Status']['State'] == 'RUNNING'
+    clock.sleep(5)
+    assert athena.get_query_execution({'QueryExecutionId': query_id})['QueryExecution']['Status']['State'] == 'SUCCEEDED'
+
+    first = athena.get_query_results({'QueryExecutionId': query_id})
+    second = athena.get_query_results({'QueryExecutionId': query_id, 'NextToken': first['NextToken']})
+    # 첫 페이지는 헤더 행 + 999행
+    assert len(first['ResultSet']['Rows']) == 1000
+    assert len(second['ResultSet']['Rows']) == 501
+    assert 'NextToken' not in second
+
+
+def test_benchmark_runs_jobs_offline(tmp_path):
+    output = tmp_path / 'result.json'
+    exit_code = run_jobs.main(['--jobs', 'albLogReportToSlack', 'eksMemoryMonitor', '--output', str(output)])
+
+    report = json.loads(output.read_text())
+    alb = report['scenarios']['albLogReportToSlack']
+    eks = report['scenarios']['eksMemoryMonitor']
+    assert exit_code == 0
+    assert alb['api_calls']['aws:athena.StartQueryExecution'] == 1
+    # 고정 5초 대기 대신 backoff 간격으로 확인하므로 쿼리가 끝난 직후에 결과를 가져옴
+    assert 0 < alb['sleep_seconds'] < 5.0
+    assert eks['api_calls']['kubernetes:PATCH'] == 1
+    assert eks['kubernetes_restarts'] == 1
+    assert eks['peak_rss_mb'] > 0
@@ -0,0 +1,49 @@
+import io
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from utils import charts
+from utils.common import get_retention, plot_graphs
+
+
+def engagement_frame(days=14, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Avg Session Count': rng.random(days) * 5,
+        'Avg Session Duration (Min)': rng.random(days) * 20,
+        'Avg Daily Total Duration (Min)': rng.random(days) * 60,
+    }, index=pd.date_range('2024-01-01', periods=days, freq='D'))
+
+
+def retention(days=7):
+    matrix = pd.DataFrame([[1.0 if period == 0 else 0.5 ** period if period < days - cohort else np.nan
+                            for period in range(days)] for cohort in range(days)],
+                          index=pd.period_range('2024-01-01', periods=days, freq='D'))
+    return matrix, pd.Series(100, index=matrix.index)
+
+
+def test_renders_to_buffer_without_pyplot_figures():
+    buffer = plot_graphs(engagement_frame(), io.BytesIO())
+    assert buffer.getvalue().startswith(b'\x89PNG')
+    assert plt.get_fignums() == []
+
+
+def test_get_retention_writes_unique_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(charts, 'CHART_DIR', str(tmp_path))
+    first = get_retention(None, fileName='almart', retention=retention())
+    second = get_retention(None, fileName='almart', retention=retention())
+    assert first != second
+    assert os.path.basename(first).startswith('retention_almart_')
+    assert all(os.path.getsize(file) > 0 for file in (first, second))
+
+
+def test_render_many_in_process_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(charts, 'CHART_DIR', str(tmp_path))
+    tasks = [(charts.render_engagement, (engagement_frame(seed=seed),), {'name': f'engagement{seed}'})
+             for seed in range(4)]
+    files = charts.render_many(tasks, processes=2)
+    assert [os.path.basename(file).split('_')[0] for file in files] == [f'engagement{seed}' for seed in range(4)]
+    assert len(set(files)) == 4
@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+
+import boto3
+import pandas as pd
+import pytest
+from botocore.stub import Stubber
+
+from utils import cost_explorer
+
+
+def cost_response(start, end, today, mutable_days=2, next_token=None):
+    """[start, end) 서비스 2개의 일별 비용 (today - mutable_days 이후는 Estimated)"""
+    results = []
+    day = start
+    while day < end:
+        results.append({
+            'TimePeriod': {'Start': day.isoformat(), 'End': (day + timedelta(days=1)).isoformat()},
+            'Groups': [{'Keys': [service], 'Metrics': {'UnblendedCost': {'Amount': str(amount), 'Unit': 'USD'}}}
+                       for service, amount in [('Amazon EC2', day.day * 10.0), ('Amazon S3', 1.0)]],
+            'Estimated': day >= today - timedelta(days=mutable_days),
+        })
+        day += timedelta(days=1)
+    response = {'ResultsByTime': results}
+    if next_token:
+        response['NextPageToken'] = next_token
+    return response
+
+
+def expected_params(start, end, next_token=None):
+    params = {
+        'TimePeriod': {'Start': start.isoformat(), 'End': end.isoformat()},
+        'Granularity': 'DAILY',
+        'Metrics': ['UnblendedCost'],
+        'GroupBy': [{'Type': 'DIMENSION', 'Key': 'SERVICE'}],
+    }
+    if next_token:
+        params['NextPageToken'] = next_token
+    return params
+
+
+@pytest.fixture
+def client():
+    client = boto3.client('ce', region_name='us-east-1', aws_access_key_id='test', aws_secret_access_key='test')
+    with Stubber(client) as stubber:
+        client.stubber = stubber
+        yield client
+        stubber.assert_no_pending_responses()
+
+
+def test_final_days_are_cached(client, tmp_path):
+    today = date(2024, 3, 10)
+    start, end = date(2024, 2, 1), date(2024, 3, 9)
+
+    # 첫 실행: 전체 기간을 한 번 조회하고 확정된 날짜(3/6 이전)만 캐시
+    client.stubber.add_response('get_cost_and_usage', cost_response(start, end + timedelta(days=1), today),
+                                expected_params(start, end + timedelta(days=1)))
+    history = cost_explorer.CostHistory(str(tmp_path), client=client, mutable_days=3)
+    costs = history.daily_costs(start, end, today)
+    assert history.requests == 1
+    assert len(costs) == 38 * 2
+    assert max(history.final_days) == date(2024, 3, 6)
+    assert costs['amount'].dtype == 'float64'
+
+    # 다음 날: 캐시를 다시 읽고 최근 3일과 새 날짜만 조회
+    today, end = date(2024, 3, 11), date(2024, 3, 10)
+    client.stubber.add_response('get_cost_and_usage',
+                                cost_response(date(2024, 3, 7), end + timedelta(days=1), today),
+                                expected_params(date(2024, 3, 7), end + timedelta(days=1)))
+    history = cost_explorer.CostHistory(str(tmp_path), client=client, mutable_days=3)
+    costs = history.daily_costs(start, end, today)
+    assert history.requests == 1
+    assert len(costs) == 39 * 2
+    assert costs[costs['date'] == '2024-02-15']['amount'].sum() == 151.0
+    assert max(history.final_days) == date(2024, 3, 7)
+
+
+def test_missing_days_and_pages(client, tmp_path):
+    today = date(2024, 3, 20)
+    history = cost_explorer.CostHistory(str(tmp_path), client=client, mutable_days=3)
+    history.final_days = {date(2024, 3, 1), date(2024, 3, 2), date(2024, 3, 5)}
+
+    # 캐시에 없는 3/3~3/4, 3/6~3/10이 각각 한 구간, 두 번째 구간은 NextPageToken으로 두 페이지
+    client.stubber.add_response('get_cost_and_usage', cost_response(date(2024, 3, 3), date(2024, 3, 5), today),
+                                expected_params(date(2024, 3, 3), date(2024, 3, 5)))
+    client.stubber.add_response('get_cost_and_usage',
+                                cost_response(date(2024, 3, 6), date(2024, 3, 8), today, next_token='page2'),
+                                expected_params(date(2024, 3, 6), date(2024, 3, 11)))
+    client.stubber.add_response('get_cost_and_usage', cost_response(date(2024, 3, 8), date(2024, 3, 11), today),
+                                expected_params(date(2024, 3, 6), date(2024, 3, 11), 'page2'))
+    history.daily_costs(date(2024, 3, 1), date(2024, 3, 10), today)
+    assert history.requests == 3
+    assert history.final_days == {date(2024, 3, day) for day in range(1, 11)}
+
+    assert cost_explorer._spans([date(2024, 1, 1) + timedelta(days=offset) for offset in range(100)], 90) == [
+        (date(2024, 1, 1), date(2024, 3, 31)), (date(2024, 3, 31), date(2024, 4, 10))]
+
+
+def test_summarize_costs():
+    today = date(2024, 3, 10)
+    frame = pd.DataFrame(
+        [(day['TimePeriod']['Start'], group['Keys'][0], float(group['Metrics']['UnblendedCost']['Amount']))
+         for day in cost_response(date(2024, 2, 1), today, today)['ResultsByTime'] for group in day['Groups']],
+        columns=cost_explorer.COLUMNS)
+    summary = cost_explorer.summarize_costs(frame, date(2024, 3, 9))
+    assert summary['previous_month'] == '2024-02'
+    assert summary['previous_month_total'] == pytest.approx(sum(day * 10.0 + 1 for day in range(1, 30)))
+    assert summary['day_total'] == 91.0
+    assert summary['day_change_percentage'] == pytest.approx((91 - 81) / 81 * 100)
+    assert [service for service, _ in summary['top_services']] == ['Amazon EC2', 'Amazon S3']
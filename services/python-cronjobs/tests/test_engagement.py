@@ -0,0 +1,54 @@
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from utils.common import getEngagement
+from utils.engagement import split_sessions, summarize_engagement
+
+
+def random_logs(users=30, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for user in range(users):
+        now = datetime(2024, 1, 1) + timedelta(seconds=rng.randint(0, 86400))
+        for _ in range(rng.randint(1, 40)):
+            rows.append({'userId': f'user-{user}', 'createdAt': now})
+            # 정확히 5분 간격은 같은 세션으로 유지되는지 함께 확인
+            now += rng.choice([timedelta(seconds=30), timedelta(minutes=5), timedelta(minutes=5, seconds=1),
+                               timedelta(hours=2), timedelta(0)])
+    return pd.DataFrame(rows)
+
+
+def test_summarize_engagement_matches_get_engagement():
+    logs = random_logs()
+    # 정렬되지 않은 입력도 처리
+    result = summarize_engagement(logs.sample(frac=1, random_state=0), with_durations=True)
+
+    for user, group in logs.groupby('userId'):
+        expected = getEngagement(group.sort_values('createdAt').to_dict('records'))
+        actual = result.loc[user]
+        assert actual['sessionCount'] == expected['sessionCount']
+        assert actual['averageSessionDuration'] == expected['averageSessionDuration']
+        assert actual['totalDuration'] == expected['totalDuration']
+        assert actual['sessionDurationList'] == expected['sessionDurationList']
+
+
+def test_split_sessions_returns_one_row_per_session():
+    logs = pd.DataFrame({
+        'userId': ['a', 'a', 'a', 'b'],
+        'createdAt': pd.to_datetime(['2024-01-01 00:00', '2024-01-01 00:04', '2024-01-01 00:20', '2024-01-01 00:00']),
+    })
+    sessions = split_sessions(logs)
+
+    assert sessions['userId'].tolist() == ['a', 'a', 'b']
+    assert sessions['sessionDuration'].tolist() == [pd.Timedelta(minutes=4), pd.Timedelta(0), pd.Timedelta(0)]
+
+
+def test_empty_logs():
+    logs = pd.DataFrame({'userId': pd.Series([], dtype=object), 'createdAt': pd.Series([], dtype='datetime64[ns]')})
+    for with_durations in (False, True):
+        result = summarize_engagement(logs, with_durations=with_durations)
+        assert result.empty and 'sessionCount' in result
+    assert 'sessionDurationList' in summarize_engagement(logs, with_durations=True)
+    assert split_sessions(logs).empty
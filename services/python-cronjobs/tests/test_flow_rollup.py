@@ -0,0 +1,136 @@
+from datetime import date
+
+import boto3
+import pandas as pd
+import pytest
+from botocore.stub import Stubber
+
+from utils import athena, flow_rollup
+
+
+class FakeRollupClient:
+    """SELECT DISTINCT dt는 existing을 반환하고 나머지 쿼리는 바로 성공하는 Athena client"""
+
+    class exceptions:
+        class MetadataException(Exception):
+            pass
+
+    COLUMNS = ['srcaddr', 'dstaddr', 'instance_id', 'flow_direction', 'bytes', 'packets', 'flow_count', 'interface_id']
+
+    def __init__(self, existing, table_exists=True, columns=COLUMNS):
+        self.existing = existing
+        self.table_exists = table_exists
+        self.columns = columns
+        self.queries = {}
+
+    def get_table_metadata(self, **kwargs):
+        if not self.table_exists:
+            raise self.exceptions.MetadataException(kwargs['TableName'])
+        return {'TableMetadata': {'Name': kwargs['TableName'], 'Columns': [{'Name': name} for name in self.columns],
+                                  'PartitionKeys': [{'Name': 'dt'}]}}
+
+    def start_query_execution(self, QueryString, **kwargs):
+        query_execution_id = f'q{len(self.queries)}'
+        self.queries[query_execution_id] = QueryString
+        return {'QueryExecutionId': query_execution_id}
+
+    def batch_get_query_execution(self, QueryExecutionIds):
+        return {'QueryExecutions': [{'QueryExecutionId': query_execution_id, 'Status': {'State': 'SUCCEEDED'}}
+                                    for query_execution_id in QueryExecutionIds]}
+
+    def get_query_results(self, QueryExecutionId, **kwargs):
+        values = self.existing if 'SELECT DISTINCT dt' in self.queries[QueryExecutionId] else []
+        return {'ResultSet': {
+            'ResultSetMetadata': {'ColumnInfo': [{'Label': 'dt', 'Type': 'varchar'}]},
+            'Rows': [{'Data': [{'VarCharValue': value}]} for value in ['dt'] + values],
+        }}
+
+
+def s3_stubber(client, listings, errors=None):
+    """prefix별 list_objects_v2 응답과 파일이 있는 prefix의 delete_objects 응답을 순서대로 등록한 Stubber"""
+    stubber = Stubber(client)
+    for prefix, keys in listings.items():
+        stubber.add_response('list_objects_v2', {'Contents': [{'Key': key} for key in keys]} if keys else {},
+                             {'Bucket': 'bucket', 'Prefix': prefix})
+        if keys:
+            response = {'Errors': [{'Key': key, 'Code': 'AccessDenied', 'Message': 'Access Denied'}
+                                   for key in keys]} if errors else {}
+            stubber.add_response('delete_objects', response,
+                                 {'Bucket': 'bucket', 'Delete': {'Objects': [{'Key': key} for key in keys],
+                                                                 'Quiet': True}})
+    return stubber
+
+
+@pytest.fixture
+def s3_client():
+    return boto3.client('s3', region_name='ap-northeast-2', aws_access_key_id='test', aws_secret_access_key='test')
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(athena.time, 'sleep', lambda seconds: None)
+
+
+def test_only_missing_days_are_rolled_up():
+    days = flow_rollup.rollup_days(date(2024, 3, 2), 3)
+    assert days == [date(2024, 2, 29), date(2024, 3, 1), date(2024, 3, 2)]
+
+    client = FakeRollupClient(['2024-02-29', '2024-03-01'])
+    assert flow_rollup.ensure_rollups(days, 'db', 's3://out/', 'rollup', 's3://rollup/', client=client,
+                                      refresh_days=0) == [days[-1]]
+    inserts = [query for query in client.queries.values() if query.startswith('INSERT INTO rollup')]
+    assert len(inserts) == 1
+    assert "'2024-03-02' AS dt" in inserts[0] and 'year = 2024 AND month = 3 AND day = 2' in inserts[0]
+    assert not any(query.startswith('ALTER TABLE') for query in client.queries.values())
+
+    # interface_id가 없던 이전 테이블에는 컬럼을 추가한 뒤 집계
+    client = FakeRollupClient(['2024-02-29', '2024-03-01'], columns=FakeRollupClient.COLUMNS[:-1])
+    flow_rollup.ensure_rollups(days, 'db', 's3://out/', 'rollup', 's3://rollup/', client=client, refresh_days=0)
+    queries = list(client.queries.values())
+    assert queries[0] == 'ALTER TABLE rollup ADD COLUMNS (interface_id string)'
+    assert 'flow_count,\n        interface_id,' in queries[-1]
+
+    # 테이블이 없으면 CTAS로 만든 뒤 모든 날짜를 집계
+    client = FakeRollupClient([], table_exists=False)
+    assert flow_rollup.ensure_rollups(days, 'db', 's3://out/', 'rollup', 's3://rollup/', client=client,
+                                      refresh_days=0) == days
+    queries = list(client.queries.values())
+    assert 'CREATE TABLE rollup' in queries[0] and 'WITH NO DATA' in queries[0]
+    assert sum(query.startswith('INSERT INTO') for query in queries) == 3
+
+
+def test_recent_days_are_refreshed(s3_client):
+    days = flow_rollup.rollup_days(date(2024, 3, 2), 3)
+    client = FakeRollupClient(['2024-02-29', '2024-03-01', '2024-03-02'])
+    # 마지막 2일은 이미 집계했어도 파티션 파일을 지우고 다시 집계 (dt=2024-02-29는 조회하지 않음)
+    with s3_stubber(s3_client, {'rollup/dt=2024-03-01/': ['rollup/dt=2024-03-01/a', 'rollup/dt=2024-03-01/b'],
+                                'rollup/dt=2024-03-02/': []}) as stubber:
+        assert flow_rollup.ensure_rollups(days, 'db', 's3://out/', 'rollup', 's3://bucket/rollup/', client=client,
+                                          refresh_days=2, s3_client=s3_client) == days[1:]
+        stubber.assert_no_pending_responses()
+    assert sum(query.startswith('INSERT INTO rollup') for query in client.queries.values()) == 2
+
+    # 파일을 지우지 못한 날짜는 중복 집계되지 않도록 다시 집계하지 않음
+    client = FakeRollupClient(['2024-02-29', '2024-03-01'])
+    with s3_stubber(s3_client, {'rollup/dt=2024-03-01/': ['rollup/dt=2024-03-01/a']}, errors=True) as stubber:
+        assert flow_rollup.ensure_rollups(days, 'db', 's3://out/', 'rollup', 's3://bucket/rollup/', client=client,
+                                          refresh_days=2, s3_client=s3_client) == [days[-1]]
+        stubber.assert_no_pending_responses()
+
+
+def test_daily_comparison():
+    days = flow_rollup.rollup_days(date(2024, 3, 14))
+    totals = pd.DataFrame({
+        'dt': [day.isoformat() for day in days],
+        # 2주 전 7일은 100GB, 지난주 6일은 200GB, 마지막 날은 400GB
+        'total_gb': [100.0] * 7 + [200.0] * 6 + [400.0],
+        'unique_sources': range(14),
+        'unique_destinations': range(14, 28),
+    }).drop(index=2)  # rollup에 없는 날짜는 평균에서 제외
+    comparison = flow_rollup.daily_comparison(totals, date(2024, 3, 14)).iloc[0]
+    assert comparison['today_gb'] == 400.0 and comparison['yesterday_gb'] == 200.0
+    assert comparison['change_percentage'] == 100.0
+    assert comparison['today_unique_sources'] == 13 and comparison['today_unique_destinations'] == 27
+    assert comparison['last_week_avg_gb'] == pytest.approx((200 * 6 + 400) / 7)
+    assert comparison['two_weeks_ago_avg_gb'] == 100.0
+    assert flow_rollup.daily_comparison(pd.DataFrame(), date(2024, 3, 14)).empty
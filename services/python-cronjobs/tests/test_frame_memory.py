@@ -0,0 +1,57 @@
+import logging
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+
+from utils.frame_memory import MemoryReport, optimize_frame
+from utils.mongo_frames import iter_frames, read_frame
+
+
+def raw_logs(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    users = [ObjectId() for _ in range(50)]
+    return pd.DataFrame({
+        'userId': pd.Series([users[value] for value in rng.integers(0, 50, rows)], dtype=object),
+        'event': pd.Series(rng.choice(['login', 'view', 'purchase'], rows), dtype=object),
+        'createdAt': pd.Series([datetime(2024, 1, 1) + timedelta(seconds=int(value))
+                                for value in rng.integers(0, 86400, rows)], dtype=object),
+        'count': rng.integers(0, 100, rows),
+        'price': rng.integers(0, 1000, rows).astype('float64') / 4,
+        'ratio': rng.random(rows),
+        'message': [f'message {value}' for value in range(rows)],
+    })
+
+
+def test_optimize_frame_compacts_columns_and_logs(caplog):
+    frame = raw_logs()
+    with caplog.at_level(logging.INFO, logger='utils.frame_memory'):
+        optimized = optimize_frame(frame, name='UserLogs')
+
+    assert isinstance(optimized['userId'].dtype, pd.CategoricalDtype)
+    assert optimized['userId'].iloc[0] == str(frame['userId'].iloc[0])
+    assert isinstance(optimized['event'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_dtype(optimized['createdAt'])
+    assert optimized['count'].dtype == np.int8
+    # 0.25 단위 값은 float32로 표현 가능, 임의의 실수는 float64 유지
+    assert optimized['price'].dtype == np.float32
+    assert optimized['ratio'].dtype == np.float64
+    # 고유한 문자열은 category로 바꾸지 않음
+    assert not isinstance(optimized['message'].dtype, pd.CategoricalDtype)
+    assert optimized.memory_usage(deep=True).sum() < frame.memory_usage(deep=True).sum() / 2
+    assert 'UserLogs memory' in caplog.text and 'userId: object' in caplog.text
+    # 원본은 바뀌지 않음
+    assert frame['count'].dtype == np.int64
+
+
+def test_chunked_optimize_accumulates_report():
+    documents = raw_logs(1000).to_dict('records')
+    report = MemoryReport('UserLogs')
+    frame = read_frame(iter_frames(documents, ['userId', 'event', 'count'], chunk_size=300, report=report))
+
+    assert len(frame) == 1000
+    assert isinstance(frame['userId'].dtype, pd.CategoricalDtype)
+    summary = report.to_frame().set_index('column')
+    assert summary.loc['userId', 'after_dtype'] == 'category'
+    assert summary['after_bytes'].sum() < summary['before_bytes'].sum()
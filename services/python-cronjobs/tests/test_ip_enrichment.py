@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import boto3
+import pandas as pd
+import pytest
+from botocore.stub import Stubber
+
+from utils import ip_enrichment
+
+
+@pytest.fixture
+def ec2_client():
+    """ENI 두 페이지와 인스턴스 한 페이지를 한 번씩만 응답하는 EC2 client (두 번 조회하면 Stubber 오류)"""
+    client = boto3.client('ec2', region_name='ap-northeast-2', aws_access_key_id='test', aws_secret_access_key='test')
+    with Stubber(client) as stubber:
+        stubber.add_response('describe_network_interfaces', {'NextToken': 'page-2', 'NetworkInterfaces': [{
+            'NetworkInterfaceId': 'eni-1', 'Description': '', 'Attachment': {'InstanceId': 'i-1'},
+            'PrivateIpAddresses': [
+                {'PrivateIpAddress': '10.0.0.1', 'Association': {'PublicIp': '3.34.0.1'}},
+                {'PrivateIpAddress': '10.0.0.2'},
+            ]}]})
+        stubber.add_response('describe_network_interfaces', {'NetworkInterfaces': [{
+            'NetworkInterfaceId': 'eni-2', 'Description': 'ELB app/demo-alb/123',
+            'PrivateIpAddresses': [{'PrivateIpAddress': '10.0.1.5'}]}]}, {'NextToken': 'page-2'})
+        stubber.add_response('describe_instances', {'Reservations': [{'Instances': [
+            {'InstanceId': 'i-1', 'Tags': [{'Key': 'env', 'Value': 'prod'}, {'Key': 'Name', 'Value': 'node-a'}]},
+        ]}]})
+        yield client
+        stubber.assert_no_pending_responses()
+
+
+def pod(name, ip, labels, host_network=False):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(name=name, namespace='demo-services', labels=labels),
+        spec=SimpleNamespace(host_network=host_network),
+        status=SimpleNamespace(pod_ip=ip, pod_i_ps=None),
+    )
+
+
+class FakeCoreV1:
+    def list_pod_for_all_namespaces(self, **kwargs):
+        return SimpleNamespace(items=[
+            pod('demo-bff-abc', '10.0.0.2', {'app': 'demo-bff'}),
+            pod('aws-node-xyz', '10.0.0.1', {'k8s-app': 'aws-node'}, host_network=True),
+            pod('batch-1', '10.0.9.9', None),
+        ])
+
+
+@pytest.fixture(autouse=True)
+def clear_index():
+    ip_enrichment.clear_ip_index()
+    yield
+    ip_enrichment.clear_ip_index()
+
+
+def test_build_ip_index(ec2_client):
+    index = ip_enrichment.build_ip_index(ec2_client, FakeCoreV1()).set_index('ip')
+    # 인스턴스 IP는 Name 태그, 파드 IP는 namespace/service, 그 외 ENI는 설명
+    assert index.loc['10.0.0.1', 'name'] == 'node-a' and index.loc['3.34.0.1', 'instance_id'] == 'i-1'
+    assert index.loc['10.0.0.2', 'name'] == 'demo-services/demo-bff'
+    assert index.loc['10.0.0.2', 'eni_id'] == 'eni-1'
+    assert index.loc['10.0.9.9', 'name'] == 'demo-services/batch-1'
+    assert index.loc['10.0.1.5', 'name'] == 'ELB app/demo-alb/123'
+
+
+def test_index_is_built_once_and_merged(ec2_client):
+    index = ip_enrichment.get_ip_index(ec2_client=ec2_client, core_v1=FakeCoreV1())
+    assert ip_enrichment.get_ip_index(ec2_client=ec2_client) is index
+
+    pairs = pd.DataFrame({'srcaddr': ['10.0.0.2', '8.8.8.8', '10.0.0.2'], 'dstaddr': ['10.0.1.5'] * 3,
+                          'total_bytes': [3.0, 2.0, 1.0]})
+    enriched = ip_enrichment.enrich(pairs, 'srcaddr', index, {'name': 'src_name', 'instance_id': 'src_instance'})
+    assert list(enriched.columns) == ['srcaddr', 'src_name', 'src_instance', 'dstaddr', 'total_bytes']
+    assert enriched['src_name'].tolist() == ['demo-services/demo-bff', '', 'demo-services/demo-bff']
+    assert enriched['total_bytes'].tolist() == [3.0, 2.0, 1.0]
+    assert ip_enrichment.enrich(pairs.iloc[:0], 'srcaddr', index).empty
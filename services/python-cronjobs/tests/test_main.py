@@ -0,0 +1,91 @@
+import logging
+import runpy
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    """utils.config 대신 테스트용 configs로 main.py를 실행 (실행 후 추가된 핸들러 제거)"""
+    config = types.ModuleType('utils.config')
+    config.configs = {'enableSlack': False, 'slackToken': 'xoxb-test'}
+    monkeypatch.setitem(sys.modules, 'utils.config', config)
+    monkeypatch.setenv('ENABLE_METRICS', 'false')
+
+    def run(*argv, **configs):
+        config.configs.update(configs)
+        monkeypatch.setattr(sys, 'argv', ['main.py', *argv])
+        runpy.run_path('main.py', run_name='__main__')
+
+    yield run
+    for name in ('__main__', 'utils'):
+        target = logging.getLogger(name)
+        for handler in list(target.handlers):
+            target.removeHandler(handler)
+        target.setLevel(logging.NOTSET)
+
+
+def test_utils_logs_reach_runner_output(run_main, tmp_path, capsys):
+    job = tmp_path / 'job.py'
+    job.write_text(
+        "from utils.athena import log_statistics\n"
+        "log_statistics('daily_totals', {'Status': {'State': 'SUCCEEDED'}, 'Statistics': {\n"
+        "    'QueryQueueTimeInMillis': 120, 'EngineExecutionTimeInMillis': 3400}})\n"
+    )
+    run_main('--name', 'test-job', '--files', str(job))
+
+    output = capsys.readouterr().out
+    assert 'Athena query daily_totals SUCCEEDED: queue 120ms' in output and 'engine 3400ms' in output
+    assert 'CronJob 실행(test-job)' in output
+    assert f'{job} executed successfully' in output
+
+
+def test_athena_query_progress_reaches_runner_output(run_main, tmp_path, capsys, monkeypatch):
+    from utils import athena
+
+    monkeypatch.setattr(athena.time, 'sleep', lambda seconds: None)
+    job = tmp_path / 'job.py'
+    job.write_text(
+        "from utils.athena import run_queries\n"
+        "class Client:\n"
+        "    def start_query_execution(self, **kwargs):\n"
+        "        return {'QueryExecutionId': 'q1'}\n"
+        "    def batch_get_query_execution(self, QueryExecutionIds):\n"
+        "        return {'QueryExecutions': [{'QueryExecutionId': 'q1', 'Status': {'State': 'SUCCEEDED'}}]}\n"
+        "    def get_query_results(self, **kwargs):\n"
+        "        return {'ResultSet': {'ResultSetMetadata': {'ColumnInfo': [{'Label': 'n', 'Type': 'bigint'}]},\n"
+        "                              'Rows': [{'Data': [{'VarCharValue': 'n'}]}, {'Data': [{'VarCharValue': '1'}]}]}}\n"
+        "run_queries({'daily_totals': 'SELECT 1'}, 'db', 's3://out/', client=Client())\n"
+    )
+    run_main('--name', 'test-job', '--files', str(job))
+
+    output = capsys.readouterr().out
+    # 쿼리별 시작/종료/결과 크기 로그
+    assert 'Started Athena query daily_totals: q1' in output
+    assert 'Athena query daily_totals SUCCEEDED' in output
+    assert 'Athena query daily_totals results: (1, 1)' in output
+
+
+def test_mongodb_logs_reach_runner_output(run_main, tmp_path, capsys, monkeypatch):
+    # 테스트용 configs로 다시 import
+    monkeypatch.delitem(sys.modules, 'utils.mongodb_manager', raising=False)
+    job = tmp_path / 'job.py'
+    job.write_text(
+        "from types import SimpleNamespace\n"
+        "from utils.mongodb_manager import mongodb_manager\n"
+        "mongodb_manager.get_connection('cluster0')\n"
+        "event = dict(command_name='find', database_name='DEMO', connection_id=('localhost', 27017), request_id=1)\n"
+        "mongodb_manager.listener.started(SimpleNamespace(command={'find': 'NewUsers'}, **event))\n"
+        "mongodb_manager.listener.succeeded(SimpleNamespace(duration_micros=120000, reply={}, **event))\n"
+        "mongodb_manager.close_all()\n"
+    )
+    run_main('--name', 'test-job', '--files', str(job), useInternalDb=False, mongoSlowQueryMs=50,
+             dbUriMap={'cluster0': 'mongodb://localhost:1/?serverSelectionTimeoutMS=100'})
+
+    output = capsys.readouterr().out
+    assert 'MongoDB client created for cluster0' in output
+    assert 'Slow MongoDB find on DEMO.NewUsers: 120ms' in output
+    assert 'MongoDB command summary:\nDEMO.NewUsers find: 1 calls' in output
+    assert 'Closing MongoDB connection...' in output
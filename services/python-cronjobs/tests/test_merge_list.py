@@ -0,0 +1,53 @@
+import subprocess
+import sys
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from utils.common import merge_list
+
+
+def reduce_merge(index, df_list):
+    return reduce(lambda left, right: pd.merge(left, right, on=[index], how='outer'), df_list)
+
+
+def report_frames(count, rows=100, seed=0):
+    rng = np.random.default_rng(seed)
+    return [pd.DataFrame({
+        'name': [f'resource-{value}' for value in rng.choice(rows * 2, rows, replace=False)],
+        f'count{number}': rng.integers(0, 1000, rows),
+        f'cost{number}': rng.random(rows) * 100,
+    }) for number in range(count)]
+
+
+def test_single_pass_matches_reduce_of_outer_merges():
+    frames = report_frames(6)
+    # key가 첫 컬럼이 아닌 frame도 같은 컬럼 순서를 유지
+    frames[0] = frames[0][['count0', 'name', 'cost0']]
+    pdt.assert_frame_equal(merge_list('name', frames), reduce_merge('name', frames))
+
+
+def test_duplicate_keys_and_overlapping_columns_fall_back_to_merge():
+    duplicated = [pd.DataFrame({'name': ['a', 'a', 'b'], 'x': [1, 2, 3]}), pd.DataFrame({'name': ['a', 'c'], 'y': [4, 5]})]
+    pdt.assert_frame_equal(merge_list('name', duplicated), reduce_merge('name', duplicated))
+
+    overlapping = [pd.DataFrame({'name': ['a', 'b'], 'x': [1, 2]}), pd.DataFrame({'name': ['b', 'c'], 'x': [3, 4]})]
+    pdt.assert_frame_equal(merge_list('name', overlapping), reduce_merge('name', overlapping))
+
+
+def test_downcast_keeps_values():
+    frames = report_frames(3)
+    merged = merge_list('name', frames)
+    downcast = merge_list('name', frames, downcast=True)
+    assert downcast.memory_usage(deep=True).sum() < merged.memory_usage(deep=True).sum()
+    pdt.assert_frame_equal(downcast, merged, check_dtype=False, rtol=1e-7)
+
+
+def test_star_import_does_not_load_heavy_modules():
+    # 새 인터프리터에서 star import 후 pandas 등이 로드되지 않았는지 확인
+    code = ("import sys; from utils.common import *; "
+            "print(sorted(m for m in ('pandas', 'seaborn', 'matplotlib', 'bson') if m in sys.modules))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
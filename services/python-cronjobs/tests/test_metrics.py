@@ -0,0 +1,63 @@
+import socket
+
+import boto3
+from botocore.stub import Stubber
+
+from utils.metrics import ApiCallTracker, DogStatsd, JobMetrics
+
+
+def udp_listener():
+    """DogStatsD agent 대신 메트릭을 받을 로컬 UDP 소켓"""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.settimeout(2)
+    return listener
+
+
+def receive_lines(listener):
+    lines = []
+    listener.settimeout(0.5)
+    try:
+        while True:
+            lines.extend(listener.recv(65535).decode('utf-8').splitlines())
+    except socket.timeout:
+        pass
+    return lines
+
+
+def test_dogstatsd_sends_tagged_metrics_over_udp():
+    listener = udp_listener()
+    statsd = DogStatsd('127.0.0.1', listener.getsockname()[1], constant_tags=['job:test'])
+
+    statsd.gauge('file.peak_rss_mb', 12.5, ['file:a.py'])
+    statsd.increment('file.runs', 1, ['file:a.py', 'status:success'])
+    statsd.histogram('file.duration', 0.25)
+    statsd.flush()
+
+    assert receive_lines(listener) == [
+        'cronjob.file.peak_rss_mb:12.5|g|#job:test,file:a.py',
+        'cronjob.file.runs:1|c|#job:test,file:a.py,status:success',
+        'cronjob.file.duration:0.25|h|#job:test',
+    ]
+
+
+def test_job_metrics_reports_aws_calls_per_file():
+    listener = udp_listener()
+    tracker = ApiCallTracker()
+    session = boto3.Session(aws_access_key_id='test', aws_secret_access_key='test', region_name='ap-northeast-2')
+    tracker.instrument_boto3_session(session)
+    athena = session.client('athena')
+
+    metrics = JobMetrics('reportCost', DogStatsd('127.0.0.1', listener.getsockname()[1]), tracker)
+    metrics.start_file()
+    with Stubber(athena) as stubber:
+        stubber.add_response('get_query_execution', {'QueryExecution': {'Status': {'State': 'SUCCEEDED'}}})
+        stubber.add_response('get_query_execution', {'QueryExecution': {'Status': {'State': 'SUCCEEDED'}}})
+        athena.get_query_execution(QueryExecutionId='q-1')
+        athena.get_query_execution(QueryExecutionId='q-2')
+    metrics.finish_file('00-report cost.py', 'success', 1.5, peak_rss_mb=100.0, cpu_seconds=0.5)
+
+    lines = receive_lines(listener)
+    assert 'cronjob.file.runs:1|c|#job:reportCost,file:00-report_cost.py,status:success' in lines
+    assert ('cronjob.api.calls:2|c|#job:reportCost,file:00-report_cost.py,api:aws,operation:athena.GetQueryExecution'
+            in lines)
@@ -0,0 +1,128 @@
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from utils.common import cohort_retention
+from utils.engagement import split_sessions, summarize_engagement
+from utils.mongo_aggregations import (cohort_pipeline, engagement_from_rows, engagement_pipeline,
+                                      retention_from_rows)
+
+
+def activity_logs(events=2000, users=50, seed=0):
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.integers(0, 7 * 86400, events))
+    return pd.DataFrame({
+        'userId': [f'user-{value}' for value in rng.integers(0, users, events)],
+        'createdAt': pd.Timestamp('2024-01-01') + pd.to_timedelta(offsets, unit='s'),
+    })
+
+
+def stage(pipeline, name, index=0):
+    """pipeline에서 index번째 name stage"""
+    return [step[name] for step in pipeline if name in step][index]
+
+
+def test_cohort_pipeline_stages():
+    match = {'createdAt': {'$gte': pd.Timestamp('2024-01-01').to_pydatetime()}}
+    cohort = cohort_pipeline(match, activity_column='createdAt', tz='UTC')
+    assert cohort[0] == {'$match': match}
+    # 활동 시각을 tz 기준 날짜로 자른 (user, day)별 한 건
+    assert stage(cohort, '$group')['_id']['day'] == {
+        '$dateTrunc': {'date': '$createdAt', 'unit': 'day', 'timezone': 'UTC'}}
+    # period_number는 cohort부터 활동일까지의 tz 기준 일수
+    key = stage(cohort, '$group', 2)['_id']
+    assert key['period_number'] == {
+        '$dateDiff': {'startDate': '$cohort', 'endDate': '$days', 'unit': 'day', 'timezone': 'UTC'}}
+    assert key['cohort']['$dateToString']['timezone'] == 'UTC'
+    assert list(cohort[-1]['$project']) == ['_id', 'cohort', 'period_number', 'n_users']
+
+
+def test_engagement_pipeline_stages():
+    match = {'createdAt': {'$gte': pd.Timestamp('2024-01-01').to_pydatetime()}}
+    engagement = engagement_pipeline(match, gap=timedelta(minutes=10))
+    assert engagement[0] == {'$match': match}
+    # 사용자별로 시간 순 정렬한 직전 로그 시각
+    window = stage(engagement, '$setWindowFields')
+    assert window['partitionBy'] == '$user' and window['sortBy'] == {'time': 1}
+    assert window['output']['previous'] == {'$shift': {'output': '$time', 'by': -1}}
+    assert stage(engagement, '$set')['gap'] == {'$subtract': ['$time', '$previous']}
+    assert stage(engagement, '$set', 1)['sessionStart'] == {'$or': [{'$eq': ['$gap', None]},
+                                                                     {'$gt': ['$gap', 600_000]}]}
+
+    durations = engagement_pipeline(match, with_durations=True)
+    # 세션 번호는 같은 정렬 기준의 누적 합, 세션 목록은 세션 번호 순으로 push
+    session = stage(durations, '$setWindowFields', 1)
+    assert session['partitionBy'] == '$user' and session['sortBy'] == {'time': 1}
+    assert session['output']['session']['window'] == {'documents': ['unbounded', 'current']}
+    assert stage(durations, '$sort') == {'_id.user': 1, '_id.session': 1}
+    assert 'durationsMs' in durations[-1]['$project']
+
+
+@pytest.fixture
+def mongo_collection():
+    """MONGODB_TEST_URI(예: mongodb://localhost:27017)의 MongoDB 5.0+ 임시 컬렉션 (없으면 skip)"""
+    uri = os.getenv('MONGODB_TEST_URI')
+    if not uri:
+        pytest.skip('MONGODB_TEST_URI is not set')
+    pymongo = pytest.importorskip('pymongo')
+    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=2000, tz_aware=False)
+    try:
+        version = tuple(client.server_info()['versionArray'][:2])
+    except pymongo.errors.PyMongoError as e:
+        pytest.skip(f'MongoDB is not available: {e}')
+    if version < (5, 0):
+        pytest.skip(f'MongoDB {version} does not support $setWindowFields')
+    collection = client['python_cronjobs_test'][f'activity_{os.getpid()}']
+    yield collection
+    collection.drop()
+    client.close()
+
+
+def test_pipelines_on_mongodb(mongo_collection):
+    logs = activity_logs(events=500, users=20)
+    mongo_collection.insert_many(logs.assign(createdAt=logs['createdAt'].dt.to_pydatetime()).to_dict('records'))
+
+    rows = pd.DataFrame(mongo_collection.aggregate(cohort_pipeline({}, activity_column='createdAt', tz='UTC')))
+    matrix, size = retention_from_rows(rows)
+    expected_matrix, expected_size = cohort_retention(logs.assign(loggedDate_x=logs['createdAt'],
+                                                                  loggedDate_y=logs['createdAt']))
+    pdt.assert_frame_equal(matrix, expected_matrix, check_names=False, check_column_type=False, check_dtype=False)
+    pdt.assert_series_equal(size, expected_size, check_names=False, check_dtype=False)
+
+    rows = pd.DataFrame(mongo_collection.aggregate(engagement_pipeline({}, with_durations=True)))
+    result = engagement_from_rows(rows)
+    expected = summarize_engagement(logs, with_durations=True)
+    pdt.assert_frame_equal(result.sort_index(), expected.sort_index(), check_dtype=False,
+                           check_index_type=False, check_categorical=False)
+
+
+def test_retention_rows_match_cohort_retention():
+    logs = activity_logs()
+    # 파이프라인 결과와 같은 형식: cohort(YYYY-MM-DD), period_number, n_users
+    first_seen = logs.groupby('userId')['createdAt'].transform('min').dt.normalize()
+    rows = (logs.assign(cohort=first_seen.dt.strftime('%Y-%m-%d'),
+                        period_number=(logs['createdAt'].dt.normalize() - first_seen).dt.days)
+            .groupby(['cohort', 'period_number'])['userId'].nunique().rename('n_users').reset_index())
+
+    matrix, size = retention_from_rows(rows)
+    expected_matrix, expected_size = cohort_retention(logs.assign(loggedDate_x=logs['createdAt'],
+                                                                  loggedDate_y=logs['createdAt']))
+    pdt.assert_frame_equal(matrix, expected_matrix, check_names=False, check_column_type=False)
+    pdt.assert_series_equal(size, expected_size, check_names=False)
+
+
+def test_engagement_rows_match_summarize_engagement():
+    logs = activity_logs()
+    sessions = split_sessions(logs)
+    sessions['durationMs'] = sessions['sessionDuration'] // pd.Timedelta(milliseconds=1)
+    rows = sessions.groupby('userId').agg(sessionCount=('durationMs', 'size'), totalMs=('durationMs', 'sum'),
+                                          durationsMs=('durationMs', list)).reset_index()
+
+    result = engagement_from_rows(rows)
+    expected = summarize_engagement(logs, with_durations=True)
+    pdt.assert_frame_equal(result.sort_index(), expected.sort_index(), check_dtype=False,
+                           check_index_type=False, check_categorical=False)
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+import pandas as pd
+from bson import ObjectId
+
+from utils.mongo_frames import iter_frames, projection_for, read_frame
+
+
+def user_logs(count):
+    users = [ObjectId() for _ in range(3)]
+    for index in range(count):
+        yield {'_id': ObjectId(), 'userId': users[index % 3], 'createdAt': datetime(2024, 1, 1, 15, index % 60),
+               'device': {'os': 'ios' if index % 2 else 'android'}, 'ignored': 'x' * 100}
+
+
+def test_projection_excludes_id_unless_requested():
+    assert projection_for(['userId', 'createdAt']) == {'userId': 1, 'createdAt': 1, '_id': 0}
+    assert projection_for(['_id']) == {'_id': 1}
+
+
+def test_iter_frames_streams_typed_chunks():
+    frames = list(iter_frames(user_logs(10), ['userId', 'createdAt', 'device.os'], datetime_columns=['createdAt'],
+                              category_columns=['userId', 'device.os'], chunk_size=4, tz='Asia/Seoul'))
+
+    assert [len(frame) for frame in frames] == [4, 4, 2]
+    assert list(frames[0].columns) == ['userId', 'createdAt', 'device.os']
+    assert isinstance(frames[0]['userId'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_dtype(frames[0]['createdAt'])
+    # UTC 15시 → KST 다음날 0시
+    assert frames[0]['createdAt'].iloc[0] == pd.Timestamp('2024-01-02 00:00')
+
+
+def test_read_frame_keeps_categories_and_applies_reducer():
+    columns = ['userId', 'createdAt']
+    frame = read_frame(iter_frames(user_logs(10), columns, category_columns=['userId'], chunk_size=4))
+    assert len(frame) == 10
+    assert isinstance(frame['userId'].dtype, pd.CategoricalDtype)
+
+    counts = read_frame(iter_frames(user_logs(10), columns, category_columns=['userId'], chunk_size=4),
+                        reducer=lambda df: df.groupby('userId', observed=True).size().rename('count').reset_index(),
+                        combine=lambda df: df.groupby('userId', observed=True)['count'].sum())
+    assert sorted(counts.tolist()) == [3, 3, 4]
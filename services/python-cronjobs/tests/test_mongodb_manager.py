@@ -0,0 +1,63 @@
+import importlib
+import logging
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def manager_module(monkeypatch):
+    """utils.config 대신 테스트용 configs로 utils.mongodb_manager를 import"""
+    config = types.ModuleType('utils.config')
+    config.configs = {
+        'useInternalDb': False,
+        'dbUriMap': {'cluster0': 'mongodb://localhost:1/?serverSelectionTimeoutMS=100'},
+        'mongoSlowQueryMs': 50,
+        'mongoClientOptions': {
+            'default': {'maxPoolSize': 10},
+            'cluster0': {'readPreference': 'secondaryPreferred', 'compressors': ['zstd', 'zlib']},
+        },
+    }
+    monkeypatch.setitem(sys.modules, 'utils.config', config)
+    monkeypatch.delitem(sys.modules, 'utils.mongodb_manager', raising=False)
+    return importlib.import_module('utils.mongodb_manager')
+
+
+def test_get_connection_applies_per_database_options(manager_module):
+    manager = manager_module.MongoDBManager()
+    client = manager.get_connection('cluster0')
+    try:
+        assert manager.get_connection('cluster0') is client
+        assert client.options.pool_options.max_pool_size == 10
+        assert client.read_preference.mongos_mode == 'secondaryPreferred'
+        # zstandard가 설치되지 않은 환경에서는 zlib만 사용
+        assert 'zlib' in client.options.pool_options._compression_settings.compressors
+    finally:
+        manager.close_all()
+
+
+def test_get_connection_raises_for_unknown_database(manager_module):
+    with pytest.raises(KeyError):
+        manager_module.MongoDBManager().get_connection('unknown')
+
+
+def test_command_listener_records_latency_documents_and_slow_queries(manager_module, caplog):
+    listener = manager_module.MongoCommandListener(slow_query_ms=50)
+    started = SimpleNamespace(command_name='find', database_name='DEMO', connection_id=('localhost', 27017),
+                              request_id=1, command={'find': 'NewUsers', 'filter': {'status': 'active'}})
+    succeeded = SimpleNamespace(command_name='find', database_name='DEMO', connection_id=('localhost', 27017),
+                                request_id=1, duration_micros=120000,
+                                reply={'cursor': {'firstBatch': [{}, {}, {}], 'id': 0}})
+
+    with caplog.at_level(logging.WARNING, logger=manager_module.__name__):
+        listener.started(started)
+        listener.succeeded(succeeded)
+
+    stats = listener.snapshot()[('DEMO', 'NewUsers', 'find')]
+    assert stats['count'] == 1
+    assert stats['documents'] == 3
+    assert stats['max_ms'] == 120.0
+    assert 'Slow MongoDB find on DEMO.NewUsers' in caplog.text
+    assert 'NewUsers find: 1 calls' in listener.summary()
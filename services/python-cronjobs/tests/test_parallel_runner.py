@@ -0,0 +1,75 @@
+import os
+import time
+
+import pytest
+
+from utils import parallel_runner
+from utils.parallel_runner import format_summary, run_parallel
+
+
+@pytest.fixture(autouse=True)
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(parallel_runner, 'POLL_INTERVAL', 0.02)
+
+
+def job(file):
+    """파일 이름으로 동작을 정하는 워커 target"""
+    if file == 'ok.py':
+        return True
+    if file == 'failed.py':
+        return False
+    if file == 'raises.py':
+        raise RuntimeError('boom')
+    if file == 'crashes.py':
+        os._exit(3)
+    if file == 'sleeps.py':
+        time.sleep(30)
+    if file == 'allocates.py':
+        data = b'\x01' * (256 * 1024 * 1024)
+        time.sleep(30)
+        return bool(data)
+    raise ValueError(file)
+
+
+def test_results_are_mapped_to_status_in_files_order():
+    files = ['raises.py', 'ok.py', 'failed.py', 'crashes.py']
+    results = run_parallel(files, job, max_workers=2)
+
+    assert [result['file'] for result in results] == files
+    assert [result['status'] for result in results] == ['failed', 'success', 'failed', 'crashed']
+    assert [result['exitcode'] for result in results] == [1, 0, 1, 3]
+    # 정상 보고한 워커는 CPU 시간과 최대 RSS를 함께 보고
+    assert results[1]['cpu_seconds'] is not None and results[1]['peak_rss_mb'] > 0
+    assert results[3]['cpu_seconds'] is None
+
+
+def test_timeout_kills_worker():
+    started = time.monotonic()
+    results = run_parallel(['sleeps.py', 'ok.py'], job, max_workers=2, timeout=0.5)
+
+    assert [result['status'] for result in results] == ['timeout', 'success']
+    assert results[0]['exitcode'] == -9
+    assert time.monotonic() - started < 10
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/status'), reason='RSS is read from /proc')
+def test_memory_limit_kills_worker():
+    results = run_parallel(['allocates.py'], job, max_workers=1, timeout=20, max_rss_mb=128)
+
+    assert results[0]['status'] == 'memory_limit'
+    assert results[0]['exitcode'] == -9
+    assert results[0]['peak_rss_mb'] > 128
+
+
+def test_format_summary():
+    results = [
+        {'file': 'ok.py', 'status': 'success', 'exitcode': 0, 'duration': 1.234, 'cpu_seconds': 0.5,
+         'peak_rss_mb': 64.0},
+        {'file': 'sleeps.py', 'status': 'timeout', 'exitcode': -9, 'duration': 30.0, 'cpu_seconds': None,
+         'peak_rss_mb': 12.3},
+    ]
+    assert format_summary(results, 30.5).splitlines() == [
+        '✅ ok.py | success (exitcode=0) | 1.23s | cpu 0.5s | peak 64.0MB',
+        '❌ sleeps.py | timeout (exitcode=-9) | 30.00s | cpu - | peak 12.3MB',
+        'files: 2, failed: 1, wall time: 30.50s',
+    ]
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from utils.common import cohort_retention
+from utils.retention_store import RetentionStore
+
+
+def activity_logs(days=10, users=200, seed=0):
+    """userId, loggedDate_x(활동 시각), loggedDate_y(가입일) 로그"""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-01-01')
+    signup = start + pd.to_timedelta(rng.integers(0, days, users), unit='D')
+    rows = []
+    for user in range(users):
+        for day in range((signup[user] - start).days, days):
+            if day == (signup[user] - start).days or rng.random() < 0.3:
+                seen = start + pd.Timedelta(days=day) + pd.Timedelta(minutes=int(rng.integers(0, 1440)))
+                rows.append({'userId': f'user-{user}', 'loggedDate_x': seen, 'loggedDate_y': signup[user]})
+    return pd.DataFrame(rows)
+
+
+def test_incremental_store_matches_full_recompute(tmp_path):
+    logs = activity_logs()
+    expected_matrix, expected_size = cohort_retention(logs.copy())
+
+    store = RetentionStore(str(tmp_path / 'store'))
+    for _, day in logs.groupby(logs['loggedDate_x'].dt.normalize()):
+        store.update(day)
+        store.save()
+        # 매일 저장소를 다시 읽어서 반영 (실제 일별 실행과 동일)
+        store = RetentionStore(str(tmp_path / 'store'))
+
+    matrix, size = store.retention_matrix()
+    pdt.assert_frame_equal(matrix, expected_matrix, check_names=False, check_index_type=False,
+                           check_column_type=False)
+    pdt.assert_series_equal(size.astype(float), expected_size.astype(float), check_names=False,
+                            check_index_type=False)
+
+
+def test_update_skips_days_already_in_store(tmp_path):
+    logs = activity_logs(days=3)
+    store = RetentionStore(str(tmp_path / 'store'))
+    store.update(logs)
+    counts = store.counts.copy()
+
+    assert store.update(logs)['days'] == 0
+    pdt.assert_series_equal(store.counts, counts)
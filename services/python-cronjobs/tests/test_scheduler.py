@@ -0,0 +1,121 @@
+import logging
+import threading
+import time
+
+import pytest
+
+from utils.scheduler import ALLOW_MAX_INSTANCES, CronJobScheduler, load_cron_jobs
+
+VALUES = """
+cronJobDefault:
+  timeZone: Asia/Seoul
+  concurrencyPolicy: Forbid
+  env:
+  - name: ENV
+    value: prod
+  - name: POD_NAME
+    valueFrom:
+      fieldRef:
+        fieldPath: metadata.name
+cronJobs:
+- name: report
+  cronTimeExpression: 10 00 * * *
+  arg: [--name, Daily Report, --files, 00-report.py, 02-report.py, --parallel, 2, --timeout, 600]
+  env:
+  - name: ENV
+    value: stage
+  - name: TOP_N
+    value: 10
+- name: monitor
+  cronTimeExpression: '*/5 * * * *'
+  concurrencyPolicy: Replace
+  timeZone: UTC
+  arg: [--files, 06-monitor.py, --level, DEBUG]
+"""
+
+
+@pytest.fixture
+def values_file(tmp_path):
+    path = tmp_path / 'values.yaml'
+    path.write_text(VALUES)
+    return str(path)
+
+
+def make_job(name, policy='Allow', schedule='0 0 * * *'):
+    return {'name': name, 'schedule': schedule, 'time_zone': 'UTC', 'concurrency_policy': policy,
+            'files': [f'{name}.py']}
+
+
+def target(job):
+    """자식 프로세스에서 실행되는 stub (job 이름으로 동작 결정)"""
+    if job['name'] == 'slow':
+        time.sleep(30)
+    if job['name'] == 'fails':
+        raise SystemExit(2)
+
+
+def test_load_cron_jobs(values_file):
+    report, monitor = load_cron_jobs(values_file)
+
+    assert report['job_name'] == 'Daily Report' and report['files'] == ['00-report.py', '02-report.py']
+    assert (report['parallel'], report['timeout'], report['level']) == (2, 600.0, 'INFO')
+    # job env가 기본 env를 덮어쓰고, valueFrom은 현재 Pod의 환경변수를 사용하므로 제외
+    assert report['env'] == {'ENV': 'stage', 'TOP_N': '10'}
+    assert (report['concurrency_policy'], report['time_zone']) == ('Forbid', 'Asia/Seoul')
+
+    assert monitor['job_name'] == 'monitor' and monitor['level'] == 'DEBUG'
+    assert (monitor['concurrency_policy'], monitor['time_zone']) == ('Replace', 'UTC')
+
+    assert [job['name'] for job in load_cron_jobs(values_file, ['monitor'])] == ['monitor']
+
+
+def test_job_without_files_is_rejected(tmp_path):
+    path = tmp_path / 'values.yaml'
+    path.write_text("cronJobs:\n- name: broken\n  cronTimeExpression: '* * * * *'\n  arg: [--name, broken]\n")
+    with pytest.raises(ValueError, match='broken'):
+        load_cron_jobs(str(path))
+
+
+def test_concurrency_policy_sets_max_instances():
+    jobs = [make_job('forbid', 'Forbid'), make_job('allow', 'Allow'), make_job('replace', 'Replace')]
+    scheduler = CronJobScheduler(jobs, target, logging.getLogger(__name__))
+    scheduler.add_jobs()
+
+    max_instances = {job.id: job.max_instances for job in scheduler.scheduler.get_jobs()}
+    assert max_instances == {'forbid': 1, 'allow': ALLOW_MAX_INSTANCES, 'replace': ALLOW_MAX_INSTANCES}
+
+
+def test_run_job_reports_wall_time(caplog):
+    scheduler = CronJobScheduler([], target, logging.getLogger(__name__))
+    with caplog.at_level(logging.INFO, logger=__name__):
+        scheduler.run_job(make_job('ok'))
+        scheduler.run_job(make_job('fails'))
+
+    assert any(record.levelno == logging.INFO and record.message.startswith('ok finished in ')
+               for record in caplog.records)
+    assert any(record.levelno == logging.ERROR and record.message.startswith('fails failed in ')
+               and record.message.endswith('(exitcode=2)') for record in caplog.records)
+    assert scheduler.running == {'ok': [], 'fails': []}
+
+
+def test_replace_terminates_previous_run(caplog):
+    job = make_job('slow', 'Replace')
+    scheduler = CronJobScheduler([job], target, logging.getLogger(__name__))
+    with caplog.at_level(logging.INFO, logger=__name__):
+        previous = threading.Thread(target=scheduler.run_job, args=[job])
+        previous.start()
+        deadline = time.monotonic() + 10
+        while not scheduler.running.get('slow') and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pid = scheduler.running['slow'][0].pid
+
+        # 두 번째 실행은 이전 실행(SIGTERM)을 종료한 뒤 시작하므로 30초를 기다리지 않음
+        scheduler.target = lambda job: None
+        started = time.monotonic()
+        scheduler.run_job(job)
+        previous.join(10)
+
+    assert not previous.is_alive() and time.monotonic() - started < 10
+    assert f'Replacing running slow (pid={pid})' in caplog.text
+    assert 'slow failed in' in caplog.text and '(exitcode=-15)' in caplog.text
+    assert 'slow finished in' in caplog.text
@@ -0,0 +1,13 @@
+import time
+from email.utils import formatdate
+
+from utils.slack_handler import retry_after_seconds
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds('5', 1) == 5.0
+    assert retry_after_seconds(None, 4) == 4
+    # HTTP-date 형식은 남은 시간, 해석할 수 없는 값은 default
+    assert 55 <= retry_after_seconds(formatdate(time.time() + 60, usegmt=True), 1) <= 60
+    assert retry_after_seconds(formatdate(time.time() - 60, usegmt=True), 1) == 0.0
+    assert retry_after_seconds('soon', 2) == 2
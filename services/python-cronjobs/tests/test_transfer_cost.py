@@ -0,0 +1,123 @@
+import boto3
+import numpy as np
+import pandas as pd
+import pytest
+from botocore.stub import Stubber
+
+from utils import transfer_cost
+from utils.transfer_cost import NetworkTopology, tiered_cost
+
+
+@pytest.fixture
+def ec2_client():
+    client = boto3.client('ec2', region_name='ap-northeast-2', aws_access_key_id='test', aws_secret_access_key='test')
+    with Stubber(client) as stubber:
+        # 두 페이지로 나뉜 subnet 목록과 NAT Gateway ENI
+        stubber.add_response('describe_subnets', {
+            'Subnets': [{'CidrBlock': '10.0.0.0/20', 'AvailabilityZone': 'ap-northeast-2a'}], 'NextToken': 'page-2'})
+        stubber.add_response('describe_subnets', {
+            'Subnets': [{'CidrBlock': '10.0.16.0/20', 'AvailabilityZone': 'ap-northeast-2c'}]}, {'NextToken': 'page-2'})
+        stubber.add_response('describe_network_interfaces', {'NetworkInterfaces': [
+            {'NetworkInterfaceId': 'eni-nat', 'InterfaceType': 'nat_gateway', 'PrivateIpAddress': '10.0.0.10',
+             'PrivateIpAddresses': [{'PrivateIpAddress': '10.0.0.10'}]}]},
+            {'Filters': [{'Name': 'interface-type', 'Values': ['nat_gateway']}]})
+        yield client
+        stubber.assert_no_pending_responses()
+
+
+def test_ip_to_int():
+    values = transfer_cost.ip_to_int(['10.0.0.1', '255.255.255.255', '-', None, '10.0.0.256', '::1', '10.0.0.1'])
+    assert values.tolist() == [167772161, 2 ** 32 - 1, -1, -1, -1, -1, 167772161]
+    assert transfer_cost.ip_to_int([]).tolist() == []
+
+
+def test_classify(ec2_client):
+    topology = NetworkTopology.from_ec2(ec2_client)
+
+    flows = [
+        ('10.0.0.1', '10.0.15.200', 'intra_az'),
+        ('10.0.0.1', '10.0.16.5', 'cross_az'),
+        # NAT ENI 자신의 인터넷 구간
+        ('10.0.0.10', '8.8.8.8', 'internet_egress'),
+        ('8.8.8.8', '10.0.0.10', 'internet_ingress'),
+        ('10.0.16.5', '52.95.1.1', 'internet_egress'),
+        ('52.95.1.1', '10.0.16.5', 'internet_ingress'),
+        ('10.0.0.1', '172.31.0.1', 'private_other'),
+        ('52.95.1.1', '8.8.8.8', 'unknown'),
+        ('-', '10.0.0.1', 'unknown'),
+    ]
+    classes = topology.classify(np.array([flow[0] for flow in flows], dtype=object),
+                                np.array([flow[1] for flow in flows], dtype=object))
+    assert list(classes) == [flow[2] for flow in flows]
+    assert topology.nat_zones == {'eni-nat': 0}
+
+
+def test_transfer_costs():
+    topology = NetworkTopology([('10.0.0.0/24', 'a'), ('10.0.1.0/24', 'b')])
+    gb = transfer_cost.GB
+    pairs = pd.DataFrame({
+        'dt': ['2024-03-01', '2024-03-01', '2024-03-01', '2024-03-02'],
+        'srcaddr': ['10.0.0.1', '10.0.0.2', '10.0.0.1', '10.0.0.1'],
+        'dstaddr': ['10.0.1.1', '10.0.1.2', '1.1.1.1', '10.0.0.2'],
+        'bytes': [10 * gb, 30 * gb, 20000 * gb, 5 * gb],
+    })
+    costs = transfer_cost.transfer_costs(pairs, topology).set_index(['dt', 'traffic_class'])
+    assert costs.loc[('2024-03-01', 'cross_az'), 'gb'] == 40.0
+    assert costs.loc[('2024-03-01', 'cross_az'), 'cost'] == pytest.approx(0.8)
+    assert costs.loc[('2024-03-01', 'internet_egress'), 'cost'] == pytest.approx(10240 * 0.126 + 9760 * 0.122)
+    assert costs.loc[('2024-03-02', 'intra_az'), 'cost'] == 0.0
+    assert transfer_cost.transfer_costs(pairs.iloc[:0], topology).empty
+
+
+
+def test_flow_seen_from_both_enis_is_counted_once():
+    topology = NetworkTopology([('10.0.0.0/24', 'a'), ('10.0.1.0/24', 'b')])
+    gb = transfer_cost.GB
+    pairs = pd.DataFrame({
+        'dt': ['2024-03-01'] * 5,
+        # 10.0.0.1 -> 10.0.1.1은 보내는 ENI(egress)와 받는 ENI(ingress)에서 각각 기록됨
+        'srcaddr': ['10.0.0.1', '10.0.0.1', '52.95.1.1', '10.0.0.1', '10.0.0.1'],
+        'dstaddr': ['10.0.1.1', '10.0.1.1', '10.0.0.1', '1.1.1.1', '10.0.1.2'],
+        'flow_direction': ['egress', 'ingress', 'ingress', 'egress', None],
+        'bytes': [10 * gb, 10 * gb, 3 * gb, 2 * gb, 1 * gb],
+    })
+    costs = transfer_cost.transfer_costs(pairs, topology).set_index('traffic_class')
+    # flow_direction이 없는 행은 그대로 사용
+    assert costs.loc['cross_az', 'gb'] == 11.0
+    assert costs.loc['internet_ingress', 'gb'] == 3.0 and costs.loc['internet_egress', 'gb'] == 2.0
+
+
+def test_nat_gateway_flow_log_records():
+    # 10.0.16.5(AZ c) → 8.8.8.8 1GB, 응답 2GB를 AZ a의 NAT Gateway(eni-nat, 10.0.0.10)로 보낼 때 기록되는 flow log
+    topology = NetworkTopology([('10.0.0.0/20', 'a'), ('10.0.16.0/20', 'c')], {'eni-nat': '10.0.0.10'})
+    gb = transfer_cost.GB
+    records = pd.DataFrame([
+        ('eni-instance', 'egress', '10.0.16.5', '8.8.8.8', 1),
+        ('eni-nat', 'ingress', '10.0.16.5', '8.8.8.8', 1),
+        ('eni-nat', 'egress', '10.0.0.10', '8.8.8.8', 1),
+        ('eni-nat', 'ingress', '8.8.8.8', '10.0.0.10', 2),
+        ('eni-nat', 'egress', '8.8.8.8', '10.0.16.5', 2),
+        ('eni-instance', 'ingress', '8.8.8.8', '10.0.16.5', 2),
+    ], columns=['interface_id', 'flow_direction', 'srcaddr', 'dstaddr', 'bytes'])
+    records = records.assign(dt='2024-03-01', bytes=records['bytes'] * gb)
+
+    costs = transfer_cost.transfer_costs(records, topology).set_index('traffic_class')
+    # NAT 처리(양방향) + 인스턴스↔NAT 다른 AZ 전송 + NAT↔인터넷 송신/수신, 인스턴스 ENI의 기록은 제외
+    assert costs['gb'].to_dict() == {'cross_az': 3.0, 'nat_gateway': 3.0, 'internet_egress': 1.0,
+                                     'internet_ingress': 2.0}
+    assert costs.loc['nat_gateway', 'cost'] == pytest.approx(3 * 0.059)
+    assert costs.loc['internet_egress', 'cost'] == pytest.approx(0.126)
+
+    # 같은 AZ의 인스턴스는 NAT 처리 요금만
+    same_az = records.replace({'10.0.16.5': '10.0.1.5'})
+    costs = transfer_cost.transfer_costs(same_az, topology).set_index('traffic_class')
+    assert 'cross_az' not in costs.index and costs.loc['nat_gateway', 'gb'] == 3.0
+
+    # NAT를 거치지 않고 공인 IP로 나가는 인스턴스는 인터넷 송신
+    direct = records.iloc[[0]]
+    assert transfer_cost.transfer_costs(direct, topology)['traffic_class'].tolist() == ['internet_egress']
+
+def test_tiered_cost():
+    assert tiered_cost(100) == pytest.approx(12.6)
+    assert tiered_cost(200000) == pytest.approx(10240 * 0.126 + 40960 * 0.122 + 102400 * 0.117 + 46400 * 0.108)
+    assert tiered_cost(np.array([0.0, 100.0]), [(50, 1.0), (float('inf'), 0.5)]).tolist() == [0.0, 75.0]
@@ -0,0 +1,150 @@
+"""
+일별 트래픽/비용 지표 이상 감지 (EWMA + 요일별 기준선)
+
+지표별로 지수가중 이동평균(EWMA) 평균/분산과 요일별 EWMA를 작은 JSON 상태 파일
+(로컬 디렉터리 또는 s3://bucket/prefix)에 저장하고, 매일 새 값 하나로 O(1) 갱신한다.
+요일별 기준선이 충분히 쌓이면 그것을, 아니면 전체 EWMA를 기준으로 sigma 배 이상 벗어난 값을 이상으로 표시한다.
+
+    detector = AnomalyDetector('s3://example-org-devops/report/anomaly-state/', name='cost_report')
+    checks = detector.observe_many({'vpc_flow.total_gb': 1024.0, 'cost.total': 812.5}, yesterday)
+    detector.save()
+    anomalies = [check for check in checks if check['anomaly']]
+"""
+
+import copy
+import json
+import logging
+import math
+import os
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+from . import storage
+
+logger = logging.getLogger(__name__)
+
+# 상태 파일 위치 (로컬 디렉터리 또는 s3://bucket/prefix)
+DEFAULT_LOCATION = (os.getenv('ANOMALY_STATE_LOCATION')
+                    or os.path.join(tempfile.gettempdir(), 'anomaly-state'))
+
+# 기준선에서 이 표준편차 배수 이상 벗어나면 이상
+SIGMA = float(os.getenv('ANOMALY_SIGMA', '3'))
+
+# 전체 EWMA 가중치 (클수록 최근 값의 비중이 큼, 0.3이면 약 6일 반감)
+ALPHA = float(os.getenv('ANOMALY_ALPHA', '0.3'))
+
+# 요일별 EWMA 가중치 (같은 요일 값은 주 1회만 들어오므로 더 크게)
+SEASONAL_ALPHA = float(os.getenv('ANOMALY_SEASONAL_ALPHA', '0.5'))
+
+# 판단에 필요한 최소 관측 수 (전체 / 같은 요일)
+MIN_COUNT = 7
+MIN_SEASONAL_COUNT = 3
+
+# 분산이 0에 가까운 지표가 작은 변화로 이상 판정되지 않도록 평균 대비 최소 표준편차
+MIN_RELATIVE_STD = 0.05
+
+# 이 일수 동안 관측되지 않은 지표(삭제된 인스턴스 등)는 상태에서 제거
+RETENTION_DAYS = 30
+
+
+def _new_stats() -> Dict:
+    return {'mean': 0.0, 'var': 0.0, 'count': 0}
+
+
+def ewma_update(stats: Dict, value: float, alpha: float) -> Dict:
+    """EWMA 평균/분산을 value 하나로 갱신 (첫 값은 평균으로 사용)"""
+    if stats['count'] == 0:
+        return {'mean': value, 'var': 0.0, 'count': 1}
+    diff = value - stats['mean']
+    increment = alpha * diff
+    return {'mean': stats['mean'] + increment, 'var': (1 - alpha) * (stats['var'] + diff * increment),
+            'count': stats['count'] + 1}
+
+
+class AnomalyDetector:
+    def __init__(self, location: str = DEFAULT_LOCATION, name: str = 'anomaly_state', sigma: float = SIGMA,
+                 alpha: float = ALPHA, seasonal_alpha: float = SEASONAL_ALPHA, min_count: int = MIN_COUNT,
+                 min_seasonal_count: int = MIN_SEASONAL_COUNT):
+        self.location = location.rstrip('/')
+        self.file = f'{name}.json'
+        self.sigma = sigma
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.min_count = min_count
+        self.min_seasonal_count = min_seasonal_count
+        self.metrics: Dict[str, Dict] = {}
+        self.load()
+
+    # --- 상태 입출력 (상태 파일 오류로 Job이 실패하지 않도록 오류는 로그만 남김) ---
+
+    def load(self) -> None:
+        try:
+            data = storage.read_bytes(self.location, self.file)
+            self.metrics = json.loads(data)['metrics'] if data is not None else {}
+        except Exception as e:
+            logger.warning(f"Error reading anomaly state {self.location}/{self.file}: {e}")
+            self.metrics = {}
+
+    def save(self, retention_days: int = RETENTION_DAYS) -> None:
+        if self.metrics:
+            latest = max(date.fromisoformat(entry['date']) for entry in self.metrics.values())
+            cutoff = (latest - timedelta(days=retention_days)).isoformat()
+            self.metrics = {metric: entry for metric, entry in self.metrics.items() if entry['date'] >= cutoff}
+        try:
+            storage.write_bytes(self.location, self.file, json.dumps({'metrics': self.metrics}).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Error writing anomaly state {self.location}/{self.file}: {e}")
+
+    # --- 판단/갱신 ---
+
+    def _check(self, metric: str, entry: Dict, weekday: str, value: float) -> Optional[Dict]:
+        overall = entry['overall']
+        if overall['count'] < self.min_count:
+            return None
+        seasonal = entry['weekday'].get(weekday, _new_stats())
+        baseline = seasonal if seasonal['count'] >= self.min_seasonal_count else overall
+        std = max(math.sqrt(baseline['var']), MIN_RELATIVE_STD * abs(baseline['mean']), 1e-9)
+        score = (value - baseline['mean']) / std
+        return {
+            'metric': metric,
+            'value': value,
+            'expected': baseline['mean'],
+            'std': std,
+            'score': score,
+            'seasonal': baseline is seasonal,
+            'anomaly': abs(score) >= self.sigma,
+        }
+
+    def observe(self, metric: str, day: date, value: float) -> Optional[Dict]:
+        """day의 value를 기준선과 비교한 결과를 반환하고 상태를 갱신
+
+        관측 수가 부족하면 None을 반환한다. 같은 날짜로 다시 실행하면 그 날짜를 반영하기 전 상태로 되돌린 뒤
+        다시 계산하고, 이미 반영한 날짜보다 이전 날짜는 무시한다(None).
+        """
+        value = float(value)
+        if math.isnan(value):
+            return None
+        weekday = str(day.weekday())
+        entry = self.metrics.get(metric)
+        if entry is None:
+            entry = {'date': None, 'overall': _new_stats(), 'weekday': {}, 'before': None}
+            self.metrics[metric] = entry
+        elif entry['date'] == day.isoformat() and entry['before']:
+            entry['overall'] = entry['before']['overall']
+            entry['weekday'][weekday] = entry['before']['weekday']
+        elif entry['date'] and entry['date'] > day.isoformat():
+            return None
+
+        seasonal = entry['weekday'].get(weekday, _new_stats())
+        result = self._check(metric, entry, weekday, value)
+        entry['before'] = copy.deepcopy({'overall': entry['overall'], 'weekday': seasonal})
+        entry['overall'] = ewma_update(entry['overall'], value, self.alpha)
+        entry['weekday'][weekday] = ewma_update(seasonal, value, self.seasonal_alpha)
+        entry['date'] = day.isoformat()
+        return result
+
+    def observe_many(self, values: Dict[str, float], day: date) -> List[Dict]:
+        """여러 지표를 observe하고 판단 가능한 결과만 반환"""
+        results = [self.observe(metric, day, value) for metric, value in values.items()]
+        return [result for result in results if result is not None]
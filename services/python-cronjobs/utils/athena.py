@@ -0,0 +1,379 @@
+"""
+Athena 쿼리 실행과 결과 읽기 헬퍼
+
+쿼리를 하나씩 실행하고 완료될 때까지 기다리면 전체 시간이 쿼리 시간의 합이 된다.
+run_queries는 max_concurrency개까지 먼저 제출하고, 실행 중인 쿼리 상태를
+batch_get_query_execution 한 번으로 함께 확인하며, 끝난 쿼리부터 결과를 가져오고 다음 쿼리를 제출한다.
+
+get_query_results는 한 번에 최대 1000행만 반환하고 모든 값이 문자열이다.
+iter_result_frames/read_results는 모든 페이지를 순서대로 읽고(결과가 한 페이지보다 크면 S3의 결과 CSV를
+chunk 단위로 직접 읽음) ResultSetMetadata의 컬럼 타입을 적용한 DataFrame을 반환한다.
+
+    results = run_queries({'top_source_ips': source_ips_query, 'top_dest_ips': dest_ips_query},
+                          DATABASE_NAME, ATHENA_OUTPUT_LOCATION)
+    df = read_results(query_execution_id)
+"""
+
+import io
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from .aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+# 동시에 실행할 쿼리 수 (워크그룹/계정의 동시 실행 쿼리 한도보다 작게 설정)
+DEFAULT_MAX_CONCURRENCY = int(os.getenv('ATHENA_MAX_CONCURRENCY', '5'))
+
+# 상태 확인 간격: INITIAL_DELAY(초)부터 BACKOFF_FACTOR배씩 MAX_DELAY(초)까지 늘리고 ±JITTER 비율만큼 무작위로 흔듦
+# (여러 Job/쿼리의 확인 시점이 겹치지 않도록). 예상 실행 시간을 알면 첫 확인은 그 EXPECTED_RATIO 시점에 함
+DEFAULT_INITIAL_DELAY = 0.5
+DEFAULT_MAX_DELAY = 10.0
+BACKOFF_FACTOR = 1.5
+JITTER = 0.2
+EXPECTED_RATIO = 0.8
+
+# 확인 시각이 이 시간(초) 안에 있는 쿼리는 batch_get_query_execution 한 번으로 함께 확인
+BATCH_WINDOW = 0.25
+
+# 쿼리별 최대 대기 시간(초). 넘으면 쿼리를 취소함
+DEFAULT_TIMEOUT = int(os.getenv('ATHENA_QUERY_TIMEOUT', '300'))
+
+# batch_get_query_execution 한 번에 조회할 수 있는 최대 쿼리 수
+BATCH_GET_LIMIT = 50
+
+FINISHED_STATES = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+
+# get_query_results 한 페이지의 최대 행 수
+PAGE_SIZE = 1000
+
+# 결과를 DataFrame으로 변환할 때 한 chunk의 행 수
+DEFAULT_CHUNK_ROWS = 50_000
+
+# Athena 컬럼 타입별 pandas 타입 (목록에 없는 타입(varchar, array, map 등)은 문자열로 둠)
+INTEGER_TYPES = ('tinyint', 'smallint', 'integer', 'int', 'bigint')
+FLOAT_TYPES = ('float', 'real', 'double', 'decimal')
+DATETIME_TYPES = ('date', 'timestamp')
+
+
+def _base_type(type_name: str) -> str:
+    """'decimal(10,2)', 'timestamp(3) with time zone' → 'decimal', 'timestamp'"""
+    return type_name.lower().split('(')[0].split(' ')[0]
+
+
+def apply_types(frame: pd.DataFrame, columns: List[Dict]) -> pd.DataFrame:
+    """문자열 결과에 ColumnInfo의 Type을 적용 (정수는 NULL을 허용하는 Int64)"""
+    for info in columns:
+        name = info['Label']
+        if name not in frame:
+            continue
+        base = _base_type(info.get('Type', 'varchar'))
+        values = frame[name]
+        if base in INTEGER_TYPES:
+            frame[name] = pd.to_numeric(values, errors='coerce').astype('Int64')
+        elif base in FLOAT_TYPES:
+            frame[name] = pd.to_numeric(values, errors='coerce').astype('float64')
+        elif base == 'boolean':
+            frame[name] = values.map({'true': True, 'false': False}).astype('boolean')
+        elif base in DATETIME_TYPES:
+            frame[name] = pd.to_datetime(values, errors='coerce')
+    return frame
+
+
+def iter_result_pages(query_execution_id: str, client=None, page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+    """get_query_results 응답을 NextToken이 없을 때까지 한 페이지씩 반환"""
+    client = client or get_client('athena')
+    params = {'QueryExecutionId': query_execution_id, 'MaxResults': page_size}
+    while True:
+        page = client.get_query_results(**params)
+        yield page
+        if not page.get('NextToken'):
+            return
+        params['NextToken'] = page['NextToken']
+
+
+def iter_rows(query_execution_id: str, client=None, skip_header: bool = True) -> Iterator[List[Optional[str]]]:
+    """모든 페이지의 행을 값 목록(NULL은 None)으로 반환. skip_header=True이면 첫 페이지의 첫 행(컬럼 이름)을 제외"""
+    for number, page in enumerate(iter_result_pages(query_execution_id, client)):
+        rows = page['ResultSet']['Rows']
+        if number == 0 and skip_header:
+            rows = rows[1:]
+        for row in rows:
+            yield [field.get('VarCharValue') for field in row['Data']]
+
+
+def _rows_to_frame(rows: List[List[Optional[str]]], columns: List[Dict], typed: bool) -> pd.DataFrame:
+    frame = pd.DataFrame(rows, columns=[info['Label'] for info in columns])
+    return apply_types(frame, columns) if typed else frame
+
+
+def _s3_location(location: str) -> Tuple[str, str]:
+    bucket, _, key = location[len('s3://'):].partition('/')
+    return bucket, key
+
+
+def _iter_csv_frames(location: str, columns: List[Dict], chunk_rows: int, typed: bool,
+                     s3_client=None) -> Iterator[pd.DataFrame]:
+    """S3의 결과 CSV를 chunk_rows행씩 읽음 (전체 파일을 메모리에 올리지 않음)"""
+    bucket, key = _s3_location(location)
+    body = (s3_client or get_client('s3')).get_object(Bucket=bucket, Key=key)['Body']
+    names = [info['Label'] for info in columns]
+    # Athena CSV는 모든 값을 큰따옴표로 감싸고 NULL은 빈 값으로 씀
+    reader = pd.read_csv(body, dtype=str, keep_default_na=False, na_values=[''], header=0, names=names,
+                         chunksize=chunk_rows)
+    for chunk in reader:
+        yield apply_types(chunk, columns) if typed else chunk
+
+
+def iter_result_frames(query_execution_id: str, client=None, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                       source: str = 'auto', typed: bool = True, s3_client=None) -> Iterator[pd.DataFrame]:
+    """쿼리 결과 전체를 약 chunk_rows행씩 DataFrame으로 나누어 반환 (API로 읽을 때는 페이지 단위로 나눔)
+
+    source='api'이면 get_query_results를 끝까지 페이지 단위로 읽고, 's3'이면 S3의 결과 CSV를 직접 읽는다.
+    'auto'(기본)는 첫 페이지로 결과가 끝나면 그대로 사용하고, 더 있으면 S3 CSV를 읽는다
+    (S3를 읽을 수 없으면 페이지 단위로 계속 읽음). typed=False이면 모든 값을 문자열로 둔다.
+    """
+    client = client or get_client('athena')
+    pages = iter_result_pages(query_execution_id, client)
+    first = next(pages)
+    columns = first['ResultSet']['ResultSetMetadata']['ColumnInfo']
+
+    if source in ('auto', 's3') and (source == 's3' or first.get('NextToken')):
+        execution = client.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']
+        location = execution.get('ResultConfiguration', {}).get('OutputLocation', '')
+        if location.endswith('.csv'):
+            try:
+                yield from _iter_csv_frames(location, columns, chunk_rows, typed, s3_client)
+                return
+            except Exception as e:
+                if source == 's3':
+                    raise
+                logger.warning(f"Error reading Athena results from {location}, paging through API instead: {e}")
+        elif source == 's3':
+            raise ValueError(f'Athena result for {query_execution_id} is not a CSV file: {location}')
+
+    # 첫 페이지의 첫 행은 컬럼 이름
+    rows = [[field.get('VarCharValue') for field in row['Data']] for row in first['ResultSet']['Rows'][1:]]
+    emitted = False
+    for page in pages:
+        if len(rows) >= chunk_rows:
+            yield _rows_to_frame(rows, columns, typed)
+            rows, emitted = [], True
+        rows.extend([field.get('VarCharValue') for field in row['Data']] for row in page['ResultSet']['Rows'])
+    if rows or not emitted:
+        yield _rows_to_frame(rows, columns, typed)
+
+
+def read_results(query_execution_id: str, **kwargs) -> pd.DataFrame:
+    """쿼리 결과 전체를 타입이 적용된 하나의 DataFrame으로 반환 (iter_result_frames 옵션 사용 가능)"""
+    frames = list(iter_result_frames(query_execution_id, **kwargs))
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def iter_unload_frames(location: str, s3_client=None, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """UNLOAD (FORMAT = 'PARQUET') 결과 prefix의 Parquet 파일을 하나씩 DataFrame으로 반환 (pyarrow 필요)"""
+    s3_client = s3_client or get_client('s3')
+    bucket, prefix = _s3_location(location)
+    paginator = s3_client.get_paginator('list_objects_v2')
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for item in page.get('Contents', []):
+            if item['Size'] == 0 or item['Key'].endswith('/'):
+                continue
+            body = s3_client.get_object(Bucket=bucket, Key=item['Key'])['Body'].read()
+            yield pd.read_parquet(io.BytesIO(body), columns=columns)
+
+
+def poll_delays(expected_runtime: Optional[float] = None, initial_delay: float = DEFAULT_INITIAL_DELAY,
+                max_delay: float = DEFAULT_MAX_DELAY, factor: float = BACKOFF_FACTOR,
+                jitter: float = JITTER) -> Iterator[float]:
+    """상태 확인 사이의 대기 시간(초)을 끝없이 반환 (exponential backoff + jitter)"""
+    if expected_runtime:
+        yield expected_runtime * EXPECTED_RATIO * random.uniform(1 - jitter, 1 + jitter)
+    delay = initial_delay
+    while True:
+        yield min(delay, max_delay) * random.uniform(1 - jitter, 1 + jitter)
+        delay *= factor
+
+
+def log_statistics(name: str, execution: Dict) -> None:
+    """끝난 쿼리의 상태와 대기/계획/실행 시간, 스캔 바이트를 로그로 남김"""
+    stats = execution.get('Statistics', {})
+    logger.info(
+        f"Athena query {name} {execution['Status']['State']}: "
+        f"queue {stats.get('QueryQueueTimeInMillis', 0)}ms, planning {stats.get('QueryPlanningTimeInMillis', 0)}ms, "
+        f"engine {stats.get('EngineExecutionTimeInMillis', 0)}ms, "
+        f"service {stats.get('ServiceProcessingTimeInMillis', 0)}ms, "
+        f"total {stats.get('TotalExecutionTimeInMillis', 0)}ms, {stats.get('DataScannedInBytes', 0)} bytes scanned")
+
+
+def _timed_out(execution: Dict, timeout: float) -> Dict:
+    """시간 초과로 취소한 쿼리를 CANCELLED 상태로 표시한 QueryExecution"""
+    return dict(execution, Status=dict(execution.get('Status', {}), State='CANCELLED',
+                                       StateChangeReason=f'Timed out after {timeout} seconds'))
+
+
+def _stop(client, query_execution_id: str, name: str, timeout: float) -> None:
+    logger.error(f"Athena query {name} timed out after {timeout} seconds")
+    try:
+        client.stop_query_execution(QueryExecutionId=query_execution_id)
+    except Exception as e:
+        logger.warning(f"Error stopping Athena query {name}: {e}")
+
+
+def wait_for_query(query_execution_id: str, client=None, timeout: float = DEFAULT_TIMEOUT,
+                   expected_runtime: Optional[float] = None, name: Optional[str] = None, **delays) -> Dict:
+    """쿼리가 끝날 때까지 backoff 간격으로 상태를 확인하고 마지막 QueryExecution을 반환
+
+    timeout(초)이 지나면 쿼리를 취소하고 State가 CANCELLED인 QueryExecution을 반환한다.
+    delays는 poll_delays 옵션(initial_delay, max_delay, factor, jitter)이다.
+    """
+    client = client or get_client('athena')
+    name = name or query_execution_id
+    deadline = time.monotonic() + timeout
+    for delay in poll_delays(expected_runtime, **delays):
+        execution = client.get_query_execution(QueryExecutionId=query_execution_id)['QueryExecution']
+        if execution['Status']['State'] in FINISHED_STATES:
+            log_statistics(name, execution)
+            return execution
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            _stop(client, query_execution_id, name, timeout)
+            return _timed_out(execution, timeout)
+        time.sleep(min(delay, remaining))
+
+
+def _start(client, query: str, database: str, output_location: str, workgroup: Optional[str],
+           cache=None) -> Tuple[str, bool]:
+    """(QueryExecutionId, 캐시된 실행 여부)"""
+    params = {
+        'QueryString': query,
+        'QueryExecutionContext': {'Database': database},
+        'ResultConfiguration': {'OutputLocation': output_location},
+    }
+    if workgroup:
+        params['WorkGroup'] = workgroup
+    if cache is not None:
+        return cache.start_query(client, params)
+    return client.start_query_execution(**params)['QueryExecutionId'], False
+
+
+def iter_query_results(queries: Dict[str, str], database: str, output_location: str,
+                       workgroup: Optional[str] = None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                       timeout: float = DEFAULT_TIMEOUT, client=None, statistics: Optional[Dict[str, Dict]] = None,
+                       cache=None, expected_runtimes: Optional[Dict[str, float]] = None,
+                       **delays) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """{이름: 쿼리}를 동시에 실행하고 끝나는 순서대로 (이름, DataFrame)을 반환
+
+    실패, 취소, 시간 초과, 오류가 발생한 쿼리는 빈 DataFrame을 반환한다.
+    statistics(dict)를 주면 끝난 쿼리의 Statistics(DataScannedInBytes 등)를 이름별로 저장한다.
+    cache(athena_cache.QueryCache)를 주면 TTL 안에 성공한 같은 쿼리는 새로 실행하지 않고 결과를 다시 읽는다.
+    쿼리별 상태 확인 간격은 poll_delays를 따르며(expected_runtimes: {이름: 예상 실행 시간(초)}, delays: poll_delays 옵션),
+    확인할 때가 된 쿼리들만 batch_get_query_execution 한 번으로 함께 확인한다.
+    """
+    client = client or get_client('athena')
+    pending = list(queries.items())
+    running: Dict[str, Tuple[str, float]] = OrderedDict()  # query_execution_id → (이름, 시작 시각)
+    schedule: Dict[str, Tuple[Iterator[float], float]] = {}  # query_execution_id → (대기 시간 목록, 다음 확인 시각)
+    cached = set()  # 캐시에서 가져온 query_execution_id
+    expected_runtimes = expected_runtimes or {}
+
+    while pending or running:
+        # 동시 실행 한도까지 제출
+        while pending and len(running) < max(max_concurrency, 1):
+            name, query = pending.pop(0)
+            try:
+                query_execution_id, reused = _start(client, query, database, output_location, workgroup, cache)
+            except Exception as e:
+                logger.error(f"Error starting Athena query {name}: {e}")
+                yield name, pd.DataFrame()
+                continue
+            logger.info(f"Started Athena query {name}: {query_execution_id}")
+            started = time.monotonic()
+            running[query_execution_id] = (name, started)
+            waits = poll_delays(None if reused else expected_runtimes.get(name), **delays)
+            # 캐시된 실행은 이미 끝났으므로 바로 확인
+            schedule[query_execution_id] = (waits, started if reused else started + next(waits))
+            if reused:
+                cached.add(query_execution_id)
+
+        if not running:
+            continue
+
+        # 가장 먼저 확인할 쿼리의 시각까지 대기하고, 그때까지 확인할 때가 된 쿼리만 함께 확인
+        wake = min(next_check for _, next_check in schedule.values())
+        time.sleep(max(wake - time.monotonic(), 0))
+        now = max(time.monotonic(), wake)
+        ids = [query_execution_id for query_execution_id in running
+               if schedule[query_execution_id][1] <= now + BATCH_WINDOW]
+        executions = {}
+        for start in range(0, len(ids), BATCH_GET_LIMIT):
+            batch = ids[start:start + BATCH_GET_LIMIT]
+            try:
+                response = client.batch_get_query_execution(QueryExecutionIds=batch)
+            except Exception as e:
+                # throttling 등 조회 오류는 이번 배치의 쿼리를 다음 확인 시각에 다시 확인
+                logger.warning(f"Error checking Athena queries {batch}: {e}")
+                continue
+            for execution in response.get('QueryExecutions', []):
+                executions[execution['QueryExecutionId']] = execution
+
+        for query_execution_id in ids:
+            name, started = running[query_execution_id]
+            execution = executions.get(query_execution_id)
+            status = execution['Status'] if execution else {}
+            state = status.get('State')
+
+            # 실행 중이거나 확인하지 못한 쿼리(UnprocessedQueryExecutionIds, 조회 오류)
+            if state not in FINISHED_STATES:
+                if now - started >= timeout:
+                    running.pop(query_execution_id)
+                    schedule.pop(query_execution_id)
+                    _stop(client, query_execution_id, name, timeout)
+                    yield name, pd.DataFrame()
+                else:
+                    # 다음 확인 시각은 최대 대기 시간을 넘지 않음
+                    waits, _ = schedule[query_execution_id]
+                    schedule[query_execution_id] = (waits, min(now + next(waits), started + timeout))
+                continue
+
+            running.pop(query_execution_id)
+            schedule.pop(query_execution_id)
+            stats = execution.get('Statistics', {})
+            if query_execution_id in cached:
+                # 이번 실행에서는 스캔하지 않음 (Athena result reuse와 같은 형식으로 기록)
+                stats = dict(stats, DataScannedInBytes=0, ResultReuseInformation={'ReusedPreviousResult': True})
+            if statistics is not None:
+                statistics[name] = stats
+            log_statistics(name, dict(execution, Statistics=stats))
+            if state != 'SUCCEEDED':
+                reason = status.get('StateChangeReason', 'No error details available')
+                logger.error(f"Athena query {name} {state}: {reason}")
+                yield name, pd.DataFrame()
+                continue
+            try:
+                frame = read_results(query_execution_id, client=client)
+            except Exception as e:
+                logger.error(f"Error fetching Athena results for {name}: {e}")
+                frame = pd.DataFrame()
+            logger.info(f"Athena query {name} results: {frame.shape}")
+            yield name, frame
+
+
+def scanned_bytes(statistics: Dict[str, Dict]) -> int:
+    """statistics의 DataScannedInBytes 합"""
+    return sum(int(stats.get('DataScannedInBytes', 0)) for stats in statistics.values())
+
+
+def run_queries(queries: Dict[str, str], database: str, output_location: str,
+                statistics: Optional[Dict[str, Dict]] = None, **kwargs) -> Dict[str, pd.DataFrame]:
+    """{이름: 쿼리}를 동시에 실행하고 {이름: DataFrame}을 queries 순서대로 반환"""
+    statistics = statistics if statistics is not None else {}
+    results = dict(iter_query_results(queries, database, output_location, statistics=statistics, **kwargs))
+    logger.info(f"Athena scanned {scanned_bytes(statistics)} bytes for {len(queries)} queries")
+    return {name: results.get(name, pd.DataFrame()) for name in queries}
@@ -0,0 +1,150 @@
+"""
+Athena 쿼리 결과 캐시
+
+Slack 전송 실패 후 재시도하거나 같은 날짜로 다시 실행하면 같은 파티션을 다시 스캔한다.
+지난 날짜 파티션은 바뀌지 않으므로, 정규화한 SQL/database/workgroup의 해시를 키로
+성공한 QueryExecutionId를 인덱스(로컬 디렉터리 또는 s3://bucket/prefix)에 저장하고,
+TTL 안에 같은 쿼리를 실행하면 새로 실행하지 않고 그 결과를 다시 읽는다.
+인덱스에 없으면 Athena의 ResultReuseConfiguration으로 실행하여 다른 곳에서 실행한 같은 쿼리의 결과도 재사용한다.
+
+    cache = QueryCache('s3://example-org-devops/report/cache/') if is_past_partition(year, month, day) else None
+    results = run_queries(queries, DATABASE_NAME, ATHENA_OUTPUT_LOCATION, cache=cache)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+import pytz
+
+from . import storage
+from .aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+# 캐시 인덱스 위치 (로컬 디렉터리 또는 s3://bucket/prefix)
+DEFAULT_LOCATION = os.getenv('ATHENA_CACHE_LOCATION') or os.path.join(tempfile.gettempdir(), 'athena-cache')
+
+# 캐시 유효 시간(초, 기본 7일)
+DEFAULT_TTL = int(os.getenv('ATHENA_CACHE_TTL', str(7 * 24 * 3600)))
+
+# true이면 캐시와 Athena result reuse를 사용하지 않고 항상 새로 실행 (결과는 캐시에 다시 저장)
+BYPASS = os.getenv('ATHENA_CACHE_BYPASS', 'false').lower() == 'true'
+
+# ResultReuseByAgeConfiguration.MaxAgeInMinutes 최댓값 (7일)
+MAX_REUSE_MINUTES = 10080
+
+DEFAULT_TIMEZONE = 'Asia/Seoul'
+
+
+# 따옴표로 감싼 문자열/식별자 (그대로 유지), 또는 연속된 공백과 주석(--)
+_QUERY_TOKENS = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|(?:\s|--[^\n]*)+""")
+
+
+def normalize_query(query: str) -> str:
+    """따옴표 밖의 주석(--)과 연속 공백, 끝의 세미콜론을 제거하여 들여쓰기만 다른 쿼리가 같은 키를 갖도록 함
+
+    문자열 안의 '--'나 공백은 쿼리 결과를 바꾸므로 그대로 둔다.
+    """
+    query = _QUERY_TOKENS.sub(lambda match: match.group(1) or ' ', query)
+    return query.strip().rstrip(';').strip()
+
+
+def cache_key(query: str, database: str, workgroup: Optional[str] = None) -> str:
+    text = '\n'.join([normalize_query(query), database, workgroup or ''])
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def is_past_partition(year: int, month: int, day: int, tz: str = DEFAULT_TIMEZONE) -> bool:
+    """(year, month, day) 파티션이 tz 기준 오늘보다 이전이면 True (더 이상 데이터가 추가되지 않음)"""
+    try:
+        return date(int(year), int(month), int(day)) < datetime.now(pytz.timezone(tz)).date()
+    except ValueError:
+        # day=0 등 잘못된 날짜는 캐시하지 않음
+        return False
+
+
+class QueryCache:
+    def __init__(self, location: str = DEFAULT_LOCATION, ttl: float = DEFAULT_TTL, bypass: bool = BYPASS):
+        self.location = location.rstrip('/')
+        self.ttl = ttl
+        self.bypass = bypass
+
+    # --- 인덱스 입출력 (캐시 오류로 Job이 실패하지 않도록 오류는 로그만 남김) ---
+
+    def _read(self, key: str) -> Optional[Dict]:
+        try:
+            data = storage.read_bytes(self.location, f'{key}.json')
+            return json.loads(data) if data is not None else None
+        except Exception as e:
+            logger.warning(f"Error reading Athena cache entry {key}: {e}")
+            return None
+
+    def _write(self, key: str, entry: Dict) -> None:
+        try:
+            storage.write_bytes(self.location, f'{key}.json', json.dumps(entry).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Error writing Athena cache entry {key}: {e}")
+
+    # --- 조회/저장 ---
+
+    def lookup(self, query: str, database: str, workgroup: Optional[str] = None, client=None) -> Optional[str]:
+        """TTL 안에 성공한 같은 쿼리의 QueryExecutionId (없거나 bypass이면 None)"""
+        if self.bypass:
+            return None
+        key = cache_key(query, database, workgroup)
+        entry = self._read(key)
+        if not entry or time.time() - entry.get('created', 0) >= self.ttl:
+            return None
+        query_execution_id = entry['query_execution_id']
+        try:
+            execution = (client or get_client('athena')).get_query_execution(QueryExecutionId=query_execution_id)
+            state = execution['QueryExecution']['Status']['State']
+        except Exception as e:
+            logger.warning(f"Error checking cached Athena query {query_execution_id}: {e}")
+            return None
+        # 실행 중에 기록된 쿼리가 실패했으면 사용하지 않음
+        return query_execution_id if state == 'SUCCEEDED' else None
+
+    def record(self, query: str, database: str, workgroup: Optional[str], query_execution_id: str) -> None:
+        self._write(cache_key(query, database, workgroup), {
+            'query_execution_id': query_execution_id,
+            'database': database,
+            'workgroup': workgroup,
+            'query': normalize_query(query),
+            'created': time.time(),
+        })
+
+    def start_params(self) -> Dict:
+        """start_query_execution에 더할 ResultReuseConfiguration (bypass이면 빈 dict)"""
+        if self.bypass:
+            return {}
+        minutes = int(min(max(self.ttl // 60, 1), MAX_REUSE_MINUTES))
+        return {'ResultReuseConfiguration': {
+            'ResultReuseByAgeConfiguration': {'Enabled': True, 'MaxAgeInMinutes': minutes}}}
+
+    def start_query(self, client, params: Dict) -> Tuple[str, bool]:
+        """캐시된 실행이 있으면 (그 QueryExecutionId, True), 없으면 새로 실행하고 (QueryExecutionId, False)
+
+        params는 start_query_execution 인자(QueryString, QueryExecutionContext, WorkGroup 등)이다.
+        """
+        query, database = params['QueryString'], params['QueryExecutionContext']['Database']
+        workgroup = params.get('WorkGroup')
+        query_execution_id = self.lookup(query, database, workgroup, client)
+        if query_execution_id:
+            logger.info(f"Reusing cached Athena query {query_execution_id}")
+            return query_execution_id, True
+        try:
+            query_execution_id = client.start_query_execution(**params, **self.start_params())['QueryExecutionId']
+        except client.exceptions.InvalidRequestException as e:
+            # Athena engine v2 워크그룹 등 result reuse를 지원하지 않으면 그대로 실행
+            logger.warning(f"Athena result reuse is not available, running without it: {e}")
+            query_execution_id = client.start_query_execution(**params)['QueryExecutionId']
+        self.record(query, database, workgroup, query_execution_id)
+        return query_execution_id, False
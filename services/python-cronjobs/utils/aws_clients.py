@@ -0,0 +1,81 @@
+"""
+CronJob 스크립트들이 공유하는 boto3 세션과 client 레지스트리
+
+- 자격 증명은 프로세스(또는 --serve 부모 프로세스)에서 한 번만 조회
+- client는 서비스/리전별로 처음 요청될 때 한 번만 생성하여 connection pool을 공유
+- fork된 자식 프로세스에서는 세션(자격 증명)은 그대로 쓰고 client(소켓)만 새로 생성
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import boto3
+from botocore.config import Config
+
+DEFAULT_REGION = 'ap-northeast-2'
+
+# 여러 Athena 쿼리/스레드가 동시에 호출해도 connection을 재사용할 수 있도록 기본값(10)보다 크게 설정
+MAX_POOL_CONNECTIONS = int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50'))
+MAX_ATTEMPTS = int(os.getenv('AWS_MAX_ATTEMPTS', '10'))
+
+_lock = threading.Lock()
+_clients: Dict[Tuple[str, str], object] = {}
+_pid = os.getpid()
+
+
+def default_region() -> str:
+    return os.getenv('AWS_REGION') or os.getenv('AWS_DEFAULT_REGION') or DEFAULT_REGION
+
+
+def client_config(**overrides) -> Config:
+    """공유 client 설정 (connection pool, adaptive retry, TCP keep-alive)"""
+    options = {
+        'max_pool_connections': MAX_POOL_CONNECTIONS,
+        'retries': {'mode': 'adaptive', 'max_attempts': MAX_ATTEMPTS},
+        'tcp_keepalive': True,
+        'connect_timeout': 10,
+        'read_timeout': 60,
+    }
+    options.update(overrides)
+    return Config(**options)
+
+
+def get_session() -> boto3.session.Session:
+    """boto3 기본 세션을 공유 세션으로 사용 (boto3.client()를 직접 쓰는 코드와 자격 증명 캐시를 공유)"""
+    with _lock:
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session(region_name=default_region())
+        return boto3.DEFAULT_SESSION
+
+
+def get_client(service_name: str, region_name: Optional[str] = None, **config_overrides):
+    """서비스/리전별 공유 client를 반환. config_overrides가 있으면 공유하지 않고 새로 생성"""
+    global _pid
+
+    region_name = region_name or default_region()
+    session = get_session()
+    if config_overrides:
+        return session.client(service_name, region_name=region_name, config=client_config(**config_overrides))
+
+    key = (service_name, region_name)
+    with _lock:
+        if _pid != os.getpid():
+            # 부모 프로세스의 connection pool 소켓은 자식 프로세스에서 공유하면 안 됨
+            _clients.clear()
+            _pid = os.getpid()
+        if key not in _clients:
+            _clients[key] = session.client(service_name, region_name=region_name, config=client_config())
+        return _clients[key]
+
+
+def clear_clients() -> None:
+    """생성된 client를 모두 버림 (테스트 또는 stub client 교체용)"""
+    with _lock:
+        _clients.clear()
+
+
+def register_client(service_name: str, client, region_name: Optional[str] = None) -> None:
+    """미리 만든 client(botocore Stubber가 붙은 client 등)를 레지스트리에 등록"""
+    with _lock:
+        _clients[(service_name, region_name or default_region())] = client
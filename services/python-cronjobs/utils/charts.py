@@ -0,0 +1,136 @@
+"""
+headless 차트 렌더링
+
+pyplot의 전역 figure 상태를 사용하지 않고 Agg backend의 Figure 객체로 그린 뒤 항상 정리한다.
+(pyplot으로 만든 figure는 close하지 않으면 프로세스가 끝날 때까지 남음)
+출력은 고유한 임시 파일 경로 또는 BytesIO 등 file-like 객체로 저장하며,
+render_many로 여러 차트를 프로세스 풀에서 병렬로 렌더링할 수 있다.
+
+    file = render_retention(retention_matrix, cohort_size, 'DailyCohorts_alltotal', name='retention_almart')
+    files = render_many([(render_engagement, (frame,), {'name': 'engagement'}) for frame in frames])
+"""
+
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import matplotlib
+
+# 화면이 없는 환경에서 pyplot을 import하는 모듈이 있어도 GUI backend를 사용하지 않도록 함
+matplotlib.use('Agg')
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+Output = Union[None, str, io.IOBase]
+
+# 차트 파일을 저장할 디렉터리 (기본: 시스템 임시 디렉터리)
+CHART_DIR = os.environ.get('CHART_DIR') or tempfile.gettempdir()
+
+
+def new_figure(**kwargs) -> Figure:
+    """pyplot에 등록되지 않는 Agg Figure 생성"""
+    figure = Figure(**kwargs)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def save_figure(figure: Figure, output: Output = None, name: str = 'chart', **kwargs) -> Union[str, io.IOBase]:
+    """figure를 PNG로 저장하고 figure를 정리
+
+    output이 None이면 CHART_DIR에 name으로 시작하는 고유한 파일을 만들어 경로를 반환하고,
+    경로 문자열이면 그 경로에, file-like 객체이면 그 객체에 저장하여 그대로 반환한다.
+    """
+    try:
+        if output is None:
+            fd, output = tempfile.mkstemp(prefix=f'{name}_', suffix='.png', dir=CHART_DIR)
+            os.close(fd)
+        figure.savefig(output, format='png', **kwargs)
+        return output
+    finally:
+        figure.clear()
+
+
+def render_retention(retention_matrix, cohort_size, title: str, output: Output = None,
+                     name: str = 'retention') -> Union[str, io.IOBase]:
+    """retention matrix와 cohort 크기 heatmap"""
+    import matplotlib.colors as mcolors
+    import pandas as pd
+    import seaborn as sns
+
+    with sns.axes_style('white'):
+        figure = new_figure(figsize=(16, 12))
+        ax = figure.subplots(1, 2, sharey=True, gridspec_kw={'width_ratios': [1, 11]})
+
+        # retention matrix
+        sns.heatmap(retention_matrix,
+                    mask=retention_matrix.isnull(),
+                    annot=True,
+                    fmt='.0%',
+                    cmap='RdYlGn',
+                    ax=ax[1],
+                    annot_kws={'size': 12},
+                    vmin=0,
+                    vmax=0.7,
+                    cbar=False)
+        ax[1].set_title(title, fontsize=16)
+        ax[1].set(xlabel='# of periods', ylabel='')
+
+        # cohort size
+        cohort_size_df = pd.DataFrame(cohort_size).rename(columns={0: 'cohort_size'})
+        sns.heatmap(cohort_size_df,
+                    annot=True,
+                    cbar=False,
+                    fmt='g',
+                    cmap=mcolors.ListedColormap('white'),
+                    ax=ax[0])
+
+        figure.tight_layout()
+    return save_figure(figure, output, name)
+
+
+# (컬럼, 제목, y축 이름, 선 색, 범례)
+ENGAGEMENT_PANELS = [
+    ('Avg Session Count', 'Avg Session Count Over Time', 'Avg Session Count', 'b', 'Avg Session Count'),
+    ('Avg Session Duration (Min)', 'Avg Session Duration Over Time', 'Avg SessionDuration (minutes)', 'g',
+     'Avg Session Duration'),
+    ('Avg Daily Total Duration (Min)', 'Avg Daily Total Duration Over Time', 'Avg Daily Total Duration (minutes)', 'r',
+     'Avg Daily Total Duration'),
+]
+
+
+def render_engagement(dataframe, output: Output = None, name: str = 'engagement') -> Union[str, io.IOBase]:
+    """일자별 평균 세션 수, 평균 세션 지속 시간, 평균 총 지속 시간 그래프"""
+    figure = new_figure(figsize=(14, 8))
+    axes = figure.subplots(len(ENGAGEMENT_PANELS), 1)
+    for ax, (column, title, ylabel, color, label) in zip(axes, ENGAGEMENT_PANELS):
+        ax.plot(dataframe.index, dataframe[column], marker='o', color=color, label=label)
+        ax.set_title(title)
+        ax.set_xlabel('Date')
+        ax.set_ylabel(ylabel)
+        ax.grid(True)
+        ax.set_ylim(0, dataframe[column].max() * 1.1)  # Y축이 0에서 시작하도록 설정
+        ax.legend()
+    figure.tight_layout()
+    return save_figure(figure, output, name)
+
+
+def _render(task: Tuple[Callable, Sequence, Dict]):
+    function, args, kwargs = task
+    return function(*args, **kwargs)
+
+
+def render_many(tasks: List[Tuple[Callable, Sequence, Dict]], processes: Optional[int] = None) -> List:
+    """(렌더링 함수, args, kwargs) 목록을 프로세스 풀에서 렌더링하고 결과(파일 경로)를 순서대로 반환
+
+    결과를 부모 프로세스로 돌려받아야 하므로 output은 기본값(고유 파일 경로) 또는 경로 문자열을 사용한다.
+    """
+    if processes == 1 or len(tasks) <= 1:
+        return [_render(task) for task in tasks]
+    # cron job과 같이 fork로 워커를 만들어 이미 import한 pandas/seaborn을 그대로 사용
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=processes or os.cpu_count(), mp_context=context) as executor:
+        return list(executor.map(_render, tasks))
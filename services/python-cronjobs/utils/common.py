@@ -1,21 +1,91 @@
-import pandas as pd
 import datetime
+import importlib
 import json
-from bson import ObjectId
-import pipeline as pl
 from pytz import timezone
-import seaborn as sns
-import matplotlib.pyplot as plt
 from operator import attrgetter
-import matplotlib.colors as mcolors
 from datetime import timedelta
 
 
 from functools import reduce
 
+# pandas/seaborn/matplotlib 등 무거운 모듈은 처음 사용할 때 로드
+# (날짜 헬퍼만 필요한 Job이 plotting 스택 import 비용을 지불하지 않도록)
+_LAZY_ATTRIBUTES = {
+    'pd': ('pandas', None),
+    'sns': ('seaborn', None),
+    'plt': ('matplotlib.pyplot', None),
+    'mcolors': ('matplotlib.colors', None),
+    'pl': ('pipeline', None),
+    'ObjectId': ('bson', 'ObjectId'),
+}
+
+# `from utils.common import *`는 헬퍼만 제공 (지연 로드 이름을 넣으면 star import가 전부 import함)
+# pd, sns 등은 `from utils.common import pd`처럼 명시적으로 가져오면 그때 로드
+__all__ = [
+    'datetime', 'json', 'timezone', 'attrgetter', 'timedelta', 'reduce', 'merge_list',
+    'n_days_before_today_string', 'n_days_before_today_datetime', 'getTime', 'cohort_retention',
+    'retention_from_cohorts', 'get_retention', 'plot_graphs', 'getEngagement',
+]
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module_name)
+    if attribute:
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def merge_list(index ,df_list, downcast = False) :
+    """index 컬럼 기준으로 df_list를 outer join
+
+    key가 frame마다 유일하고 key 외 컬럼 이름이 겹치지 않으면 전체 key를 한 번 정렬한 뒤 각 컬럼을 key 위치로
+    바로 옮겨 한 번에 만든다. (frame마다 merge하면 중간 결과를 매번 복사하고 다시 정렬함)
+    그 외에는 기존처럼 pd.merge를 차례로 적용한다.
+    downcast=True이면 숫자 컬럼을 더 작은 타입으로 변환한다.
+    """
+    import pandas as pd
+
+    df_list = list(df_list)
+    columns = [column for df in df_list for column in df.columns if column != index]
+    single_pass = (
+        len(df_list) > 1
+        and len(columns) == len(set(columns))
+        and all(index in df.columns and df[index].is_unique and df[index].notna().all()
+                and df[index].dtype == df_list[0][index].dtype for df in df_list)
+    )
+    if single_pass:
+        import numpy as np
+        from pandas.api.extensions import take
+
+        # 전체 key를 한 번 정렬하고, frame마다 key 위치로 컬럼을 바로 옮김 (없는 key는 NaN)
+        keys = pd.Index(df_list[0][index])
+        for df in df_list[1:]:
+            values = df[index]
+            keys = keys.append(pd.Index(values[~values.isin(keys)]))
+        keys = keys.sort_values()
+        data = {}
+        for df in df_list:
+            rows = np.full(len(keys), -1, dtype=np.intp)
+            rows[keys.get_indexer(df[index])] = np.arange(len(df))
+            for column in df.columns:
+                # pd.merge와 같이 첫 frame의 컬럼 순서(key 위치 포함) 뒤에 나머지 frame 컬럼을 붙임
+                if column == index:
+                    if index not in data:
+                        data[index] = keys
+                    continue
+                data[column] = take(df[column].array, rows, allow_fill=True)
+        merged = pd.DataFrame(data, copy=False)
+    else:
+        merged = reduce(lambda left,right: pd.merge(left,right,on=[index], how='outer'), df_list)
+    if downcast:
+        from .frame_memory import downcast_numeric
 
-def merge_list(index ,df_list) :
-    return reduce(lambda left,right: pd.merge(left,right,on=[index], how='outer'), df_list)
+        merged = downcast_numeric(merged)
+    return merged
 
 def n_days_before_today_string(n_days=0):
     oneDay = datetime.timedelta(days=1)
@@ -35,103 +105,58 @@ def getTime(n_days):
         - oneDay
     )
     
-def get_retention(df, ab = 'all', tag = 'total', fileName = 'total') :
-    for timeFrame in ['D']: # 'D' : day, W': week, 'M': month
-        df['timeGroup'] = df['loggedDate_x'].dt.to_period(timeFrame)
-        df['cohort'] = df.groupby('userId')['loggedDate_y'].transform('min').dt.to_period(timeFrame)
-        df_cohort = df.groupby(['cohort', 'timeGroup']).agg(n_users=('userId', 'nunique')).reset_index(drop=False)
-        df_cohort['period_number'] = (df_cohort['timeGroup'] - df_cohort['cohort']).apply(attrgetter('n'))
-
-        cohort_pivot = df_cohort.pivot_table(index='cohort', columns='period_number', values='n_users')
-        cohort_size = cohort_pivot.iloc[:,0]
-        retention_matrix = cohort_pivot.divide(cohort_size, axis=0)
-
-        print(retention_matrix)
-        with sns.axes_style('white'):
-            fig, ax = plt.subplots(1, 2, figsize=(16, 12), sharey=True, gridspec_kw={'width_ratios': [1, 11]})
-
-            # retention matrix
-            sns.heatmap(retention_matrix,
-                       mask=retention_matrix.isnull(),
-                       annot=True,
-                       fmt='.0%',
-    #                    cmap='Greens',
-                       cmap='RdYlGn',
-                       ax=ax[1],
-                       annot_kws={'size': 12},
-                       vmin=0,
-                       vmax=0.7,
-                    cbar=False,
-                       )
-            if timeFrame == 'M': 
-                title = 'Monthly Cohorts_' + ab + tag
-            elif timeFrame == 'W': 
-                title = 'Weekly Cohorts_' + ab + tag
-            elif timeFrame =='D':
-                title = 'DailyCohorts_' + ab + tag
-            else: 
-                raise ValueError('wrong timeFrame')
-
-            ax[1].set_title(title, fontsize=16)
-            ax[1].set(xlabel='# of periods',
-                     ylabel='')
-
-            # cohort size
-            cohort_size_df = pd.DataFrame(cohort_size).rename(columns={0: 'cohort_size'})
-            white_cmap = mcolors.ListedColormap('white')
-            sns.heatmap(cohort_size_df,
-                       annot=True,
-                       cbar=False,
-                       fmt='g',
-                       cmap=white_cmap,
-                       ax=ax[0])
-
-            fig.tight_layout()
-            file = f'/tmp/retention_{fileName}.png'
-            plt.savefig(file)
-            return file
-
-def plot_graphs(dataframe):
-    plt.figure(figsize=(14, 8))
-
-    # 세션 수를 시각화
-    plt.subplot(3, 1, 1)
-    plt.plot(dataframe.index, dataframe['Avg Session Count'], marker='o', color='b', label='Avg Session Count')
-    plt.title('Avg Session Count Over Time')
-    plt.xlabel('Date')
-    plt.ylabel('Avg Session Count')
-    plt.grid(True)
-    plt.ylim(0, dataframe['Avg Session Count'].max() * 1.1)  # Y축이 0에서 시작하도록 설정
-
-    plt.legend()
-
-    # 평균 세션 지속 시간을 시각화
-    plt.subplot(3, 1, 2)
-    plt.plot(dataframe.index, dataframe['Avg Session Duration (Min)'], marker='o', color='g', label='Avg Session Duration')
-    plt.title('Avg Session Duration Over Time')
-    plt.xlabel('Date')
-    plt.ylabel('Avg SessionDuration (minutes)')
-    plt.grid(True)
-    plt.ylim(0, dataframe['Avg Session Duration (Min)'].max() * 1.1)  # Y축이 0에서 시작하도록 설정
-
-    plt.legend()
-
-    # 총 세션 지속 시간을 시각화
-    plt.subplot(3, 1, 3)
-    plt.plot(dataframe.index, dataframe['Avg Daily Total Duration (Min)'], marker='o', color='r', label='Avg Daily Total Duration')
-    plt.title('Avg Daily Total Duration Over Time')
-    plt.xlabel('Date')
-    plt.ylabel('Avg Daily Total Duration (minutes)')
-    plt.grid(True)
-    plt.ylim(0, dataframe['Avg Daily Total Duration (Min)'].max() * 1.1)  # Y축이 0에서 시작하도록 설정
-
-    plt.legend()
-
-    plt.tight_layout()
-    plt.tight_layout()
-    file = f'almart_engagement.png'
-    plt.savefig(file)
-    return file
+def retention_from_cohorts(df_cohort):
+    """(cohort, period_number, n_users) 집계로 retention matrix와 cohort 크기를 계산"""
+    cohort_pivot = df_cohort.pivot_table(index='cohort', columns='period_number', values='n_users')
+    cohort_size = cohort_pivot.iloc[:,0]
+    retention_matrix = cohort_pivot.divide(cohort_size, axis=0)
+    return retention_matrix, cohort_size
+
+def cohort_retention(df, timeFrame = 'D'):
+    """userId, loggedDate_x(활동일), loggedDate_y(cohort 기준일) 로그 전체로 retention matrix 계산"""
+    df['timeGroup'] = df['loggedDate_x'].dt.to_period(timeFrame)
+    df['cohort'] = df.groupby('userId')['loggedDate_y'].transform('min').dt.to_period(timeFrame)
+    df_cohort = df.groupby(['cohort', 'timeGroup']).agg(n_users=('userId', 'nunique')).reset_index(drop=False)
+    df_cohort['period_number'] = (df_cohort['timeGroup'] - df_cohort['cohort']).apply(attrgetter('n'))
+    return retention_from_cohorts(df_cohort)
+
+def get_retention(df, ab = 'all', tag = 'total', fileName = 'total', store = None, retention = None, output = None) :
+    """store(utils.retention_store.RetentionStore)를 주면 df의 새 날짜만 누적 집계에 반영하여 계산
+
+    retention에 이미 계산된 (retention_matrix, cohort_size)를 주면 df 없이 그래프만 그림
+    (utils.mongo_aggregations.retention_from_db 결과 등)
+    output에 BytesIO 등을 주면 파일 대신 그 객체에 PNG를 저장
+    """
+    from .charts import render_retention
+
+    timeFrame = 'D' # 'D' : day, W': week, 'M': month
+    if retention is not None:
+        retention_matrix, cohort_size = retention
+    elif store is not None:
+        store.update(df)
+        store.save()
+        retention_matrix, cohort_size = store.retention_matrix()
+    else:
+        retention_matrix, cohort_size = cohort_retention(df, timeFrame)
+
+    print(retention_matrix)
+    if timeFrame == 'M':
+        title = 'Monthly Cohorts_' + ab + tag
+    elif timeFrame == 'W':
+        title = 'Weekly Cohorts_' + ab + tag
+    elif timeFrame =='D':
+        title = 'DailyCohorts_' + ab + tag
+    else:
+        raise ValueError('wrong timeFrame')
+
+    # 같은 fileName으로 동시에 실행되어도 덮어쓰지 않도록 CHART_DIR(기본 /tmp)의 retention_{fileName}_*.png 고유 파일에 저장
+    return render_retention(retention_matrix, cohort_size, title, output, name=f'retention_{fileName}')
+
+def plot_graphs(dataframe, output = None):
+    """일자별 세션 지표 그래프. output을 주지 않으면 고유한 임시 파일 경로를 반환"""
+    from .charts import render_engagement
+
+    return render_engagement(dataframe, output, name='almart_engagement')
 
 def getEngagement(item):
     # 초기화
@@ -0,0 +1,184 @@
+"""
+Cost Explorer 서비스별 일별 비용 (확정된 날짜 캐시)
+
+GetCostAndUsage(DAILY, SERVICE별)를 날짜 구간 단위로 조회한다.
+최근 며칠의 비용은 계속 바뀌므로(Estimated) 매번 다시 조회하고, 그보다 오래되고 확정된 날짜는
+로컬 디렉터리 또는 s3://bucket/prefix 에 저장하여 다시 조회하지 않는다.
+따라서 이력이 길어져도 실행마다 API 호출 수는 (페이지 수를 제외하면) 한 번으로 일정하다.
+
+    history = CostHistory('s3://example-org-devops/report/cost-explorer/')
+    costs = history.daily_costs(date(2024, 2, 1), yesterday)
+    summary = summarize_costs(costs, yesterday)
+"""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from . import storage
+from .aws_clients import get_client
+from .storage import FRAME_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# 캐시 위치 (로컬 디렉터리 또는 s3://bucket/prefix)
+DEFAULT_LOCATION = (os.getenv('COST_EXPLORER_CACHE_LOCATION')
+                    or os.path.join(tempfile.gettempdir(), 'cost-explorer'))
+
+# 오늘로부터 이 일수 이내의 비용은 확정되지 않은 것으로 보고 매번 다시 조회
+MUTABLE_DAYS = int(os.getenv('COST_EXPLORER_MUTABLE_DAYS', '3'))
+
+# GetCostAndUsage 한 번에 조회할 최대 일수 (DAILY granularity는 최대 14개월까지 가능)
+BATCH_DAYS = 90
+
+# Cost Explorer API는 us-east-1 endpoint만 제공
+REGION = 'us-east-1'
+
+METRIC = 'UnblendedCost'
+
+COSTS_FILE = 'daily_costs'
+META_FILE = 'meta.json'
+
+COLUMNS = ['date', 'service', 'amount']
+
+
+def _parse(day: str) -> date:
+    return datetime.strptime(day, '%Y-%m-%d').date()
+
+
+def _spans(days: List[date], max_days: int = BATCH_DAYS) -> List[Tuple[date, date]]:
+    """정렬된 날짜 목록을 연속 구간 [start, end)로 묶음 (구간별 최대 max_days일)"""
+    spans = []
+    for day in days:
+        if spans and spans[-1][1] == day and (day - spans[-1][0]).days < max_days:
+            spans[-1] = (spans[-1][0], day + timedelta(days=1))
+        else:
+            spans.append((day, day + timedelta(days=1)))
+    return spans
+
+
+def _empty_costs() -> pd.DataFrame:
+    # 빈 캐시와 조회 결과를 합쳐도 amount가 object가 되지 않도록 dtype 지정
+    return pd.DataFrame({'date': pd.Series(dtype='object'), 'service': pd.Series(dtype='object'),
+                         'amount': pd.Series(dtype='float64')})
+
+
+class CostHistory:
+    def __init__(self, location: str = DEFAULT_LOCATION, client=None, mutable_days: int = MUTABLE_DAYS,
+                 metric: str = METRIC):
+        self.location = location.rstrip('/')
+        self.client = client
+        self.mutable_days = mutable_days
+        self.metric = metric
+        # 확정된 날짜의 (date, service, amount). 비용이 없는 날짜도 final_days에 기록하여 다시 조회하지 않음
+        self.costs = _empty_costs()
+        self.final_days = set()
+        self.requests = 0
+        self.load()
+
+    # --- 캐시 입출력 (캐시 오류로 Job이 실패하지 않도록 오류는 로그만 남김) ---
+
+    def load(self) -> None:
+        try:
+            data = storage.read_bytes(self.location, META_FILE)
+            if data is None:
+                return
+            meta = json.loads(data)
+            costs = storage.read_frame(self.location, COSTS_FILE, meta.get('format', FRAME_FORMAT))
+        except Exception as e:
+            logger.warning(f"Error reading Cost Explorer cache {self.location}: {e}")
+            return
+        if meta.get('metric', METRIC) != self.metric or costs is None:
+            return
+        self.final_days = {_parse(day) for day in meta.get('days', [])}
+        self.costs = costs.assign(date=costs['date'].astype(str), amount=costs['amount'].astype('float64'))
+
+    def save(self) -> None:
+        meta = {'format': FRAME_FORMAT, 'metric': self.metric,
+                'days': sorted(day.isoformat() for day in self.final_days)}
+        try:
+            storage.write_frame(self.location, COSTS_FILE, self.costs)
+            # meta.json을 마지막에 써서 중간에 실패하면 이전 날짜 목록이 유지되도록 함
+            storage.write_bytes(self.location, META_FILE, json.dumps(meta).encode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Error writing Cost Explorer cache {self.location}: {e}")
+
+    # --- 조회 ---
+
+    def fetch(self, start: date, end: date) -> Tuple[pd.DataFrame, set]:
+        """[start, end) 구간의 서비스별 일별 비용과 그중 확정된(Estimated가 아닌) 날짜"""
+        client = self.client or get_client('ce', region_name=REGION)
+        params = {
+            'TimePeriod': {'Start': start.isoformat(), 'End': end.isoformat()},
+            'Granularity': 'DAILY',
+            'Metrics': [self.metric],
+            'GroupBy': [{'Type': 'DIMENSION', 'Key': 'SERVICE'}],
+        }
+        rows, final = [], set()
+        while True:
+            response = client.get_cost_and_usage(**params)
+            self.requests += 1
+            for result in response['ResultsByTime']:
+                day = result['TimePeriod']['Start']
+                if not result.get('Estimated'):
+                    final.add(_parse(day))
+                for group in result.get('Groups', []):
+                    rows.append((day, group['Keys'][0], float(group['Metrics'][self.metric]['Amount'])))
+            if not response.get('NextPageToken'):
+                break
+            params['NextPageToken'] = response['NextPageToken']
+        frame = pd.DataFrame(rows, columns=COLUMNS) if rows else _empty_costs()
+        return frame.astype({'amount': 'float64'}), final
+
+    def daily_costs(self, start: date, end: date, today: Optional[date] = None) -> pd.DataFrame:
+        """start부터 end까지(포함) (date, service, amount)
+
+        캐시에 없는 날짜와 최근 mutable_days일만 조회하며, 오래되고 확정된 날짜는 캐시에 더한다.
+        """
+        today = today or date.today()
+        cutoff = today - timedelta(days=self.mutable_days)
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        needed = [day for day in days if day not in self.final_days or day >= cutoff]
+
+        fetched = []
+        new_final = set()
+        for span_start, span_end in _spans(needed):
+            frame, final = self.fetch(span_start, span_end)
+            fetched.append(frame)
+            new_final |= {day for day in final if day < cutoff}
+
+        if new_final:
+            new_days = {day.isoformat() for day in new_final}
+            new_rows = [frame[frame['date'].isin(new_days)] for frame in fetched]
+            self.costs = pd.concat([self.costs[~self.costs['date'].isin(new_days)]] + new_rows, ignore_index=True)
+            self.final_days |= new_final
+            self.save()
+
+        # 이번에 조회한 값이 캐시보다 최신
+        fetched_days = {day.isoformat() for day in needed}
+        cached = self.costs[self.costs['date'].isin({day.isoformat() for day in days} - fetched_days)]
+        result = pd.concat([cached] + fetched, ignore_index=True) if fetched else cached
+        return result.sort_values(['date', 'service'], ignore_index=True)
+
+
+def summarize_costs(costs: pd.DataFrame, day: date, top: int = 10, top_days: int = 30) -> Dict:
+    """day 기준 직전달 총비용, 직전일(day) 총비용과 전일 대비 증감률, 최근 top_days일 서비스별 상위 top개"""
+    daily = costs.groupby('date')['amount'].sum()
+    month_end = day.replace(day=1) - timedelta(days=1)
+    month_start = month_end.replace(day=1)
+    dates = pd.to_datetime(costs['date']).dt.date
+    previous_day = float(daily.get((day - timedelta(days=1)).isoformat(), 0.0))
+    day_total = float(daily.get(day.isoformat(), 0.0))
+    recent = costs[(dates > day - timedelta(days=top_days)) & (dates <= day)]
+    return {
+        'previous_month': month_start.strftime('%Y-%m'),
+        'previous_month_total': float(costs.loc[(dates >= month_start) & (dates <= month_end), 'amount'].sum()),
+        'day_total': day_total,
+        'day_change_percentage': (day_total - previous_day) / previous_day * 100 if previous_day else 0.0,
+        'top_services': list(recent.groupby('service')['amount'].sum().nlargest(top).items()),
+    }
@@ -0,0 +1,78 @@
+"""
+전체 사용자의 로그를 한 번에 세션으로 나누는 벡터화 세션 엔진
+
+utils.common.getEngagement와 같은 규칙(이전 로그와 5분 넘게 차이 나면 새 세션,
+세션 지속 시간은 같은 세션 안의 로그 간격 합)을 (userId, createdAt) DataFrame 전체에
+적용한다. 한 번 정렬한 뒤 NumPy diff/reduceat으로 계산하므로 사용자별 Python 루프가 없다.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+SESSION_GAP = timedelta(minutes=5)
+
+
+def _split(frame: pd.DataFrame, user_column: str, time_column: str, gap: timedelta):
+    """정렬된 사용자 코드, 세션 시작 위치, 세션별 지속 시간(ns)을 계산"""
+    frame = frame[[user_column, time_column]].dropna()
+    codes, users = pd.factorize(frame[user_column], sort=False)
+    times = frame[time_column].to_numpy(dtype='datetime64[ns]').view('i8')
+
+    # 사용자, 시간 순으로 한 번만 정렬
+    order = np.lexsort((times, codes))
+    codes = codes[order]
+    times = times[order]
+
+    diff = np.diff(times, prepend=times[:1])
+    new_user = np.empty(len(codes), dtype=bool)
+    new_user[:1] = True
+    np.not_equal(codes[1:], codes[:-1], out=new_user[1:])
+    session_start = new_user | (diff > pd.Timedelta(gap).value)
+
+    # 세션의 첫 로그는 지속 시간에 더하지 않음
+    diff[session_start] = 0
+    starts = np.flatnonzero(session_start)
+    durations = np.add.reduceat(diff, starts) if len(starts) else np.array([], dtype='i8')
+    return users, codes, times, starts, durations
+
+
+def split_sessions(frame: pd.DataFrame, user_column: str = 'userId', time_column: str = 'createdAt',
+                   gap: timedelta = SESSION_GAP) -> pd.DataFrame:
+    """세션별 (userId, sessionStart, sessionDuration) DataFrame"""
+    users, codes, times, starts, durations = _split(frame, user_column, time_column, gap)
+    return pd.DataFrame({
+        user_column: users.take(codes[starts]),
+        'sessionStart': times[starts].view('datetime64[ns]'),
+        'sessionDuration': durations.view('timedelta64[ns]'),
+    })
+
+
+def summarize_engagement(frame: pd.DataFrame, user_column: str = 'userId', time_column: str = 'createdAt',
+                         gap: timedelta = SESSION_GAP, with_durations: bool = False) -> pd.DataFrame:
+    """사용자별 sessionCount, averageSessionDuration(분), totalDuration(분)
+
+    getEngagement(logs)와 같은 값을 사용자 전체에 대해 한 번에 계산한다.
+    with_durations=True이면 sessionDurationList(세션별 지속 시간 목록) 컬럼도 포함한다.
+    """
+    users, codes, times, starts, durations = _split(frame, user_column, time_column, gap)
+
+    # 세션은 사용자 순으로 정렬되어 있으므로 사용자 경계에서 한 번 더 reduceat
+    session_users = codes[starts]
+    user_starts = np.flatnonzero(np.r_[True, session_users[1:] != session_users[:-1]]) if len(starts) else starts
+    session_count = np.diff(np.r_[user_starts, len(starts)])
+    total_ns = np.add.reduceat(durations, user_starts) if len(starts) else durations
+
+    total_minutes = total_ns / 60e9
+    result = pd.DataFrame({
+        'sessionCount': session_count,
+        'averageSessionDuration': np.round(total_minutes / np.maximum(session_count, 1), 2),
+        'totalDuration': np.round(total_minutes, 2),
+    }, index=pd.Index(users.take(session_users[user_starts]), name=user_column))
+
+    if with_durations:
+        # 빈 배열도 np.split은 원소 하나를 반환하므로 세션이 없으면 나누지 않음
+        per_user = np.split(pd.to_timedelta(durations).to_pytimedelta(), user_starts[1:]) if len(starts) else []
+        result['sessionDurationList'] = [list(values) for values in per_user]
+    return result
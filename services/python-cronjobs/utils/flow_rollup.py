@@ -0,0 +1,226 @@
+"""
+VPC Flow Logs 일별 집계(rollup) 테이블
+
+전일/주간 비교를 위해 원본 vpc_flow_logs 파티션을 매번 다시 스캔하면 14일 비교에 14일치를 스캔해야 한다.
+하루에 한 번 그날의 flow를 (srcaddr, dstaddr, instance_id, flow_direction, interface_id)별 bytes/packets/flow 수로 집계하여
+dt 파티션의 Parquet 테이블에 INSERT INTO하고(테이블이 없으면 CTAS로 생성), 비교는 작은 rollup 테이블에서 계산한다.
+이미 집계한 날짜는 다시 넣지 않으므로 원본은 날짜별로 한 번만 스캔한다. 단, 늦게 도착하는 flow log가 있으므로
+최근 REFRESH_DAYS일은 파티션 파일을 지우고 매번 다시 집계한다.
+
+    days = rollup_days(yesterday, COMPARISON_DAYS)
+    ensure_rollups(days, DATABASE_NAME, ATHENA_OUTPUT_LOCATION, ROLLUP_TABLE, ROLLUP_LOCATION)
+    totals = run_queries({'daily_totals': daily_totals_query(ROLLUP_TABLE, days[0], days[-1])}, ...)['daily_totals']
+    comparison = daily_comparison(totals, yesterday)
+"""
+
+import logging
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from . import storage
+from .athena import run_queries
+from .aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+SOURCE_TABLE = 'vpc_flow_logs'
+
+# 전일/지난주/2주 전 비교에 필요한 일수
+COMPARISON_DAYS = 14
+
+# 마지막 이 일수는 flow log가 늦게 도착할 수 있으므로 이미 집계했어도 매번 다시 집계 (0이면 다시 집계하지 않음)
+REFRESH_DAYS = int(os.getenv('VPC_FLOW_ROLLUP_REFRESH_DAYS', '2'))
+
+
+def rollup_days(last_day: date, days: int = COMPARISON_DAYS) -> List[date]:
+    """last_day까지 days일 (오래된 날짜부터)"""
+    return [last_day - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+
+
+def _rollup_select(day: date, source: str) -> str:
+    # 파티션 컬럼(dt)은 CTAS/INSERT INTO 모두 마지막 컬럼이어야 함
+    # interface_id는 나중에 ADD COLUMNS로 추가한 컬럼이므로 기존 테이블과 같이 flow_count 뒤에 둠
+    return f"""
+    SELECT
+        srcaddr,
+        dstaddr,
+        instance_id,
+        flow_direction,
+        CAST(SUM(bytes) AS BIGINT) AS bytes,
+        CAST(SUM(packets) AS BIGINT) AS packets,
+        COUNT(*) AS flow_count,
+        interface_id,
+        '{day.isoformat()}' AS dt
+    FROM {source}
+    WHERE year = {day.year} AND month = {day.month} AND day = {day.day}
+    GROUP BY srcaddr, dstaddr, instance_id, flow_direction, interface_id
+    """
+
+
+def create_table_query(table: str, location: str, source: str = SOURCE_TABLE) -> str:
+    """빈 rollup 테이블을 만드는 CTAS (Parquet, dt 파티션)"""
+    return f"""
+    CREATE TABLE {table}
+    WITH (
+        format = 'PARQUET',
+        write_compression = 'SNAPPY',
+        external_location = '{location}',
+        partitioned_by = ARRAY['dt']
+    ) AS {_rollup_select(date(1970, 1, 1), source)}
+    WITH NO DATA
+    """
+
+
+def insert_day_query(table: str, day: date, source: str = SOURCE_TABLE) -> str:
+    """day 하루의 flow를 집계하여 dt='YYYY-MM-DD' 파티션에 추가"""
+    return f"INSERT INTO {table} {_rollup_select(day, source)}"
+
+
+def existing_days_query(table: str, start: date, end: date) -> str:
+    return f"SELECT DISTINCT dt FROM {table} WHERE dt BETWEEN '{start.isoformat()}' AND '{end.isoformat()}'"
+
+
+def daily_totals_query(table: str, start: date, end: date) -> str:
+    """일자별 총 전송량(GB)과 고유 소스/대상 IP 수"""
+    return f"""
+    SELECT
+        dt,
+        CAST(SUM(bytes) AS DOUBLE) / POWER(1024, 3) AS total_gb,
+        COUNT(DISTINCT srcaddr) AS unique_sources,
+        COUNT(DISTINCT dstaddr) AS unique_destinations
+    FROM {table}
+    WHERE dt BETWEEN '{start.isoformat()}' AND '{end.isoformat()}'
+    GROUP BY dt
+    ORDER BY dt
+    """
+
+
+def pair_bytes_query(table: str, days: List[date]) -> str:
+    """days의 (srcaddr, dstaddr, interface_id, flow_direction)별 bytes (전송 비용 분류용)
+
+    한 flow는 여러 ENI(양쪽 인스턴스, NAT Gateway)에서 기록되므로 transfer_costs에서 기록한 ENI로 한 행만 사용한다.
+    """
+    values = ', '.join(f"'{day.isoformat()}'" for day in days)
+    return f"""
+    SELECT
+        srcaddr,
+        dstaddr,
+        interface_id,
+        flow_direction,
+        SUM(bytes) AS bytes,
+        dt
+    FROM {table}
+    WHERE dt IN ({values})
+    GROUP BY srcaddr, dstaddr, interface_id, flow_direction, dt
+    """
+
+
+def add_columns_query(table: str) -> str:
+    """interface_id가 없던 이전 rollup 테이블에 컬럼 추가 (이전 파티션의 값은 NULL)"""
+    return f"ALTER TABLE {table} ADD COLUMNS (interface_id string)"
+
+
+def _table_columns(client, database: str, table: str) -> Optional[List[str]]:
+    """테이블의 컬럼 이름 (테이블이 없으면 None)"""
+    try:
+        metadata = client.get_table_metadata(CatalogName='AwsDataCatalog', DatabaseName=database,
+                                             TableName=table)['TableMetadata']
+    except client.exceptions.MetadataException:
+        return None
+    return [column['Name'] for column in metadata.get('Columns', []) + metadata.get('PartitionKeys', [])]
+
+
+def delete_partition_files(location: str, day: date, s3_client=None) -> int:
+    """rollup 테이블 location 아래 dt=day 파티션의 파일을 삭제하고 삭제한 파일 수를 반환"""
+    s3_client = s3_client or get_client('s3')
+    bucket, prefix = storage.s3_location(location, f'dt={day.isoformat()}/')
+    deleted = 0
+    # list_objects_v2 한 페이지(최대 1000개)가 delete_objects 한 번의 최대 개수와 같음
+    for page in s3_client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+        objects = [{'Key': item['Key']} for item in page.get('Contents', [])]
+        if not objects:
+            continue
+        response = s3_client.delete_objects(Bucket=bucket, Delete={'Objects': objects, 'Quiet': True})
+        if response.get('Errors'):
+            raise RuntimeError(f"Failed to delete {len(response['Errors'])} objects under s3://{bucket}/{prefix}")
+        deleted += len(objects)
+    return deleted
+
+
+def ensure_rollups(days: List[date], database: str, output_location: str, table: str, location: str,
+                   source: str = SOURCE_TABLE, client=None, statistics: Optional[Dict[str, Dict]] = None,
+                   refresh_days: int = REFRESH_DAYS, s3_client=None, **kwargs) -> List[date]:
+    """days 중 rollup 테이블에 없는 날짜와 마지막 refresh_days일을 집계하여 넣고 집계한 날짜를 반환
+
+    테이블이 없으면 CTAS로 먼저 만든다. kwargs는 run_queries 옵션(workgroup 등)이다.
+    이미 있는 마지막 refresh_days일은 늦게 도착한 flow까지 반영하도록 파티션 파일을 지운 뒤 다시 INSERT INTO한다.
+    flow가 없는 날짜는 파티션이 생기지 않으므로 실행할 때마다 다시 시도한다(원본도 비어 있어 스캔이 거의 없음).
+    """
+    client = client or get_client('athena')
+    kwargs['client'] = client
+    columns = _table_columns(client, database, table)
+    if columns is None:
+        logger.info(f"Creating rollup table {database}.{table} at {location}")
+        run_queries({'create_rollup': create_table_query(table, location, source)}, database, output_location,
+                    statistics=statistics, **kwargs)
+        existing = set()
+    else:
+        if 'interface_id' not in columns:
+            logger.info(f"Adding interface_id to rollup table {database}.{table}")
+            run_queries({'add_rollup_columns': add_columns_query(table)}, database, output_location,
+                        statistics=statistics, **kwargs)
+        frame = run_queries({'rollup_days': existing_days_query(table, days[0], days[-1])}, database,
+                            output_location, statistics=statistics, **kwargs)['rollup_days']
+        existing = set(frame['dt']) if 'dt' in frame else set()
+
+    refreshed = set()
+    for day in (days[-refresh_days:] if refresh_days > 0 else []):
+        if day.isoformat() not in existing:
+            continue
+        # 파일을 지우지 못하면 INSERT INTO가 중복 집계하므로 이번에는 다시 집계하지 않음
+        try:
+            deleted = delete_partition_files(location, day, s3_client)
+        except Exception as e:
+            logger.warning(f"Error deleting rollup partition {table} dt={day.isoformat()}: {e}")
+            continue
+        logger.info(f"Deleted {deleted} files of rollup partition {table} dt={day.isoformat()} for refresh")
+        refreshed.add(day)
+
+    pending = [day for day in days if day.isoformat() not in existing or day in refreshed]
+    if pending:
+        logger.info(f"Rolling up {source} for {[day.isoformat() for day in pending]}")
+        # 날짜별 INSERT INTO는 서로 다른 파티션에 쓰므로 동시에 실행
+        run_queries({f'rollup_{day.isoformat()}': insert_day_query(table, day, source) for day in pending},
+                    database, output_location, statistics=statistics, **kwargs)
+    return pending
+
+
+def _average(totals: pd.Series, days: List[date]) -> float:
+    """days의 일평균 GB (rollup에 없는 날짜는 제외)"""
+    values = totals.reindex([day.isoformat() for day in days]).dropna()
+    return float(values.mean()) if not values.empty else float('nan')
+
+
+def daily_comparison(totals: pd.DataFrame, day: date) -> pd.DataFrame:
+    """daily_totals_query 결과로 day 기준 전일/지난주/2주 전 비교 (traffic_comparison 컬럼 + 주간 평균)"""
+    if totals.empty:
+        return pd.DataFrame()
+    frame = totals.set_index('dt')
+    total_gb = frame['total_gb'].astype('float64')
+    current = day.isoformat()
+    previous = (day - timedelta(days=1)).isoformat()
+    today_gb = float(total_gb.get(current, 0.0))
+    yesterday_gb = float(total_gb.get(previous, 0.0))
+    return pd.DataFrame([{
+        'today_gb': today_gb,
+        'yesterday_gb': yesterday_gb,
+        'change_percentage': (today_gb - yesterday_gb) / yesterday_gb * 100 if yesterday_gb else 0.0,
+        'today_unique_sources': int(frame['unique_sources'].get(current, 0)),
+        'today_unique_destinations': int(frame['unique_destinations'].get(current, 0)),
+        # 지난주: day 포함 최근 7일, 2주 전: 그 이전 7일
+        'last_week_avg_gb': _average(total_gb, rollup_days(day, 7)),
+        'two_weeks_ago_avg_gb': _average(total_gb, rollup_days(day - timedelta(days=7), 7)),
+    }])
@@ -0,0 +1,122 @@
+"""
+DataFrame 메모리 최적화와 컬럼별 메모리 리포트
+
+- 반복되는 문자열/ObjectId 컬럼 → category (ObjectId는 문자열로 변환)
+- object 타입의 datetime 컬럼 → datetime64
+- 정수 → 가장 작은 정수 타입, 실수 → 값이 바뀌지 않을 때만 float32
+
+    frame = optimize_frame(frame, name='UserLogs')
+    # INFO  UserLogs memory 812.4MB -> 96.1MB (-88%)
+    #         userId: object 412.0MB -> category 18.2MB
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+
+logger = logging.getLogger(__name__)
+
+# 고유 값 비율이 이 값 이하인 문자열 컬럼을 category로 변환
+DEFAULT_CATEGORY_RATIO = 0.5
+
+MB = 1024 * 1024
+
+
+def column_bytes(frame: pd.DataFrame) -> Dict[str, int]:
+    """컬럼별 메모리 사용량(byte, 문자열 등 객체 포함)"""
+    usage = frame.memory_usage(deep=True, index=False)
+    return {column: int(usage[column]) for column in frame.columns}
+
+
+def downcast_numeric(frame: pd.DataFrame) -> pd.DataFrame:
+    """정수 컬럼은 가장 작은 정수 타입으로, 실수 컬럼은 값이 바뀌지 않을 때만 float32로 변환"""
+    for column in frame.select_dtypes(include=['integer', 'floating']).columns:
+        values = frame[column]
+        if pd.api.types.is_integer_dtype(values):
+            frame[column] = pd.to_numeric(values, downcast='integer')
+        elif values.dtype == np.float64:
+            downcast = values.astype(np.float32)
+            if np.array_equal(downcast.to_numpy(dtype=np.float64), values.to_numpy(), equal_nan=True):
+                frame[column] = downcast
+    return frame
+
+
+def _compact_column(values: pd.Series, category_ratio: float) -> pd.Series:
+    if isinstance(values.dtype, pd.CategoricalDtype) or not (
+            values.dtype == object or pd.api.types.is_string_dtype(values)):
+        return values
+
+    kind = pd.api.types.infer_dtype(values, skipna=True)
+    if kind in ('datetime', 'datetime64', 'date'):
+        try:
+            return pd.to_datetime(values)
+        except (TypeError, ValueError):
+            # tz가 섞여 있는 등 변환할 수 없으면 그대로 둠
+            return values
+    if kind == 'mixed' and isinstance(values.dropna().iloc[0] if values.notna().any() else None, ObjectId):
+        values = values.map(lambda value: value if value is None or isinstance(value, str) else str(value))
+        kind = 'string'
+    if kind in ('string', 'empty') and values.nunique(dropna=True) <= max(len(values) * category_ratio, 1):
+        return values.astype('category')
+    return values
+
+
+def optimize_frame(frame: pd.DataFrame, name: str = 'DataFrame', category_ratio: float = DEFAULT_CATEGORY_RATIO,
+                   report: Optional['MemoryReport'] = None) -> pd.DataFrame:
+    """frame을 더 작은 타입으로 변환한 새 DataFrame을 반환
+
+    report를 주면 변환 전후 크기를 report에 더하고(chunk 단위 처리용), 주지 않으면 바로 로그를 남긴다.
+    """
+    before = column_bytes(frame)
+    dtypes = {column: str(dtype) for column, dtype in frame.dtypes.items()}
+
+    frame = frame.copy()
+    for column in frame.columns:
+        frame[column] = _compact_column(frame[column], category_ratio)
+    frame = downcast_numeric(frame)
+
+    own_report = report is None
+    report = report if report is not None else MemoryReport(name)
+    report.add(dtypes, before, frame)
+    if own_report:
+        report.log()
+    return frame
+
+
+class MemoryReport:
+    """optimize_frame 변환 전후 컬럼별 타입과 크기를 누적"""
+
+    def __init__(self, name: str = 'DataFrame'):
+        self.name = name
+        self.before = defaultdict(int)
+        self.after = defaultdict(int)
+        self.dtypes: Dict[str, tuple] = {}
+
+    def add(self, dtypes: Dict[str, str], before: Dict[str, int], frame: pd.DataFrame) -> None:
+        after = column_bytes(frame)
+        for column in frame.columns:
+            self.before[column] += before.get(column, 0)
+            self.after[column] += after[column]
+            self.dtypes.setdefault(column, (dtypes.get(column, '-'), str(frame[column].dtype)))
+
+    def to_frame(self) -> pd.DataFrame:
+        """컬럼별 before_dtype, after_dtype, before_bytes, after_bytes (변환 전 크기가 큰 순서)"""
+        return pd.DataFrame([
+            {'column': column, 'before_dtype': self.dtypes[column][0], 'after_dtype': self.dtypes[column][1],
+             'before_bytes': self.before[column], 'after_bytes': self.after[column]}
+            for column in self.dtypes
+        ], columns=['column', 'before_dtype', 'after_dtype', 'before_bytes', 'after_bytes']).sort_values(
+            'before_bytes', ascending=False, ignore_index=True)
+
+    def log(self, level: int = logging.INFO) -> None:
+        before, after = sum(self.before.values()), sum(self.after.values())
+        lines = [f"{self.name} memory {before / MB:.1f}MB -> {after / MB:.1f}MB "
+                 f"({(after - before) / before:+.0%})" if before else f"{self.name} memory 0.0MB"]
+        for row in self.to_frame().itertuples():
+            lines.append(f"  {row.column}: {row.before_dtype} {row.before_bytes / MB:.1f}MB -> "
+                         f"{row.after_dtype} {row.after_bytes / MB:.1f}MB")
+        logger.log(level, '\n'.join(lines))
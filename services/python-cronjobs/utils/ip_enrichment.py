@@ -0,0 +1,145 @@
+"""
+IP → ENI/인스턴스/Name 태그/EKS 파드 매핑 (top-talker 표 보강)
+
+IP마다 API를 호출하지 않고 describe_network_interfaces, describe_instances(모두 페이지네이션)와
+전체 파드 목록 한 번으로 인메모리 인덱스를 만든 뒤, 결과 DataFrame에 merge 한 번으로 붙인다.
+인덱스는 실행 중 한 번만 만들어 재사용한다.
+
+    index = get_ip_index()
+    top_source_ips = enrich(top_source_ips, 'ip', index)  # ip 뒤에 name 컬럼 추가
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .aws_clients import get_client
+
+try:
+    from kubernetes import client as k8s_client, config as k8s_config
+    KUBERNETES_AVAILABLE = True
+except ImportError:
+    KUBERNETES_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# false이면 파드 IP를 인덱스에 넣지 않음 (Kubernetes API 접근이 없는 환경)
+INCLUDE_PODS = os.getenv('IP_ENRICHMENT_PODS', 'true').lower() == 'true'
+
+COLUMNS = ['ip', 'eni_id', 'instance_id', 'instance_name', 'namespace', 'pod', 'service', 'name']
+
+# 파드의 서비스 이름으로 사용할 label (앞의 것 우선)
+SERVICE_LABELS = ['app.kubernetes.io/name', 'app', 'k8s-app']
+
+_lock = threading.Lock()
+_index: Optional[pd.DataFrame] = None
+
+
+def _tag(tags: Optional[List[Dict]], key: str = 'Name') -> str:
+    for tag in tags or []:
+        if tag['Key'] == key:
+            return tag['Value']
+    return ''
+
+
+def interface_rows(client) -> List[Dict]:
+    """ENI의 사설/공인 IP별 (ip, eni_id, instance_id, description)"""
+    rows = []
+    for page in client.get_paginator('describe_network_interfaces').paginate():
+        for interface in page['NetworkInterfaces']:
+            base = {'eni_id': interface['NetworkInterfaceId'],
+                    'instance_id': interface.get('Attachment', {}).get('InstanceId', ''),
+                    'description': interface.get('Description', '')}
+            for address in interface.get('PrivateIpAddresses', []):
+                rows.append({'ip': address['PrivateIpAddress'], **base})
+                public_ip = address.get('Association', {}).get('PublicIp')
+                if public_ip:
+                    rows.append({'ip': public_ip, **base})
+    return rows
+
+
+def instance_names(client) -> Dict[str, str]:
+    """instance_id → Name 태그"""
+    return {instance['InstanceId']: _tag(instance.get('Tags'))
+            for page in client.get_paginator('describe_instances').paginate()
+            for reservation in page['Reservations']
+            for instance in reservation['Instances']}
+
+
+def pod_rows(core_v1=None) -> List[Dict]:
+    """전체 파드 목록 한 번으로 파드 IP별 (ip, namespace, pod, service). hostNetwork 파드는 노드 IP이므로 제외"""
+    if core_v1 is None:
+        if not KUBERNETES_AVAILABLE:
+            return []
+        try:
+            k8s_config.load_incluster_config()
+        except Exception:
+            k8s_config.load_kube_config()
+        core_v1 = k8s_client.CoreV1Api()
+    rows = []
+    for pod in core_v1.list_pod_for_all_namespaces(field_selector='status.phase=Running').items:
+        if pod.spec.host_network or not pod.status.pod_ip:
+            continue
+        labels = pod.metadata.labels or {}
+        service = next((labels[label] for label in SERVICE_LABELS if labels.get(label)), '')
+        ips = [address.ip for address in (pod.status.pod_i_ps or [])] or [pod.status.pod_ip]
+        for ip in ips:
+            rows.append({'ip': ip, 'namespace': pod.metadata.namespace, 'pod': pod.metadata.name,
+                         'service': service})
+    return rows
+
+
+def build_ip_index(ec2_client=None, core_v1=None, include_pods: bool = INCLUDE_PODS) -> pd.DataFrame:
+    """IP별 ENI/인스턴스/Name 태그/파드와 표시용 name (파드 > 인스턴스 Name 태그 > ENI 설명 순)"""
+    ec2_client = ec2_client or get_client('ec2')
+    interfaces = pd.DataFrame(interface_rows(ec2_client), columns=['ip', 'eni_id', 'instance_id', 'description'])
+    names = instance_names(ec2_client)
+    interfaces['instance_name'] = interfaces['instance_id'].map(names).fillna('')
+
+    pods = pd.DataFrame(columns=['ip', 'namespace', 'pod', 'service'])
+    if include_pods:
+        try:
+            pods = pd.DataFrame(pod_rows(core_v1), columns=pods.columns)
+        except Exception as e:
+            logger.warning(f"Error listing pods for IP enrichment: {e}")
+
+    # VPC CNI는 파드에 ENI의 보조 IP를 할당하므로 같은 IP가 양쪽에 있을 수 있음
+    index = interfaces.drop_duplicates('ip').merge(pods.drop_duplicates('ip'), on='ip', how='outer')
+    index = index.fillna('')
+    pod_names = index['namespace'] + '/' + index['service'].where(index['service'] != '', index['pod'])
+    index['name'] = pod_names.where(index['pod'] != '', index['instance_name'])
+    index['name'] = index['name'].where(index['name'] != '', index['description'])
+    return index[COLUMNS].reset_index(drop=True)
+
+
+def get_ip_index(**kwargs) -> pd.DataFrame:
+    """실행 중 공유하는 IP 인덱스 (처음 호출할 때 한 번만 생성)"""
+    global _index
+
+    with _lock:
+        if _index is None:
+            _index = build_ip_index(**kwargs)
+        return _index
+
+
+def clear_ip_index() -> None:
+    global _index
+
+    with _lock:
+        _index = None
+
+
+def enrich(frame: pd.DataFrame, column: str, index: pd.DataFrame, fields: Optional[Dict[str, str]] = None
+           ) -> pd.DataFrame:
+    """frame[column]의 IP로 index를 left merge하여 fields({index 컬럼: 새 컬럼}, 기본 name)를 column 바로 뒤에 추가"""
+    fields = fields or {'name': 'name'}
+    if frame.empty or column not in frame:
+        return frame
+    lookup = index[['ip'] + list(fields)].rename(columns={'ip': column, **fields})
+    merged = frame.merge(lookup, on=column, how='left', validate='many_to_one')
+    merged[list(fields.values())] = merged[list(fields.values())].fillna('')
+    position = list(frame.columns).index(column) + 1
+    return merged[list(frame.columns[:position]) + list(fields.values()) + list(frame.columns[position:])]
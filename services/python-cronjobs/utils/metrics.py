@@ -0,0 +1,285 @@
+"""
+CronJob 실행 메트릭을 DogStatsD(UDP)로 전송
+
+- DogStatsd: datadog 패키지 없이 DogStatsD 프로토콜로 gauge/count/histogram 전송
+- ApiCallTracker: AWS(botocore), Kubernetes, Slack API 호출 수와 지연 시간 집계
+"""
+
+import functools
+import importlib.abc
+import os
+import socket
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+# UDP 패킷 하나의 최대 크기 (DogStatsD 권장값)
+MAX_PACKET_SIZE = 1432
+
+DEFAULT_NAMESPACE = 'cronjob'
+
+
+def sanitize_tag(value) -> str:
+    """DogStatsD 태그 구분자(, | #)와 공백을 치환"""
+    value = str(value)
+    for char in ',|# ':
+        value = value.replace(char, '_')
+    return value
+
+
+class DogStatsd:
+    """DogStatsD UDP 클라이언트. 메트릭을 버퍼에 모았다가 flush() 시 패킷 단위로 전송"""
+
+    def __init__(self, host: str = None, port: int = None, namespace: str = DEFAULT_NAMESPACE,
+                 constant_tags: Optional[List[str]] = None):
+        self.host = host or os.getenv('DD_AGENT_HOST', 'localhost')
+        self.port = int(port or os.getenv('DD_DOGSTATSD_PORT', 8125))
+        self.namespace = namespace
+        self.constant_tags = list(constant_tags or [])
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._socket = None
+
+    def _add(self, metric: str, value, metric_type: str, tags: Optional[List[str]] = None) -> None:
+        name = f'{self.namespace}.{metric}' if self.namespace else metric
+        line = f'{name}:{value}|{metric_type}'
+        all_tags = self.constant_tags + list(tags or [])
+        if all_tags:
+            line += '|#' + ','.join(all_tags)
+        with self._lock:
+            self._buffer.append(line)
+
+    def gauge(self, metric: str, value: float, tags: Optional[List[str]] = None) -> None:
+        self._add(metric, value, 'g', tags)
+
+    def increment(self, metric: str, value: int = 1, tags: Optional[List[str]] = None) -> None:
+        self._add(metric, value, 'c', tags)
+
+    def histogram(self, metric: str, value: float, tags: Optional[List[str]] = None) -> None:
+        self._add(metric, value, 'h', tags)
+
+    def flush(self) -> None:
+        """버퍼의 메트릭을 MAX_PACKET_SIZE 이하의 UDP 패킷으로 묶어 전송. 전송 실패는 무시"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+
+        packets = []
+        current = ''
+        for line in lines:
+            if current and len(current) + 1 + len(line) > MAX_PACKET_SIZE:
+                packets.append(current)
+                current = ''
+            current = f'{current}\n{line}' if current else line
+        packets.append(current)
+
+        try:
+            if self._socket is None:
+                self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                self._socket.setblocking(False)
+            for packet in packets:
+                self._socket.sendto(packet.encode('utf-8'), (self.host, self.port))
+        except OSError as e:
+            # 메트릭 전송 실패가 Job 실행에 영향을 주지 않도록 출력만 함
+            print(f'Error sending metrics to DogStatsD: {e}', file=sys.stderr)
+
+
+class _PostImportFinder(importlib.abc.MetaPathFinder):
+    """지정한 모듈이 처음 import된 직후 callback(module)을 실행하는 meta path finder"""
+
+    def __init__(self, callbacks: Dict[str, Callable]):
+        self.callbacks = callbacks
+
+    def find_spec(self, fullname, path, target=None):
+        callback = self.callbacks.get(fullname)
+        if callback is None:
+            return None
+
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is None or not hasattr(spec.loader, 'exec_module'):
+            return spec
+
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            callback(module)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+class ApiCallTracker:
+    """외부 API 호출 수와 지연 시간을 api(aws/kubernetes/slack)와 operation별로 집계"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = defaultdict(lambda: {'count': 0, 'errors': 0, 'latency_ms': 0.0})
+        self._installed = False
+
+    def record(self, api: str, operation: str, latency_ms: float, error: bool = False) -> None:
+        with self._lock:
+            stats = self._calls[(api, operation)]
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['latency_ms'] += latency_ms
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+
+    def snapshot(self) -> Dict:
+        """{(api, operation): {'count', 'errors', 'latency_ms'}} 형태의 현재 집계 복사본"""
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._calls.items()}
+
+    # --- AWS (botocore 이벤트) ---
+
+    def _before_aws_call(self, context=None, **kwargs):
+        # before-call은 Stubber 등이 응답을 가로채면 이후 핸들러가 호출되지 않으므로 before-parameter-build 사용
+        if context is not None:
+            context['metrics_started'] = time.monotonic()
+
+    def _after_aws_call(self, model=None, context=None, http_response=None, **kwargs):
+        started = (context or {}).pop('metrics_started', None)
+        if started is None or model is None:
+            return
+        status_code = getattr(http_response, 'status_code', 200) or 200
+        operation = f'{model.service_model.service_name}.{model.name}'
+        self.record('aws', operation, (time.monotonic() - started) * 1000, error=status_code >= 400)
+
+    def instrument_boto3_session(self, session) -> None:
+        """boto3 Session에 이벤트 핸들러 등록. 등록 이후 이 세션에서 만든 client의 호출이 집계됨"""
+        session.events.register('before-parameter-build', self._before_aws_call,
+                                unique_id='cronjob-metrics-before-parameter-build')
+        session.events.register('after-call', self._after_aws_call, unique_id='cronjob-metrics-after-call')
+
+    # --- Kubernetes / Slack (메서드 래핑) ---
+
+    def _wrap(self, owner, attribute: str, api: str, operation: Callable) -> None:
+        original = getattr(owner, attribute)
+        if getattr(original, '_cronjob_metrics', False):
+            return
+        tracker = self
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            name = operation(*args, **kwargs)
+            if name is None:
+                return original(*args, **kwargs)
+            started = time.monotonic()
+            error = False
+            try:
+                return original(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                tracker.record(api, name, (time.monotonic() - started) * 1000, error)
+
+        wrapper._cronjob_metrics = True
+        setattr(owner, attribute, wrapper)
+
+    def _patch_kubernetes(self, module) -> None:
+        self._wrap(module.RESTClientObject, 'request', 'kubernetes',
+                   lambda client, method, *args, **kwargs: str(method).upper())
+
+    def _patch_slack_sdk(self, module) -> None:
+        self._wrap(module.BaseClient, 'api_call', 'slack', lambda client, api_method, *args, **kwargs: api_method)
+
+    def _patch_requests(self, module) -> None:
+        # Slack incoming webhook 호출만 집계
+        self._wrap(module.Session, 'request', 'slack',
+                   lambda session, method, url, *args, **kwargs: 'webhook' if 'hooks.slack.com' in str(url) else None)
+
+    def _patch_boto3(self, module) -> None:
+        # boto3.client()가 처음 호출될 때 만들어지는 기본 세션에도 핸들러를 등록
+        if module.DEFAULT_SESSION is not None:
+            self.instrument_boto3_session(module.DEFAULT_SESSION)
+        original = module.setup_default_session
+        if getattr(original, '_cronjob_metrics', False):
+            return
+        tracker = self
+
+        @functools.wraps(original)
+        def setup_default_session(*args, **kwargs):
+            original(*args, **kwargs)
+            tracker.instrument_boto3_session(module.DEFAULT_SESSION)
+
+        setup_default_session._cronjob_metrics = True
+        module.setup_default_session = setup_default_session
+
+    def install(self) -> None:
+        """boto3 기본 세션과 kubernetes/slack_sdk/requests에 계측을 설치
+
+        아직 import되지 않은 모듈은 처음 import되는 시점에 patch하여 import 비용을 앞당기지 않는다.
+        """
+        if self._installed:
+            return
+        self._installed = True
+
+        callbacks = {
+            'boto3': self._patch_boto3,
+            'kubernetes.client.rest': self._patch_kubernetes,
+            'slack_sdk.web.base_client': self._patch_slack_sdk,
+            'requests.sessions': self._patch_requests,
+        }
+        pending = {}
+        for name, callback in callbacks.items():
+            if name in sys.modules:
+                callback(sys.modules[name])
+            else:
+                pending[name] = callback
+        if pending:
+            sys.meta_path.insert(0, _PostImportFinder(pending))
+
+
+# 프로세스 전역 tracker (botocore 핸들러와 메서드 래퍼는 한 번만 설치됨)
+api_call_tracker = ApiCallTracker()
+
+
+class JobMetrics:
+    """main.py에서 파일 단위 실행 메트릭을 기록"""
+
+    def __init__(self, job_name: str, statsd: Optional[DogStatsd] = None, tracker: Optional[ApiCallTracker] = None):
+        env = os.getenv('DD_ENV') or os.getenv('ENV')
+        constant_tags = [f'job:{sanitize_tag(job_name)}']
+        if env:
+            constant_tags.append(f'env:{sanitize_tag(env)}')
+        self.statsd = statsd or DogStatsd()
+        self.statsd.constant_tags = constant_tags + self.statsd.constant_tags
+        self.tracker = tracker or api_call_tracker
+
+    def start_file(self) -> None:
+        self.tracker.reset()
+
+    def finish_file(self, file: str, status: str, duration: float, peak_rss_mb: Optional[float] = None,
+                    cpu_seconds: Optional[float] = None) -> None:
+        """파일 하나의 실행 결과와 그동안 집계된 API 호출을 전송"""
+        tags = [f'file:{sanitize_tag(os.path.basename(file))}']
+        self.statsd.histogram('file.duration', round(duration, 3), tags)
+        self.statsd.increment('file.runs', 1, tags + [f'status:{status}'])
+        if peak_rss_mb is not None:
+            self.statsd.gauge('file.peak_rss_mb', round(peak_rss_mb, 1), tags)
+        if cpu_seconds is not None:
+            self.statsd.gauge('file.cpu_seconds', round(cpu_seconds, 3), tags)
+
+        for (api, operation), stats in self.tracker.snapshot().items():
+            api_tags = tags + [f'api:{api}', f'operation:{sanitize_tag(operation)}']
+            self.statsd.increment('api.calls', stats['count'], api_tags)
+            if stats['errors']:
+                self.statsd.increment('api.errors', stats['errors'], api_tags)
+            self.statsd.histogram('api.latency_ms', round(stats['latency_ms'] / stats['count'], 2), api_tags)
+
+        self.statsd.flush()
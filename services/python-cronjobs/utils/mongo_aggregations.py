@@ -0,0 +1,143 @@
+"""
+retention/세션 지표를 MongoDB aggregation으로 계산하는 파이프라인
+
+get_retention, getEngagement는 원본 활동 로그를 모두 pandas로 가져와 그룹핑한다.
+여기의 파이프라인은 사용자별 최초 일자($group), 로그 간격($setWindowFields)을 서버에서 계산하고
+(cohort, period_number)별 사용자 수 또는 사용자별 세션 집계만 반환하므로 전송량과 파드 메모리가 줄어든다.
+$dateTrunc, $dateDiff, $setWindowFields를 사용하므로 MongoDB 5.0 이상이 필요하다.
+
+    retention_matrix, cohort_size = retention_from_db('cluster0', 'DEMO', 'UserLogs', {'createdAt': {'$gte': start}},
+                                                      activity_column='createdAt')
+    get_retention(None, fileName='almart', retention=(retention_matrix, cohort_size))
+"""
+
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .common import retention_from_cohorts
+from .engagement import SESSION_GAP
+from .mongo_frames import aggregate_frame
+
+DEFAULT_TIMEZONE = 'Asia/Seoul'
+
+
+def cohort_pipeline(match: Dict, user_column: str = 'userId', activity_column: str = 'loggedDate_x',
+                    cohort_column: Optional[str] = None, tz: str = DEFAULT_TIMEZONE) -> List[Dict]:
+    """(cohort, period_number, n_users)를 반환하는 파이프라인
+
+    cohort는 사용자별 cohort_column 최솟값(기본: 활동 시각, 즉 최초 활동일)의 tz 기준 날짜이고,
+    period_number는 cohort부터 활동일까지의 일수이다. cohort_retention과 같은 규칙이다.
+    """
+    cohort_column = cohort_column or activity_column
+    return [
+        {'$match': match},
+        # 사용자, 활동일별로 한 건만 남김 (일별 고유 사용자 수를 세기 위해)
+        {'$group': {
+            '_id': {'user': f'${user_column}',
+                    'day': {'$dateTrunc': {'date': f'${activity_column}', 'unit': 'day', 'timezone': tz}}},
+            'firstSeen': {'$min': f'${cohort_column}'},
+        }},
+        # 사용자별 최초 일자(cohort)와 활동일 목록
+        {'$group': {'_id': '$_id.user', 'cohort': {'$min': '$firstSeen'}, 'days': {'$push': '$_id.day'}}},
+        {'$match': {'cohort': {'$type': 'date'}}},
+        {'$unwind': '$days'},
+        {'$group': {
+            '_id': {'cohort': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$cohort', 'timezone': tz}},
+                    'period_number': {'$dateDiff': {'startDate': '$cohort', 'endDate': '$days', 'unit': 'day',
+                                                    'timezone': tz}}},
+            'n_users': {'$sum': 1},
+        }},
+        {'$project': {'_id': 0, 'cohort': '$_id.cohort', 'period_number': '$_id.period_number', 'n_users': 1}},
+    ]
+
+
+def engagement_pipeline(match: Dict, user_column: str = 'userId', time_column: str = 'createdAt',
+                        gap: timedelta = SESSION_GAP, with_durations: bool = False) -> List[Dict]:
+    """사용자별 sessionCount, totalMs(세션 지속 시간 합, ms)를 반환하는 파이프라인
+
+    getEngagement와 같이 이전 로그와 gap보다 많이 차이 나면 새 세션으로 본다.
+    with_durations=True이면 세션별 지속 시간 목록(durationsMs)도 반환한다.
+    """
+    gap_ms = int(gap.total_seconds() * 1000)
+    pipeline = [
+        {'$match': match},
+        {'$match': {time_column: {'$type': 'date'}, user_column: {'$ne': None}}},
+        {'$project': {'_id': 0, 'user': f'${user_column}', 'time': f'${time_column}'}},
+        {'$setWindowFields': {
+            'partitionBy': '$user',
+            'sortBy': {'time': 1},
+            'output': {'previous': {'$shift': {'output': '$time', 'by': -1}}},
+        }},
+        # 첫 로그는 previous가 없으므로 gap이 null
+        {'$set': {'gap': {'$subtract': ['$time', '$previous']}}},
+        {'$set': {'sessionStart': {'$or': [{'$eq': ['$gap', None]}, {'$gt': ['$gap', gap_ms]}]}}},
+    ]
+    if not with_durations:
+        return pipeline + [
+            {'$group': {
+                '_id': '$user',
+                'sessionCount': {'$sum': {'$cond': ['$sessionStart', 1, 0]}},
+                'totalMs': {'$sum': {'$cond': ['$sessionStart', 0, '$gap']}},
+            }},
+            {'$project': {'_id': 0, user_column: '$_id', 'sessionCount': 1, 'totalMs': 1}},
+        ]
+
+    return pipeline + [
+        # 세션 시작 표시를 누적하여 세션 번호를 붙임
+        {'$setWindowFields': {
+            'partitionBy': '$user',
+            'sortBy': {'time': 1},
+            'output': {'session': {'$sum': {'$cond': ['$sessionStart', 1, 0]},
+                                   'window': {'documents': ['unbounded', 'current']}}},
+        }},
+        {'$group': {'_id': {'user': '$user', 'session': '$session'},
+                    'durationMs': {'$sum': {'$cond': ['$sessionStart', 0, '$gap']}}}},
+        {'$sort': {'_id.user': 1, '_id.session': 1}},
+        {'$group': {'_id': '$_id.user', 'sessionCount': {'$sum': 1}, 'totalMs': {'$sum': '$durationMs'},
+                    'durationsMs': {'$push': '$durationMs'}}},
+        {'$project': {'_id': 0, user_column: '$_id', 'sessionCount': 1, 'totalMs': 1, 'durationsMs': 1}},
+    ]
+
+
+def retention_from_rows(rows: pd.DataFrame):
+    """cohort_pipeline 결과로 (retention_matrix, cohort_size) 계산"""
+    rows = rows.assign(cohort=pd.PeriodIndex(rows['cohort'], freq='D'))
+    return retention_from_cohorts(rows)
+
+
+def engagement_from_rows(rows: pd.DataFrame, user_column: str = 'userId') -> pd.DataFrame:
+    """engagement_pipeline 결과를 summarize_engagement와 같은 형식(userId index)으로 변환"""
+    session_count = rows['sessionCount'].to_numpy(dtype='int64')
+    total_minutes = rows['totalMs'].to_numpy(dtype='float64') / 60_000
+    result = pd.DataFrame({
+        'sessionCount': session_count,
+        'averageSessionDuration': np.round(total_minutes / np.maximum(session_count, 1), 2),
+        'totalDuration': np.round(total_minutes, 2),
+    }, index=pd.Index(rows[user_column], name=user_column))
+    if 'durationsMs' in rows:
+        result['sessionDurationList'] = [[timedelta(milliseconds=value) for value in values]
+                                         for values in rows['durationsMs']]
+    return result
+
+
+def retention_from_db(db_name: str, database: str, collection: str, match: Dict, user_column: str = 'userId',
+                      activity_column: str = 'loggedDate_x', cohort_column: Optional[str] = None,
+                      tz: str = DEFAULT_TIMEZONE):
+    """mongodb_manager로 cohort_pipeline을 실행하여 (retention_matrix, cohort_size) 계산"""
+    pipeline = cohort_pipeline(match, user_column, activity_column, cohort_column, tz)
+    columns = ['cohort', 'period_number', 'n_users']
+    rows = aggregate_frame(db_name, database, collection, pipeline, columns)
+    return retention_from_rows(rows if not rows.empty else pd.DataFrame(columns=columns))
+
+
+def engagement_from_db(db_name: str, database: str, collection: str, match: Dict, user_column: str = 'userId',
+                       time_column: str = 'createdAt', gap: timedelta = SESSION_GAP,
+                       with_durations: bool = False) -> pd.DataFrame:
+    """mongodb_manager로 engagement_pipeline을 실행하여 사용자별 세션 지표 계산"""
+    pipeline = engagement_pipeline(match, user_column, time_column, gap, with_durations)
+    columns = [user_column, 'sessionCount', 'totalMs'] + (['durationsMs'] if with_durations else [])
+    rows = aggregate_frame(db_name, database, collection, pipeline, columns, category_columns=[user_column])
+    return engagement_from_rows(rows if not rows.empty else pd.DataFrame(columns=columns), user_column)
@@ -0,0 +1,157 @@
+"""
+MongoDB 커서를 chunk 단위 DataFrame으로 읽는 헬퍼
+
+전체 결과를 list로 만든 뒤 DataFrame으로 변환하지 않고 chunk_size개씩 읽어
+projection한 컬럼만, 지정한 타입(datetime64, category 등)으로 변환한다.
+reducer를 주면 chunk마다 집계한 결과만 남기므로 몇 달치 로그도 일정한 메모리로 처리할 수 있다.
+optimize=True이면 chunk마다 utils.frame_memory.optimize_frame으로 타입을 줄이고 컬럼별 변환 전후 크기를 로그로 남긴다.
+
+    frame = find_frame('cluster0', 'DEMO', 'UserLogs', ['userId', 'createdAt'], {'createdAt': {'$gte': start}},
+                       datetime_columns=['createdAt'], category_columns=['userId'])
+"""
+
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .frame_memory import MemoryReport, optimize_frame
+
+# 한 번에 DataFrame으로 변환할 문서 수
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def projection_for(columns: Sequence[str]) -> Dict[str, int]:
+    """컬럼 목록으로 find projection 생성 (_id는 columns에 있을 때만 포함)"""
+    projection = {column: 1 for column in columns}
+    if '_id' not in projection:
+        projection['_id'] = 0
+    return projection
+
+
+def _get_path(document: Dict, path: str):
+    value = document
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _to_frame(documents: List[Dict], columns: Sequence[str], datetime_columns: Sequence[str],
+              category_columns: Sequence[str], dtypes: Optional[Dict[str, str]], tz: Optional[str]) -> pd.DataFrame:
+    if any('.' in column for column in columns):
+        # 중첩 필드(a.b)는 projection 결과가 중첩 dict이므로 경로로 꺼냄
+        records = [[_get_path(document, column) for column in columns] for document in documents]
+        frame = pd.DataFrame.from_records(records, columns=list(columns))
+    else:
+        frame = pd.DataFrame.from_records(documents, columns=list(columns))
+
+    for column in datetime_columns:
+        # pymongo는 datetime을 naive UTC로 반환
+        values = pd.to_datetime(frame[column], errors='coerce')
+        if tz:
+            if values.dt.tz is None:
+                values = values.dt.tz_localize('UTC')
+            values = values.dt.tz_convert(tz).dt.tz_localize(None)
+        frame[column] = values
+    for column in category_columns:
+        # ObjectId 등은 문자열로 바꾼 뒤 category로 저장 (중복이 많은 id 컬럼의 메모리를 크게 줄임)
+        frame[column] = frame[column].map(lambda value: value if value is None or isinstance(value, str)
+                                          else str(value)).astype('category')
+    if dtypes:
+        frame = frame.astype(dtypes)
+    return frame
+
+
+def iter_frames(cursor: Iterable[Dict], columns: Sequence[str], datetime_columns: Sequence[str] = (),
+                category_columns: Sequence[str] = (), dtypes: Optional[Dict[str, str]] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE, tz: Optional[str] = None,
+                report: Optional[MemoryReport] = None) -> Iterator[pd.DataFrame]:
+    """커서(또는 문서 iterable)를 chunk_size개씩 타입이 지정된 DataFrame으로 변환
+
+    report(MemoryReport)를 주면 chunk마다 optimize_frame을 적용하고 변환 전후 크기를 report에 누적한다.
+    """
+    if hasattr(cursor, 'batch_size'):
+        cursor = cursor.batch_size(min(chunk_size, 10_000))
+    iterator = iter(cursor)
+    while True:
+        documents = list(islice(iterator, chunk_size))
+        if not documents:
+            return
+        frame = _to_frame(documents, columns, datetime_columns, category_columns, dtypes, tz)
+        yield optimize_frame(frame, report=report) if report is not None else frame
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """DataFrame들을 합침. chunk마다 범주가 다른 category 컬럼도 category 타입을 유지"""
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+
+    categories = {}
+    for column in frames[0].columns:
+        if all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames if column in frame):
+            categories[column] = union_categoricals([frame[column] for frame in frames if column in frame]).categories
+    if categories:
+        frames = [frame.astype({column: pd.CategoricalDtype(values) for column, values in categories.items()
+                                if column in frame}) for frame in frames]
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_frame(frames: Iterable[pd.DataFrame], reducer: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+               combine: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None) -> pd.DataFrame:
+    """chunk를 하나의 DataFrame으로 합침
+
+    reducer(chunk)를 주면 chunk 대신 그 결과만 보관하고, combine(합친 결과)로 chunk별 부분 집계를 다시 집계한다.
+    예) reducer=lambda df: df.groupby('userId', observed=True).size().rename('count').reset_index(),
+        combine=lambda df: df.groupby('userId', observed=True)['count'].sum().reset_index()
+    """
+    parts = [reducer(frame) if reducer else frame for frame in frames]
+    result = concat_frames(parts)
+    return combine(result) if combine else result
+
+
+def find_frames(db_name: str, database: str, collection: str, columns: Sequence[str], filter: Optional[Dict] = None,
+                sort: Optional[List] = None, **kwargs) -> Iterator[pd.DataFrame]:
+    """mongodb_manager로 find를 실행하고 결과를 chunk 단위 DataFrame으로 반환"""
+    from .mongodb_manager import mongodb_manager
+
+    client = mongodb_manager.get_connection(db_name)
+    cursor = client[database][collection].find(filter or {}, projection_for(columns), sort=sort)
+    return iter_frames(cursor, columns, **kwargs)
+
+
+def aggregate_frames(db_name: str, database: str, collection: str, pipeline: List[Dict], columns: Sequence[str],
+                     allow_disk_use: bool = True, **kwargs) -> Iterator[pd.DataFrame]:
+    """mongodb_manager로 aggregate를 실행하고 결과를 chunk 단위 DataFrame으로 반환"""
+    from .mongodb_manager import mongodb_manager
+
+    client = mongodb_manager.get_connection(db_name)
+    cursor = client[database][collection].aggregate(pipeline, allowDiskUse=allow_disk_use)
+    return iter_frames(cursor, columns, **kwargs)
+
+
+def find_frame(db_name: str, database: str, collection: str, columns: Sequence[str], filter: Optional[Dict] = None,
+               sort: Optional[List] = None, reducer=None, combine=None, optimize: bool = False,
+               **kwargs) -> pd.DataFrame:
+    """find 결과 DataFrame. optimize=True이면 chunk마다 타입을 줄이고 컬럼별 메모리 리포트를 로그로 남김"""
+    report = MemoryReport(f'{database}.{collection}') if optimize else None
+    frame = read_frame(find_frames(db_name, database, collection, columns, filter, sort, report=report, **kwargs),
+                       reducer, combine)
+    if report is not None:
+        report.log()
+    return frame
+
+
+def aggregate_frame(db_name: str, database: str, collection: str, pipeline: List[Dict], columns: Sequence[str],
+                    reducer=None, combine=None, optimize: bool = False, **kwargs) -> pd.DataFrame:
+    """aggregate 결과 DataFrame. optimize=True이면 chunk마다 타입을 줄이고 컬럼별 메모리 리포트를 로그로 남김"""
+    report = MemoryReport(f'{database}.{collection}') if optimize else None
+    frame = read_frame(aggregate_frames(db_name, database, collection, pipeline, columns, report=report, **kwargs),
+                       reducer, combine)
+    if report is not None:
+        report.log()
+    return frame
@@ -1,34 +1,196 @@
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
+import asyncio
 import atexit
 import logging
+import threading
+from collections import defaultdict
+from collections.abc import Mapping
+from typing import Dict, List
 from .config import configs
+from .metrics import api_call_tracker
 
 # 로거 설정
 logger = logging.getLogger(__name__)
 
+# configs['mongoClientOptions']에 설정이 없을 때 사용하는 MongoClient 옵션
+DEFAULT_CLIENT_OPTIONS = {
+    'maxPoolSize': 30,
+}
+
+# 이 시간(ms) 이상 걸린 명령은 slow query로 로그를 남김 (configs['mongoSlowQueryMs']로 변경 가능)
+DEFAULT_SLOW_QUERY_MS = 1000
+
+# slow query 로그에 남길 명령(filter, pipeline 등) 최대 길이
+MAX_COMMAND_LOG_CHARS = 500
+
+# 종료 시 요약 로그에 남길 명령 수
+SUMMARY_TOP_N = 10
+
+# 압축 방식별 필요한 패키지 (설치되지 않은 방식은 제외)
+COMPRESSOR_MODULES = {
+    'zstd': 'zstandard',
+    'snappy': 'snappy',
+    'zlib': 'zlib',
+}
+
+# 커서 명령은 collection 이름이 명령 값에 있지 않으므로 별도 필드에서 가져옴
+CURSOR_COMMANDS = {'getMore': 'collection'}
+
+
+def _available_compressors(compressors) -> List[str]:
+    """설치된 모듈이 있는 압축 방식만 반환"""
+    if isinstance(compressors, str):
+        compressors = [name.strip() for name in compressors.split(',') if name.strip()]
+    available = []
+    for name in compressors or []:
+        module = COMPRESSOR_MODULES.get(name)
+        try:
+            if module is None:
+                raise ImportError(f'unknown compressor {name}')
+            __import__(module)
+            available.append(name)
+        except ImportError:
+            logger.warning(f"MongoDB compressor '{name}' is not available; skipping")
+    return available
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """명령별 지연 시간, 반환 문서 수를 집계하고 slow query를 로그로 남김"""
+
+    def __init__(self, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS):
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._started: Dict = {}
+        self._stats = defaultdict(lambda: {'count': 0, 'failures': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'documents': 0})
+
+    @staticmethod
+    def _key(event):
+        return event.connection_id, event.request_id
+
+    def started(self, event):
+        command = event.command
+        field = CURSOR_COMMANDS.get(event.command_name, event.command_name)
+        collection = command.get(field)
+        if not isinstance(collection, str):
+            collection = '-'
+        summary = None
+        if event.command_name in ('find', 'aggregate', 'count', 'distinct', 'delete', 'update'):
+            summary = {key: command[key] for key in ('filter', 'pipeline', 'query', 'sort', 'limit') if key in command}
+        with self._lock:
+            self._started[self._key(event)] = (event.database_name, collection, summary)
+
+    def _finish(self, event, failed: bool, documents: int = 0):
+        with self._lock:
+            database, collection, summary = self._started.pop(self._key(event), (event.database_name, '-', None))
+            duration_ms = event.duration_micros / 1000
+            stats = self._stats[(database, collection, event.command_name)]
+            stats['count'] += 1
+            stats['failures'] += int(failed)
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['documents'] += documents
+
+        # main.py의 파일별 API 호출 메트릭에도 포함
+        api_call_tracker.record('mongodb', f'{collection}.{event.command_name}', duration_ms, error=failed)
+
+        if duration_ms >= self.slow_query_ms:
+            detail = str(summary)[:MAX_COMMAND_LOG_CHARS] if summary else ''
+            logger.warning(f"Slow MongoDB {event.command_name} on {database}.{collection}: "
+                           f"{duration_ms:.0f}ms, {documents} documents {detail}")
+
+    def succeeded(self, event):
+        self._finish(event, failed=False, documents=self._count_documents(event.reply))
+
+    def failed(self, event):
+        self._finish(event, failed=True)
+
+    @staticmethod
+    def _count_documents(reply) -> int:
+        if not isinstance(reply, Mapping):
+            return 0
+        cursor = reply.get('cursor')
+        if isinstance(cursor, Mapping):
+            return len(cursor.get('firstBatch') or cursor.get('nextBatch') or [])
+        if isinstance(reply.get('n'), int):
+            return reply['n']
+        return 0
+
+    def snapshot(self) -> Dict:
+        """{(database, collection, command): {'count', 'failures', 'total_ms', 'max_ms', 'documents'}}"""
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+    def summary(self, top_n: int = SUMMARY_TOP_N) -> str:
+        """총 소요 시간이 큰 순서로 명령별 집계 문자열"""
+        lines = []
+        stats = sorted(self.snapshot().items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        for (database, collection, command), values in stats[:top_n]:
+            lines.append(f"{database}.{collection} {command}: {values['count']} calls, "
+                         f"total {values['total_ms']:.0f}ms, max {values['max_ms']:.0f}ms, "
+                         f"{values['documents']} documents, {values['failures']} failures")
+        return '\n'.join(lines)
+
+
 class MongoDBManager:
     def __init__(self):
         load_dotenv(verbose=True)
         self.connections = {}
+        self._lock = threading.Lock()
+        self.listener = MongoCommandListener(configs.get('mongoSlowQueryMs', DEFAULT_SLOW_QUERY_MS))
+
+    def client_options(self, db_name) -> Dict:
+        """configs['mongoClientOptions']의 default와 db_name 설정을 합친 MongoClient 옵션
+
+        예) {"default": {"maxPoolSize": 30}, "cluster0": {"readPreference": "secondaryPreferred",
+             "compressors": ["zstd", "snappy"], "serverSelectionTimeoutMS": 10000}}
+        """
+        client_options = configs.get('mongoClientOptions') or {}
+        options = dict(DEFAULT_CLIENT_OPTIONS)
+        options.update(client_options.get('default') or {})
+        options.update(client_options.get(db_name) or {})
+        if 'compressors' in options:
+            compressors = _available_compressors(options.pop('compressors'))
+            if compressors:
+                options['compressors'] = compressors
+        return options
 
     def get_connection(self, db_name):
-        try:
+        """db_name의 MongoClient를 반환. 처음 호출될 때 한 번만 생성되며 실패하면 예외를 발생시킴"""
+        connection = self.connections.get(db_name)
+        if connection is not None:
+            return connection
+
+        with self._lock:
             if db_name not in self.connections:
-                use_internal_db = configs['useInternalDb']
-                db_uri_map = configs['newDbUriMap'] if use_internal_db else configs['dbUriMap']
-                db_uri = db_uri_map[db_name]
-                connection_string = f"{db_uri}"
-                self.connections[db_name] = MongoClient(connection_string, maxPoolSize=30)
-                print(f"MongoDB connected to {db_name}({db_uri})")
+                try:
+                    use_internal_db = configs['useInternalDb']
+                    db_uri_map = configs['newDbUriMap'] if use_internal_db else configs['dbUriMap']
+                    db_uri = db_uri_map[db_name]
+                    options = self.client_options(db_name)
+                    self.connections[db_name] = MongoClient(db_uri, event_listeners=[self.listener], **options)
+                except Exception as e:
+                    logger.error(f"Error getting connection for {db_name}: {e}")
+                    raise
+                logger.info(f"MongoDB client created for {db_name} ({options})")
+            return self.connections[db_name]
+
+    async def get_connection_async(self, db_name):
+        """asyncio 코드용. mongodb+srv URI의 DNS 조회 등으로 이벤트 루프가 멈추지 않도록 스레드에서 생성"""
+        if db_name in self.connections:
             return self.connections[db_name]
-        except Exception as e:
-            logger.error(f"Error getting connection for {db_name}: {e}")
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_connection, db_name)
 
     def close_all(self):
-        for connection in self.connections.values():
+        with self._lock:
+            connections, self.connections = list(self.connections.values()), {}
+        if connections:
+            summary = self.listener.summary()
+            if summary:
+                logger.info(f"MongoDB command summary:\n{summary}")
+        for connection in connections:
             try:
-                print("Closing MongoDB connection...")
+                logger.info("Closing MongoDB connection...")
                 connection.close()
             except Exception as e:
                 logger.error(f"Error closing connection: {e}")
@@ -37,4 +199,4 @@ class MongoDBManager:
 mongodb_manager = MongoDBManager()
 
 # Register cleanup function to be called on program exit
-atexit.register(mongodb_manager.close_all)
\ No newline at end of file
+atexit.register(mongodb_manager.close_all)
@@ -0,0 +1,166 @@
+"""
+--files 목록을 파일별 자식 프로세스에서 병렬로 실행하는 runner
+
+각 워커는 fork로 생성되어 runner가 이미 import한 모듈을 그대로 사용하고,
+파일별 wall-clock timeout과 RSS 한도를 부모 프로세스가 감시한다.
+"""
+
+import logging
+import multiprocessing
+import resource
+import signal
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# 워커 상태(RSS, timeout) 확인 주기(초)
+POLL_INTERVAL = 0.2
+
+STATUS_SUCCESS = 'success'
+STATUS_FAILED = 'failed'
+STATUS_TIMEOUT = 'timeout'
+STATUS_MEMORY_LIMIT = 'memory_limit'
+STATUS_CRASHED = 'crashed'
+
+
+def read_rss_mb(pid: int) -> Dict[str, float]:
+    """/proc/<pid>/status에서 현재 RSS(VmRSS)와 최대 RSS(VmHWM)를 MB 단위로 읽음"""
+    usage = {'rss_mb': 0.0, 'hwm_mb': 0.0}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    usage['rss_mb'] = int(line.split()[1]) / 1024
+                elif line.startswith('VmHWM:'):
+                    usage['hwm_mb'] = int(line.split()[1]) / 1024
+    except (OSError, ValueError):
+        # /proc가 없는 환경(macOS 등)에서는 워커가 보고한 ru_maxrss만 사용
+        pass
+    return usage
+
+
+def max_rss_mb(usage: resource.struct_rusage) -> float:
+    """ru_maxrss를 MB로 변환 (Linux는 KB, macOS는 byte 단위)"""
+    if sys.platform == 'darwin':
+        return usage.ru_maxrss / 1024 / 1024
+    return usage.ru_maxrss / 1024
+
+
+def _worker_main(target: Callable[[str], bool], file: str, conn) -> None:
+    """워커 프로세스 진입점. 실행 결과와 자원 사용량을 부모에게 전달"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    success = False
+    try:
+        success = bool(target(file))
+    finally:
+        # 자식 프로세스는 atexit 없이 종료되므로 Slack 핸들러 등에 남은 로그를 직접 flush
+        logging.shutdown()
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        conn.send({
+            'success': success,
+            'peak_rss_mb': max_rss_mb(usage),
+            'cpu_seconds': usage.ru_utime + usage.ru_stime,
+        })
+        conn.close()
+    sys.exit(0 if success else 1)
+
+
+def _finish(state: Dict, status: Optional[str] = None) -> Dict:
+    """종료된 워커의 결과를 정리"""
+    process = state['process']
+    report = {}
+    if state['conn'].poll():
+        try:
+            report = state['conn'].recv()
+        except EOFError:
+            pass
+    state['conn'].close()
+
+    if status is None:
+        if process.exitcode == 0 and report.get('success'):
+            status = STATUS_SUCCESS
+        elif report:
+            status = STATUS_FAILED
+        else:
+            # 결과를 보고하지 못하고 종료 (OOMKilled, segfault 등)
+            status = STATUS_CRASHED
+
+    return {
+        'file': state['file'],
+        'status': status,
+        'exitcode': process.exitcode,
+        'duration': time.monotonic() - state['started'],
+        'peak_rss_mb': max(report.get('peak_rss_mb', 0.0), state['peak_rss_mb']),
+        'cpu_seconds': report.get('cpu_seconds'),
+    }
+
+
+def run_parallel(files: List[str], target: Callable[[str], bool], max_workers: int,
+                 timeout: Optional[float] = None, max_rss_mb: Optional[float] = None) -> List[Dict]:
+    """파일들을 최대 max_workers개의 워커 프로세스에서 실행하고 파일별 결과를 --files 순서대로 반환
+
+    target(file)은 워커 프로세스 안에서 호출되며 성공 여부를 반환해야 한다.
+    timeout(초) 또는 max_rss_mb(MB)를 넘긴 워커는 종료(SIGKILL)된다.
+    """
+    context = multiprocessing.get_context('fork')
+    pending = list(enumerate(files))
+    running: List[Dict] = []
+    results: Dict[int, Dict] = {}
+
+    while pending or running:
+        while pending and len(running) < max(max_workers, 1):
+            index, file = pending.pop(0)
+            parent_conn, child_conn = context.Pipe(duplex=False)
+            process = context.Process(target=_worker_main, args=(target, file, child_conn), name=file)
+            process.start()
+            child_conn.close()
+            running.append({
+                'index': index,
+                'file': file,
+                'process': process,
+                'conn': parent_conn,
+                'started': time.monotonic(),
+                'peak_rss_mb': 0.0,
+            })
+
+        for state in list(running):
+            process = state['process']
+            usage = read_rss_mb(process.pid)
+            state['peak_rss_mb'] = max(state['peak_rss_mb'], usage['hwm_mb'], usage['rss_mb'])
+            elapsed = time.monotonic() - state['started']
+
+            status = None
+            if not process.is_alive():
+                pass
+            elif timeout and elapsed > timeout:
+                status = STATUS_TIMEOUT
+            elif max_rss_mb and usage['rss_mb'] > max_rss_mb:
+                status = STATUS_MEMORY_LIMIT
+            else:
+                continue
+
+            if status is not None:
+                process.kill()
+            process.join()
+            results[state['index']] = _finish(state, status)
+            running.remove(state)
+
+        if running:
+            time.sleep(POLL_INTERVAL)
+
+    return [results[index] for index in range(len(files))]
+
+
+def format_summary(results: List[Dict], wall_time: float) -> str:
+    """파일별 실행 결과 요약 문자열"""
+    lines = []
+    for result in results:
+        icon = '✅' if result['status'] == STATUS_SUCCESS else '❌'
+        cpu = f"{result['cpu_seconds']:.1f}s" if result['cpu_seconds'] is not None else '-'
+        lines.append(
+            f"{icon} {result['file']} | {result['status']} (exitcode={result['exitcode']}) | "
+            f"{result['duration']:.2f}s | cpu {cpu} | peak {result['peak_rss_mb']:.1f}MB"
+        )
+    failed = sum(1 for result in results if result['status'] != STATUS_SUCCESS)
+    lines.append(f"files: {len(results)}, failed: {failed}, wall time: {wall_time:.2f}s")
+    return '\n'.join(lines)
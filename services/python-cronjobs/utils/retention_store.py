@@ -0,0 +1,141 @@
+"""
+일별 cohort retention 증분 저장소
+
+get_retention은 매번 전체 이력을 userId로 그룹핑하여 cohort를 다시 계산한다.
+RetentionStore는 사용자별 최초 일자(cohort)와 (cohort, period_number)별 사용자 수만 저장하고,
+실행할 때마다 새 날짜의 활동만 반영하므로 비용이 전체 이력이 아닌 새 데이터 크기에 비례한다.
+
+- 로컬 디렉터리 또는 s3://bucket/prefix 에 저장
+- pyarrow가 설치되어 있으면 Parquet, 없으면 gzip CSV로 저장
+- 이미 반영한 날짜의 데이터는 중복 집계하지 않도록 건너뜀 (하루치 데이터는 한 번에 모두 반영해야 함)
+
+    store = RetentionStore('s3://example-org-devops/retention/almart')
+    get_retention(new_day_df, fileName='almart', store=store)
+"""
+
+import json
+import logging
+from typing import Dict, Optional
+
+import pandas as pd
+
+from . import storage
+from .common import retention_from_cohorts
+from .storage import FRAME_FORMAT
+
+logger = logging.getLogger(__name__)
+
+USERS_FILE = 'users'
+COUNTS_FILE = 'cohort_counts'
+META_FILE = 'meta.json'
+
+
+class RetentionStore:
+    def __init__(self, path: str, user_column: str = 'userId', activity_column: str = 'loggedDate_x',
+                 cohort_column: str = 'loggedDate_y'):
+        self.path = path.rstrip('/')
+        self.user_column = user_column
+        self.activity_column = activity_column
+        self.cohort_column = cohort_column
+        # userId → 최초 일자(datetime64, 자정)
+        self.users = pd.Series(dtype='datetime64[ns]', name='first_seen')
+        # (cohort, period_number) → 사용자 수
+        self.counts = pd.Series(dtype='int64', name='n_users')
+        self.days = set()
+        self.load()
+
+    # --- 저장소 입출력 ---
+
+    def _read_bytes(self, name: str) -> Optional[bytes]:
+        return storage.read_bytes(self.path, name)
+
+    def _write_bytes(self, name: str, data: bytes) -> None:
+        storage.write_bytes(self.path, name, data)
+
+    def _read_frame(self, name: str, frame_format: str) -> Optional[pd.DataFrame]:
+        return storage.read_frame(self.path, name, frame_format)
+
+    def _write_frame(self, name: str, frame: pd.DataFrame) -> None:
+        storage.write_frame(self.path, name, frame)
+
+    def load(self) -> None:
+        data = self._read_bytes(META_FILE)
+        if data is None:
+            return
+        meta = json.loads(data)
+        # 저장 당시 형식으로 읽음 (pyarrow 설치 여부가 바뀌어도 기존 저장소를 사용할 수 있도록)
+        frame_format = meta.get('format', FRAME_FORMAT)
+        self.days = {pd.Timestamp(day) for day in meta.get('days', [])}
+
+        users = self._read_frame(USERS_FILE, frame_format)
+        if users is not None:
+            self.users = pd.Series(pd.to_datetime(users['first_seen']).to_numpy(),
+                                   index=users['userId'].astype(str), name='first_seen')
+        counts = self._read_frame(COUNTS_FILE, frame_format)
+        if counts is not None:
+            index = pd.MultiIndex.from_arrays([pd.to_datetime(counts['cohort']), counts['period_number']],
+                                              names=['cohort', 'period_number'])
+            self.counts = pd.Series(counts['n_users'].to_numpy(), index=index, name='n_users')
+
+    def save(self) -> None:
+        self._write_frame(USERS_FILE, self.users.rename_axis('userId').reset_index())
+        self._write_frame(COUNTS_FILE, self.counts.reset_index())
+        meta = {'format': FRAME_FORMAT, 'days': sorted(day.strftime('%Y-%m-%d') for day in self.days)}
+        # meta.json을 마지막에 써서 중간에 실패하면 이전 날짜 목록이 유지되도록 함
+        self._write_bytes(META_FILE, json.dumps(meta).encode('utf-8'))
+
+    # --- 집계 ---
+
+    def update(self, df: pd.DataFrame) -> Dict[str, int]:
+        """새 활동 로그를 반영. 이미 반영한 날짜는 건너뜀"""
+        frame = df[[self.user_column, self.activity_column, self.cohort_column]].dropna(
+            subset=[self.user_column, self.activity_column])
+        frame = frame.assign(**{
+            self.user_column: frame[self.user_column].astype(str),
+            'day': frame[self.activity_column].dt.normalize(),
+        })
+
+        skipped = {day for day in frame['day'].unique() if pd.Timestamp(day) in self.days}
+        if skipped:
+            logger.warning(f"Skipping {len(skipped)} day(s) already in retention store: "
+                           f"{sorted(pd.Timestamp(day).strftime('%Y-%m-%d') for day in skipped)}")
+            frame = frame[~frame['day'].isin(skipped)]
+        if frame.empty:
+            return {'days': 0, 'new_users': 0, 'rows': 0}
+
+        # 사용자별 최초 일자: 기존 값과 새 데이터의 최솟값
+        first_seen = frame.groupby(self.user_column)[self.cohort_column].min().dt.normalize()
+        known = first_seen.index.isin(self.users.index)
+        earlier = first_seen[known] < self.users.reindex(first_seen.index[known])
+        if earlier.any():
+            # 이미 집계된 날짜의 cohort는 바뀌지 않으므로 전체 재계산 결과와 달라질 수 있음
+            logger.warning(f"{int(earlier.sum())} user(s) have an earlier cohort date than stored")
+            self.users.update(first_seen[known][earlier])
+        new_users = first_seen[~known].dropna()
+        self.users = pd.concat([self.users, new_users]).rename('first_seen')
+
+        # (cohort, 활동일)별 고유 사용자 수를 누적
+        active = frame[['day', self.user_column]].drop_duplicates()
+        cohort = active[self.user_column].map(self.users)
+        active = active.assign(cohort=cohort, period_number=(active['day'] - cohort).dt.days).dropna(subset=['cohort'])
+        new_counts = active.groupby(['cohort', 'period_number']).size().rename('n_users')
+        new_counts.index = new_counts.index.set_levels(new_counts.index.levels[1].astype('int64'), level=1)
+        if self.counts.empty:
+            self.counts = new_counts.astype('int64')
+        else:
+            self.counts = self.counts.add(new_counts, fill_value=0).astype('int64').rename('n_users')
+
+        days = set(pd.to_datetime(frame['day'].unique()))
+        self.days |= days
+        return {'days': len(days), 'new_users': len(new_users), 'rows': len(frame)}
+
+    def retention_matrix(self, start: Optional[str] = None, end: Optional[str] = None):
+        """누적 집계로 (retention_matrix, cohort_size) 계산. start/end로 활동일 구간을 제한할 수 있음"""
+        df_cohort = self.counts.reset_index()
+        day = df_cohort['cohort'] + pd.to_timedelta(df_cohort['period_number'], unit='D')
+        if start is not None:
+            df_cohort = df_cohort[day >= pd.Timestamp(start)]
+        if end is not None:
+            df_cohort = df_cohort[day <= pd.Timestamp(end)]
+        df_cohort = df_cohort.assign(cohort=df_cohort['cohort'].dt.to_period('D'))
+        return retention_from_cohorts(df_cohort)
@@ -0,0 +1,201 @@
+"""
+helm values의 cronJobs 목록을 하나의 warm 프로세스에서 APScheduler로 실행
+
+크론 tick마다 새 Pod를 띄우는 대신, 부모 프로세스가 무거운 모듈 import와
+AWS 자격 증명 조회를 한 번만 수행하고 각 실행은 fork된 자식 프로세스에서
+격리된 상태로 수행한다.
+"""
+
+import argparse
+import importlib
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import yaml
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.blocking import BlockingScheduler
+from apscheduler.triggers.cron import CronTrigger
+
+from .startup_profiler import find_top_level_imports
+
+# concurrencyPolicy: Allow 일 때 동시에 허용할 최대 실행 수
+ALLOW_MAX_INSTANCES = 3
+
+
+def parse_job_args(arg_list: List[str]) -> Dict:
+    """cronJobs[].arg 목록에서 main.py 실행 옵션(--name, --files, --level, --parallel 등)을 추출"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--name')
+    parser.add_argument('--files', nargs='+', default=[])
+    parser.add_argument('--level', default='INFO')
+    parser.add_argument('--parallel', type=int, default=0)
+    parser.add_argument('--timeout', type=float)
+    parser.add_argument('--max-rss-mb', type=float)
+    parsed, _ = parser.parse_known_args([str(arg) for arg in arg_list])
+    return {
+        'name': parsed.name,
+        'files': parsed.files,
+        'level': parsed.level,
+        'parallel': parsed.parallel,
+        'timeout': parsed.timeout,
+        'max_rss_mb': parsed.max_rss_mb,
+    }
+
+
+def load_cron_jobs(values_path: str, names: Optional[List[str]] = None) -> List[Dict]:
+    """helm values 파일에서 cronJobs 목록을 읽어 스케줄러용 job 정의로 변환"""
+    with open(values_path) as f:
+        values = yaml.safe_load(f) or {}
+
+    defaults = values.get('cronJobDefault', {})
+    jobs = []
+    for cron_job in values.get('cronJobs', []):
+        if names and cron_job['name'] not in names:
+            continue
+
+        job_args = parse_job_args(cron_job.get('arg', []))
+        if not job_args['files']:
+            raise ValueError(f"cronJob '{cron_job['name']}' has no --files argument")
+
+        # valueFrom(fieldRef, secretKeyRef 등)은 현재 Pod의 환경변수를 그대로 사용
+        env = {}
+        for item in defaults.get('env', []) + cron_job.get('env', []):
+            if 'value' in item:
+                env[item['name']] = str(item['value'])
+
+        jobs.append({
+            'name': cron_job['name'],
+            'schedule': cron_job['cronTimeExpression'],
+            'job_name': job_args['name'] or cron_job['name'],
+            'files': job_args['files'],
+            'level': job_args['level'],
+            'parallel': job_args['parallel'],
+            'timeout': job_args['timeout'],
+            'max_rss_mb': job_args['max_rss_mb'],
+            'env': env,
+            'concurrency_policy': cron_job.get('concurrencyPolicy', defaults.get('concurrencyPolicy', 'Allow')),
+            'time_zone': cron_job.get('timeZone', defaults.get('timeZone', 'UTC')),
+        })
+
+    return jobs
+
+
+def preload(files: List[str], logger: logging.Logger) -> None:
+    """스케줄 대상 파일들이 사용하는 모듈과 AWS 자격 증명을 부모 프로세스에서 미리 로드"""
+    started = time.monotonic()
+    loaded = 0
+    for file in files:
+        try:
+            modules = find_top_level_imports(file)
+        except (OSError, SyntaxError) as e:
+            logger.warning(f'Skipping preload for {file}: {e}')
+            continue
+
+        for module in modules:
+            try:
+                importlib.import_module(module)
+                loaded += 1
+            except Exception as e:
+                logger.warning(f'Failed to preload {module} for {file}: {e}')
+
+    # 공유 boto3 세션의 자격 증명을 한 번만 조회해 두면 fork된 자식이 그대로 재사용
+    try:
+        from .aws_clients import get_session
+        get_session().get_credentials()
+    except Exception as e:
+        logger.warning(f'Failed to resolve AWS credentials during preload: {e}')
+
+    logger.info(f'Preloaded {loaded} modules in {time.monotonic() - started:.2f}s')
+
+
+def _run_in_child(target: Callable[[Dict], None], job: Dict) -> None:
+    """fork된 자식 프로세스의 진입점. 부모의 SIGTERM 핸들러를 기본 동작으로 되돌린 뒤 실행"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    try:
+        target(job)
+    finally:
+        # 자식 프로세스는 atexit 없이 종료되므로 Slack 핸들러 등에 남은 로그를 직접 flush
+        logging.shutdown()
+
+
+class CronJobScheduler:
+    """cronJobs 정의를 APScheduler에 등록하고 각 실행을 fork된 자식 프로세스에서 수행"""
+
+    def __init__(self, jobs: List[Dict], target: Callable[[Dict], None], logger: logging.Logger):
+        self.jobs = jobs
+        self.target = target
+        self.logger = logger
+        self.context = multiprocessing.get_context('fork')
+        self.running: Dict[str, List] = {}
+        self.lock = threading.Lock()
+        self.scheduler = BlockingScheduler(
+            executors={'default': ThreadPoolExecutor(max_workers=max(len(jobs), 1) * ALLOW_MAX_INSTANCES)},
+            job_defaults={'coalesce': True, 'misfire_grace_time': 30},
+        )
+
+    def add_jobs(self) -> None:
+        for job in self.jobs:
+            policy = job['concurrency_policy']
+            # Forbid: 이전 실행이 끝나지 않았으면 이번 tick을 건너뜀
+            # Replace: 이전 실행을 종료하고 새로 시작
+            max_instances = 1 if policy == 'Forbid' else ALLOW_MAX_INSTANCES
+            self.scheduler.add_job(
+                self.run_job,
+                CronTrigger.from_crontab(job['schedule'], timezone=job['time_zone']),
+                args=[job],
+                id=job['name'],
+                name=job['name'],
+                max_instances=max_instances,
+            )
+            self.logger.info(
+                f"Scheduled {job['name']} ({job['schedule']} {job['time_zone']}, "
+                f"concurrencyPolicy={policy}): {', '.join(job['files'])}"
+            )
+
+    def run_job(self, job: Dict) -> None:
+        """job 하나를 자식 프로세스에서 실행하고 wall time을 기록"""
+        if job['concurrency_policy'] == 'Replace':
+            with self.lock:
+                previous = list(self.running.get(job['name'], []))
+            for process in previous:
+                self.logger.warning(f"Replacing running {job['name']} (pid={process.pid})")
+                process.terminate()
+
+        started = time.monotonic()
+        process = self.context.Process(target=_run_in_child, args=(self.target, job), name=job['name'])
+        process.start()
+        with self.lock:
+            self.running.setdefault(job['name'], []).append(process)
+
+        try:
+            process.join()
+        finally:
+            with self.lock:
+                self.running[job['name']].remove(process)
+
+        elapsed = time.monotonic() - started
+        if process.exitcode == 0:
+            self.logger.info(f"{job['name']} finished in {elapsed:.3f}s")
+        else:
+            self.logger.error(f"{job['name']} failed in {elapsed:.3f}s (exitcode={process.exitcode})")
+
+    def terminate_all(self) -> None:
+        with self.lock:
+            processes = [process for group in self.running.values() for process in group]
+        for process in processes:
+            process.terminate()
+
+    def start(self) -> None:
+        self.add_jobs()
+        # Pod 종료(SIGTERM) 시 스케줄러를 멈추고 실행 중인 자식 프로세스를 정리
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.scheduler.shutdown(wait=False))
+        try:
+            self.scheduler.start()
+        except (KeyboardInterrupt, SystemExit):
+            self.logger.info('Scheduler stopped')
+        finally:
+            self.terminate_all()
@@ -0,0 +1,157 @@
+"""
+CronJob runner용 Slack webhook 로그 핸들러
+
+emit()은 메시지를 큐에 넣기만 하고, 백그라운드 스레드가 짧은 구간(batch_window) 동안
+쌓인 로그를 하나의 메시지로 묶어 webhook으로 전송한다. 로그를 남기는 Job 코드에는
+네트워크 지연이 더해지지 않는다.
+"""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import List, Optional
+
+# Slack 메시지 하나에 담을 최대 글자 수 (text 필드는 4,000자 이후 잘려서 표시됨)
+MAX_MESSAGE_CHARS = 3900
+
+# 429/5xx 응답 시 재시도 횟수와 최대 대기 시간(초)
+MAX_RETRIES = 3
+MAX_RETRY_AFTER = 30
+
+TRUNCATED_SUFFIX = '\n...(truncated)'
+
+_STOP = object()
+
+
+def retry_after_seconds(value: Optional[str], default: float) -> float:
+    """Retry-After 헤더(초 또는 HTTP-date)를 대기 초로 변환 (없거나 해석할 수 없으면 default)"""
+    if not value:
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError):
+        return default
+
+
+def split_messages(entries: List[str], max_chars: int = MAX_MESSAGE_CHARS) -> List[str]:
+    """로그 항목들을 max_chars 이하의 메시지들로 묶음. 한 항목이 너무 길면 잘라냄"""
+    messages = []
+    current = ''
+    for entry in entries:
+        if len(entry) > max_chars:
+            entry = entry[:max_chars - len(TRUNCATED_SUFFIX)] + TRUNCATED_SUFFIX
+        if current and len(current) + 2 + len(entry) > max_chars:
+            messages.append(current)
+            current = ''
+        current = f'{current}\n\n{entry}' if current else entry
+    if current:
+        messages.append(current)
+    return messages
+
+
+class SlackHandler(logging.Handler):
+    def __init__(self, webhook_url, batch_window=2.0, timeout=(3.05, 10), max_chars=MAX_MESSAGE_CHARS,
+                 close_timeout=15.0):
+        logging.Handler.__init__(self)
+        self.webhook_url = webhook_url
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self.close_timeout = close_timeout
+        self._pid = os.getpid()
+        self._queue = queue.Queue()
+        self._thread = None
+        self._session = None
+
+    def emit(self, record):
+        try:
+            log_entry = self.format(record)
+            self._ensure_worker()
+            self._queue.put_nowait(log_entry)
+        except Exception:
+            self.handleError(record)
+
+    def _ensure_worker(self):
+        # emit()은 Handler.lock 안에서 호출되므로 별도 잠금 없이 스레드를 한 번만 시작
+        if self._pid != os.getpid():
+            # fork된 자식 프로세스에는 부모의 전송 스레드가 없으므로 새로 시작
+            self._pid = os.getpid()
+            self._queue = queue.Queue()
+            self._thread = None
+            self._session = None
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='slack-log-handler', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            entry = self._queue.get()
+            if entry is _STOP:
+                break
+
+            # batch_window 동안 추가로 들어온 로그를 모아서 한 번에 전송
+            batch = [entry]
+            deadline = time.monotonic() + self.batch_window
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            for message in split_messages(batch, self.max_chars):
+                self._post(message)
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self._session = requests.Session()
+            self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=2))
+            self._session.headers.update({'Content-type': 'application/json'})
+        return self._session
+
+    def _post(self, text):
+        import requests
+
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                response = self._get_session().post(self.webhook_url, json={"text": text}, timeout=self.timeout)
+                if response.status_code == 429 or response.status_code >= 500:
+                    if attempt == MAX_RETRIES:
+                        response.raise_for_status()
+                    delay = retry_after_seconds(response.headers.get('Retry-After'), 2 ** attempt)
+                    time.sleep(min(delay, MAX_RETRY_AFTER))
+                    continue
+                response.raise_for_status()
+                return
+            except requests.exceptions.RequestException as err:
+                if attempt == MAX_RETRIES or isinstance(err, requests.exceptions.HTTPError):
+                    print(f"Error sending message to Slack: {err}", file=sys.stderr)
+                    return
+                time.sleep(min(2 ** attempt, MAX_RETRY_AFTER))
+
+    def close(self):
+        """남은 로그를 모두 전송한 뒤 종료 (logging.shutdown 시 호출됨)"""
+        thread = self._thread
+        if thread is not None and self._pid == os.getpid() and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(self.close_timeout)
+        self._thread = None
+        logging.Handler.close(self)
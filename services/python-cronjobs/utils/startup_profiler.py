@@ -0,0 +1,127 @@
+"""
+CronJob 스크립트의 시작(import) 비용 프로파일러
+
+`python -X importtime`으로 각 파일의 모듈 레벨 import를 새 인터프리터에서 실행하고,
+모듈별 누적 import 시간을 트리 형태로 출력한다.
+"""
+
+import ast
+import subprocess
+import sys
+from typing import Dict, List
+
+# import 시간 측정 구간의 시작을 표시하는 마커
+PROFILE_MARKER = '--- startup profile ---'
+
+# 트리에 표시할 최소 누적 시간(ms)
+DEFAULT_MIN_MS = 5.0
+
+
+def find_top_level_imports(file: str) -> List[str]:
+    """파이썬 파일의 모듈 레벨 import 대상 모듈 이름 목록을 반환"""
+    with open(file) as f:
+        tree = ast.parse(f.read(), filename=file)
+
+    modules = []
+    # 함수/클래스 내부는 제외하고, 모듈 레벨의 try/if 블록 안의 import는 포함
+    nodes = list(tree.body)
+    while nodes:
+        node = nodes.pop(0)
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+        elif isinstance(node, (ast.Try, ast.If)):
+            nodes.extend(node.body)
+            nodes.extend(getattr(node, 'orelse', []))
+            for handler in getattr(node, 'handlers', []):
+                nodes.extend(handler.body)
+
+    return list(dict.fromkeys(modules))
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """-X importtime 출력(후위 순회 순서)을 모듈 트리로 변환"""
+    lines = output.splitlines()
+    if PROFILE_MARKER in lines:
+        lines = lines[lines.index(PROFILE_MARKER) + 1:]
+
+    # 후위 순회이므로 같은 깊이+1 에 쌓여 있던 노드들이 현재 노드의 자식이 됨
+    pending: Dict[int, List[Dict]] = {}
+    for line in lines:
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2][1:]
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        node = {
+            'name': name.strip(),
+            'self_ms': self_us / 1000,
+            'cumulative_ms': cumulative_us / 1000,
+            'children': pending.pop(depth + 1, []),
+        }
+        pending.setdefault(depth, []).append(node)
+
+    return pending.get(0, [])
+
+
+def profile_modules(modules: List[str], cwd: str = None, preloaded: List[str] = ()) -> Dict:
+    """새 인터프리터에서 모듈들을 import하며 import 시간 트리와 실패 목록을 반환
+
+    preloaded 모듈은 측정 구간 전에 미리 import하여 runner가 이미 지불한 비용을 제외한다.
+    """
+    script = (
+        'import sys\n'
+        f'for name in {list(preloaded)!r}:\n'
+        '    try:\n'
+        '        __import__(name)\n'
+        '    except Exception:\n'
+        '        pass\n'
+        f'sys.stderr.write({PROFILE_MARKER!r} + "\\n")\n'
+        'sys.stderr.flush()\n'
+        f'for name in {modules!r}:\n'
+        '    try:\n'
+        '        __import__(name)\n'
+        '    except Exception as e:\n'
+        '        print(f"{name}\\t{type(e).__name__}: {e}")\n'
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        capture_output=True, text=True, cwd=cwd,
+    )
+    failures = [line.split('\t', 1) for line in result.stdout.splitlines() if '\t' in line]
+    return {'tree': parse_importtime(result.stderr), 'failures': failures}
+
+
+def format_tree(nodes: List[Dict], min_ms: float = DEFAULT_MIN_MS, depth: int = 0) -> List[str]:
+    """누적 시간이 큰 순서로 정렬된 트리 문자열 목록을 생성"""
+    lines = []
+    for node in sorted(nodes, key=lambda n: n['cumulative_ms'], reverse=True):
+        if node['cumulative_ms'] < min_ms:
+            continue
+        lines.append(f"{'  ' * depth}{node['name']}: {node['cumulative_ms']:.1f}ms (self {node['self_ms']:.1f}ms)")
+        lines.extend(format_tree(node['children'], min_ms, depth + 1))
+    return lines
+
+
+def profile_startup(label: str, modules: List[str], min_ms: float = DEFAULT_MIN_MS, cwd: str = None,
+                    preloaded: List[str] = ()) -> str:
+    """모듈 목록의 import 시간 리포트 문자열을 생성"""
+    profile = profile_modules(modules, cwd, preloaded)
+    total_ms = sum(node['cumulative_ms'] for node in profile['tree'])
+    lines = [f'[{label}] import total: {total_ms:.1f}ms']
+    lines.extend(format_tree(profile['tree'], min_ms, depth=1))
+    for name, error in profile['failures']:
+        lines.append(f'  (failed) {name}: {error}')
+    return '\n'.join(lines)
+
+
+def profile_files(files: List[str], runner_modules: List[str], min_ms: float = DEFAULT_MIN_MS, cwd: str = None) -> str:
+    """runner 자체와 각 --files 항목의 import 시간 리포트를 생성
+
+    각 파일의 리포트는 runner가 이미 import한 모듈을 제외한, 해당 파일이 추가로 지불하는 비용이다.
+    """
+    reports = [profile_startup('main.py', runner_modules, min_ms, cwd)]
+    for file in files:
+        reports.append(profile_startup(file, find_top_level_imports(file), min_ms, cwd, preloaded=runner_modules))
+    return '\n\n'.join(reports)
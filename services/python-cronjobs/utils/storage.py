@@ -0,0 +1,79 @@
+"""
+로컬 디렉터리 또는 s3://bucket/prefix 에 이름별로 파일을 저장/조회
+
+RetentionStore, QueryCache, CostHistory 등 실행 사이에 상태를 유지하는 모듈이 같은 방식으로 사용한다.
+DataFrame은 pyarrow가 설치되어 있으면 Parquet, 없으면 gzip CSV로 저장한다.
+"""
+
+import io
+import os
+from typing import Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    FRAME_FORMAT = 'parquet'
+except ImportError:
+    FRAME_FORMAT = 'csv.gz'
+
+
+def is_s3(path: str) -> bool:
+    return path.startswith('s3://')
+
+
+def s3_location(path: str, name: str) -> Tuple[str, str]:
+    bucket, _, prefix = path.rstrip('/')[len('s3://'):].partition('/')
+    return bucket, f'{prefix}/{name}' if prefix else name
+
+
+def read_bytes(path: str, name: str) -> Optional[bytes]:
+    """path 아래 name 파일의 내용 (없으면 None)"""
+    if is_s3(path):
+        from .aws_clients import get_client
+
+        client = get_client('s3')
+        bucket, key = s3_location(path, name)
+        try:
+            return client.get_object(Bucket=bucket, Key=key)['Body'].read()
+        except client.exceptions.NoSuchKey:
+            return None
+    file = os.path.join(path, name)
+    if not os.path.exists(file):
+        return None
+    with open(file, 'rb') as f:
+        return f.read()
+
+
+def write_bytes(path: str, name: str, data: bytes) -> None:
+    """path 아래 name 파일에 저장 (로컬은 임시 파일에 쓴 뒤 교체)"""
+    if is_s3(path):
+        from .aws_clients import get_client
+
+        bucket, key = s3_location(path, name)
+        get_client('s3').put_object(Bucket=bucket, Key=key, Body=data)
+        return
+    os.makedirs(path, exist_ok=True)
+    file = os.path.join(path, name)
+    with open(f'{file}.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(f'{file}.tmp', file)
+
+
+def read_frame(path: str, name: str, frame_format: str = FRAME_FORMAT) -> Optional[pd.DataFrame]:
+    """write_frame으로 저장한 '{name}.{frame_format}' 파일 (없으면 None)"""
+    data = read_bytes(path, f'{name}.{frame_format}')
+    if data is None:
+        return None
+    if frame_format == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    return pd.read_csv(io.BytesIO(data), compression='gzip')
+
+
+def write_frame(path: str, name: str, frame: pd.DataFrame) -> None:
+    buffer = io.BytesIO()
+    if FRAME_FORMAT == 'parquet':
+        frame.to_parquet(buffer, index=False)
+    else:
+        frame.to_csv(buffer, index=False, compression={'method': 'gzip', 'mtime': 0})
+    write_bytes(path, f'{name}.{FRAME_FORMAT}', buffer.getvalue())
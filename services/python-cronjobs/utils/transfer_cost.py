@@ -0,0 +1,233 @@
+"""
+VPC Flow Logs 트래픽 분류와 데이터 전송 비용 계산
+
+모든 바이트를 인터넷 송신 요금으로 계산하면 같은 AZ(무료), 다른 AZ, NAT Gateway 처리 비용을 구분할 수 없다.
+EC2 describe로 VPC subnet CIDR/AZ와 NAT Gateway ENI를 한 번 읽어 정렬된 정수 구간 인덱스를 만들고,
+(srcaddr, dstaddr, bytes) 집계를 NumPy searchsorted로 한 번에 분류한 뒤 분류별 구간 요금표로 비용을 계산한다.
+
+NAT Gateway를 거치는 인스턴스↔인터넷 트래픽은 flow log에 NAT IP가 아니라 인터넷 주소로 기록된다.
+인스턴스 ENI에 (인스턴스, 인터넷) 한 건, NAT ENI에 같은 (인스턴스, 인터넷) 한 건과 (NAT IP, 인터넷) 한 건이
+기록되므로, 기록한 ENI(interface_id)로 NAT ENI의 인스턴스 쪽 기록은 NAT 처리(+ 다른 AZ 전송),
+NAT IP의 기록은 인터넷 송신/수신으로 분류하고 인스턴스 ENI의 같은 기록은 제외한다.
+
+    topology = NetworkTopology.from_ec2()
+    costs = transfer_costs(pairs, topology)  # pairs: dt, srcaddr, dstaddr, [interface_id, flow_direction,] bytes
+"""
+
+import ipaddress
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+INTRA_AZ = 'intra_az'
+CROSS_AZ = 'cross_az'
+NAT_GATEWAY = 'nat_gateway'
+INTERNET_EGRESS = 'internet_egress'
+INTERNET_INGRESS = 'internet_ingress'
+PRIVATE_OTHER = 'private_other'
+UNKNOWN = 'unknown'
+
+TRAFFIC_CLASSES = [INTRA_AZ, CROSS_AZ, NAT_GATEWAY, INTERNET_EGRESS, INTERNET_INGRESS, PRIVATE_OTHER, UNKNOWN]
+
+# 분류별 GB당 요금 구간 [(구간 상한 GB, $/GB), ...] (ap-northeast-2 기준, 마지막 구간 상한은 inf)
+PRICING: Dict[str, List[Tuple[float, float]]] = {
+    INTRA_AZ: [(float('inf'), 0.0)],
+    # 다른 AZ 간 전송은 보내는 쪽과 받는 쪽에 각각 $0.01/GB
+    CROSS_AZ: [(float('inf'), 0.02)],
+    # NAT Gateway가 중계한 인스턴스↔인터넷 트래픽의 데이터 처리 요금
+    # (인스턴스와 NAT가 다른 AZ이면 CROSS_AZ, NAT↔인터넷 구간은 INTERNET_EGRESS/INGRESS로 별도 계산)
+    NAT_GATEWAY: [(float('inf'), 0.059)],
+    # 처음 10TB / 다음 40TB / 다음 100TB / 150TB 초과 (100GB 무료 구간은 무시)
+    INTERNET_EGRESS: [(10240, 0.126), (51200, 0.122), (153600, 0.117), (float('inf'), 0.108)],
+    INTERNET_INGRESS: [(float('inf'), 0.0)],
+    # 피어링된 VPC 등 인덱스에 없는 사설 대역 (같은 리전의 VPC peering은 다른 AZ 요금과 같음)
+    PRIVATE_OTHER: [(float('inf'), 0.01)],
+    UNKNOWN: [(float('inf'), 0.0)],
+}
+
+# 인덱스에 없는 사설/CGNAT 대역 (인터넷이 아닌 트래픽)
+PRIVATE_NETWORKS = ['10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16', '100.64.0.0/10']
+
+GB = 1024 ** 3
+
+
+def tiered_cost(gb, tiers: Sequence[Tuple[float, float]] = PRICING[INTERNET_EGRESS]):
+    """gb(스칼라 또는 배열)의 구간별 요금 합"""
+    amount = np.asarray(gb, dtype='float64')
+    cost = np.zeros_like(amount)
+    lower = 0.0
+    for upper, rate in tiers:
+        cost += np.clip(amount - lower, 0.0, upper - lower) * rate
+        lower = upper
+    return float(cost) if cost.ndim == 0 else cost
+
+
+def ip_to_int(values) -> np.ndarray:
+    """IPv4 문자열 배열을 int64로 변환 (IPv6/'-'/NULL 등은 -1)
+
+    집계 결과에는 같은 IP가 반복되므로 고유값만 문자열 분리 후 정수로 변환한다.
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype='object'))
+    octets = (pd.Series(uniques, dtype='object').astype(str).str.split('.', n=3, expand=True)
+              .reindex(columns=range(4)).apply(pd.to_numeric, errors='coerce'))
+    valid = octets.notna().all(axis=1) & octets.ge(0).all(axis=1) & octets.le(255).all(axis=1)
+    numbers = octets.fillna(0).to_numpy(dtype='int64') @ np.array([1 << 24, 1 << 16, 1 << 8, 1], dtype='int64')
+    numbers = np.append(np.where(valid.to_numpy(), numbers, -1), -1)
+    # factorize는 결측값을 -1로 표시하므로 마지막(-1) 값으로 매핑됨
+    return numbers[codes]
+
+
+def _network_range(cidr: str) -> Tuple[int, int]:
+    network = ipaddress.ip_network(cidr, strict=False)
+    return int(network.network_address), int(network.broadcast_address)
+
+
+class AddressRanges:
+    """겹치지 않는 [start, end] 정수 구간과 구간별 label 번호 (lookup은 searchsorted)"""
+
+    def __init__(self, ranges: Sequence[Tuple[int, int, int]]):
+        ranges = sorted(ranges)
+        self.starts = np.array([start for start, _, _ in ranges], dtype='int64')
+        self.ends = np.array([end for _, end, _ in ranges], dtype='int64')
+        self.labels = np.array([label for _, _, label in ranges], dtype='int64')
+
+    def lookup(self, addresses: np.ndarray) -> np.ndarray:
+        """각 주소가 속한 구간의 label (없으면 -1)"""
+        if not len(self.starts):
+            return np.full(len(addresses), -1, dtype='int64')
+        position = np.searchsorted(self.starts, addresses, side='right') - 1
+        clipped = np.maximum(position, 0)
+        found = (position >= 0) & (addresses >= 0) & (addresses <= self.ends[clipped])
+        return np.where(found, self.labels[clipped], -1)
+
+
+class NetworkTopology:
+    """VPC subnet CIDR별 AZ와 NAT Gateway ENI
+
+    subnets는 (cidr, az) 목록, nat_interfaces는 {NAT Gateway ENI ID: 사설 IP}이다.
+    서로 다른 VPC의 CIDR이 겹치면 먼저 나온 subnet을 사용한다(IPv4만 지원).
+    """
+
+    def __init__(self, subnets: Sequence[Tuple[str, str]], nat_interfaces: Optional[Dict[str, str]] = None):
+        self.zones = sorted({az for _, az in subnets})
+        ranges, end = [], -1
+        for start, stop, label in sorted((*_network_range(cidr), self.zones.index(az)) for cidr, az in subnets
+                                         if ipaddress.ip_network(cidr, strict=False).version == 4):
+            if start > end:
+                ranges.append((start, stop, label))
+                end = stop
+            else:
+                logger.warning(f"Skipping overlapping subnet range {ipaddress.ip_address(start)}")
+        self.subnets = AddressRanges(ranges)
+        nat_interfaces = nat_interfaces or {}
+        # NAT ENI별 AZ 번호 (subnet 인덱스에 없으면 -1)
+        self.nat_zones = dict(zip(nat_interfaces, self.subnets.lookup(ip_to_int(list(nat_interfaces.values())))))
+        self.private = AddressRanges([(*_network_range(cidr), 0) for cidr in PRIVATE_NETWORKS])
+
+    @classmethod
+    def from_ec2(cls, client=None) -> 'NetworkTopology':
+        """DescribeSubnets와 NAT Gateway ENI(DescribeNetworkInterfaces, interface-type=nat_gateway)로 생성"""
+        client = client or get_client('ec2')
+        subnets = [(subnet['CidrBlock'], subnet['AvailabilityZone'])
+                   for page in client.get_paginator('describe_subnets').paginate()
+                   for subnet in page['Subnets']]
+        nat_interfaces = {interface['NetworkInterfaceId']: interface['PrivateIpAddress']
+                          for page in client.get_paginator('describe_network_interfaces').paginate(
+                              Filters=[{'Name': 'interface-type', 'Values': ['nat_gateway']}])
+                          for interface in page['NetworkInterfaces']}
+        return cls(subnets, nat_interfaces)
+
+    def in_vpc(self, addresses) -> np.ndarray:
+        """각 주소가 인덱스의 subnet에 속하는지"""
+        return self.subnets.lookup(ip_to_int(addresses)) >= 0
+
+    def classify(self, sources, destinations) -> pd.Categorical:
+        """(srcaddr, dstaddr) 배열을 TRAFFIC_CLASSES로 분류"""
+        src, dst = ip_to_int(sources), ip_to_int(destinations)
+        src_zone, dst_zone = self.subnets.lookup(src), self.subnets.lookup(dst)
+        src_in, dst_in = src_zone >= 0, dst_zone >= 0
+        src_private = src_in | (self.private.lookup(src) >= 0)
+        dst_private = dst_in | (self.private.lookup(dst) >= 0)
+        src_valid, dst_valid = src >= 0, dst >= 0
+
+        # np.select는 앞의 조건을 우선함 (NAT IP↔인터넷 기록은 NAT ENI가 subnet에 있으므로 인터넷 송신/수신)
+        codes = np.select(
+            [
+                src_in & dst_in & (src_zone == dst_zone),
+                src_in & dst_in,
+                src_in & dst_valid & ~dst_private,
+                dst_in & src_valid & ~src_private,
+                (src_in & dst_private) | (dst_in & src_private),
+            ],
+            [TRAFFIC_CLASSES.index(name) for name in
+             [INTRA_AZ, CROSS_AZ, INTERNET_EGRESS, INTERNET_INGRESS, PRIVATE_OTHER]],
+            default=TRAFFIC_CLASSES.index(UNKNOWN),
+        )
+        return pd.Categorical.from_codes(codes, categories=TRAFFIC_CLASSES)
+
+
+def count_once(pairs: pd.DataFrame, topology: NetworkTopology) -> pd.DataFrame:
+    """한 flow가 여러 ENI에서 기록된 행 중 한 행만 남기고, NAT가 중계한 행에 nat_zone(NAT ENI의 AZ 번호) 표시
+
+    - NAT ENI가 중계한 인스턴스↔인터넷 기록(ingress: 인스턴스→인터넷, egress: 인터넷→인스턴스)은 유지하고,
+      인스턴스 ENI에 기록된 같은 (srcaddr, dstaddr)는 제외
+    - 그 외 VPC 안의 두 ENI에서 기록된 flow는 srcaddr가 VPC 안이면 egress, 아니면 ingress 기록만 사용
+    - interface_id/flow_direction이 없는 행은 그대로 사용
+    """
+    pairs = pairs.reset_index(drop=True)
+    src_in = topology.in_vpc(pairs['srcaddr'].to_numpy())
+    dst_in = topology.in_vpc(pairs['dstaddr'].to_numpy())
+    direction = pairs['flow_direction'] if 'flow_direction' in pairs else pd.Series(None, index=pairs.index)
+    interface = pairs['interface_id'] if 'interface_id' in pairs else pd.Series(None, index=pairs.index)
+    nat_zone = interface.map(topology.nat_zones)
+    transit = nat_zone.notna() & (((direction == 'ingress') & src_in & ~dst_in)
+                                  | ((direction == 'egress') & dst_in & ~src_in))
+
+    keys = [column for column in ['dt', 'srcaddr', 'dstaddr'] if column in pairs]
+    relayed = pd.MultiIndex.from_frame(pairs.loc[transit, keys])
+    copy = nat_zone.isna() & pd.MultiIndex.from_frame(pairs[keys]).isin(relayed)
+    expected = np.where(src_in, 'egress', 'ingress')
+    keep = transit | (~copy & (~direction.isin(['ingress', 'egress']) | (direction == expected)))
+    return pairs.assign(nat_zone=nat_zone.where(transit))[keep.to_numpy()]
+
+
+def transfer_costs(pairs: pd.DataFrame, topology: NetworkTopology, group: Optional[str] = 'dt',
+                   pricing: Optional[Dict[str, List[Tuple[float, float]]]] = None) -> pd.DataFrame:
+    """(srcaddr, dstaddr, bytes) 집계를 분류하여 [group,] traffic_class별 gb와 cost
+
+    같은 flow가 여러 ENI에서 두 번 집계되지 않도록 count_once로 한 행만 사용한다.
+    NAT가 중계한 행은 NAT_GATEWAY로 분류하고, 인스턴스와 NAT ENI의 AZ가 다르면 같은 양을 CROSS_AZ에도 더한다.
+    """
+    pricing = pricing or PRICING
+    keys = [group] if group else []
+    columns = keys + ['traffic_class', 'gb', 'cost']
+    if pairs.empty:
+        return pd.DataFrame(columns=columns)
+    pairs = count_once(pairs, topology)
+    frame = pairs[keys].copy()
+    codes = topology.classify(pairs['srcaddr'].to_numpy(), pairs['dstaddr'].to_numpy()).codes.copy()
+    transit = pairs['nat_zone'].notna().to_numpy()
+    codes[transit] = TRAFFIC_CLASSES.index(NAT_GATEWAY)
+    frame['traffic_class'] = pd.Categorical.from_codes(codes, categories=TRAFFIC_CLASSES)
+    frame['gb'] = pd.to_numeric(pairs['bytes'], errors='coerce').fillna(0).to_numpy(dtype='float64') / GB
+
+    # NAT가 중계한 트래픽의 인스턴스↔NAT 구간이 다른 AZ이면 CROSS_AZ 요금도 부과
+    instance_address = np.where(topology.in_vpc(pairs['srcaddr'].to_numpy()), pairs['srcaddr'], pairs['dstaddr'])
+    instance_zone = topology.subnets.lookup(ip_to_int(instance_address))
+    nat_zone = pairs['nat_zone'].fillna(-1).to_numpy(dtype='int64')
+    cross_az = transit & (nat_zone >= 0) & (instance_zone != nat_zone)
+    frame = pd.concat([frame, frame[cross_az].assign(
+        traffic_class=pd.Categorical([CROSS_AZ] * int(cross_az.sum()), categories=TRAFFIC_CLASSES))])
+
+    totals = frame.groupby(keys + ['traffic_class'], observed=True, as_index=False)['gb'].sum()
+    totals['cost'] = 0.0
+    for name, tiers in pricing.items():
+        selected = totals['traffic_class'] == name
+        totals.loc[selected, 'cost'] = tiered_cost(totals.loc[selected, 'gb'].to_numpy(), tiers)
+    return totals[columns]